@@ -1,6 +1,9 @@
 from fastapi import FastAPI
-from .routers import general, transits, composite
+from .routers import general, transits, composite, roster
 from .routers.v2 import general as general_v2
+from .services.transit_cache import start_transit_prewarm, start_lunar_prebuild
+from .services.transit_alerts import start_alert_scheduler
+from .services.gazetteer import get_gazetteer
 
 # --- Read version from importlib.metadata ---
 import importlib.metadata
@@ -22,8 +25,29 @@ app = FastAPI(title="Human Design API", version=__version__)
 app.include_router(general.router)
 app.include_router(transits.router)
 app.include_router(composite.router)
+app.include_router(roster.router)
 app.include_router(general_v2.router)
 
+@app.on_event("startup")
+def prewarm_transits():
+    # Day charts of the current and next UTC day (HD_TRANSIT_PREWARM=0 disables)
+    start_transit_prewarm()
+
+@app.on_event("startup")
+def prebuild_lunar_table():
+    # Lunar ingress table of the current and next year (HD_LUNAR_PREBUILD=0 disables)
+    start_lunar_prebuild()
+
+@app.on_event("startup")
+def load_gazetteer():
+    # Offline geocoding index (HD_GAZETTEER_PATH), loaded once instead of on the first request
+    get_gazetteer()
+
+@app.on_event("startup")
+def schedule_transit_alerts():
+    # Hourly re-planning of transit alerts (HD_ALERT_SCHEDULER=0 disables)
+    start_alert_scheduler()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,5 +1,6 @@
 from .core import (
     hd_features,
+    TROPICAL_YEAR,
     get_utc_offset_from_tz,
     calc_single_hd_features,
     unpack_single_features,
@@ -18,6 +19,61 @@ from .attributes import (
     get_variables,
     get_lunar_phase
 )
+from .timestamps import (
+    timestamp_range,
+    iter_timestamp_chunks,
+    datetime64_to_timestamps
+)
+from .bulk import (
+    BulkChartResult,
+    calc_mult_hd_columns
+)
+from .bulk_jobs import (
+    BulkJob,
+    NpzChunkSink
+)
+from .group import (
+    PersonChart,
+    GroupCompositeEngine,
+    GroupComposite,
+    get_composite_records,
+    composite_record,
+    composite_pair,
+    transit_overlay
+)
+from .dyad_matrix import (
+    gate_matrix,
+    dyad_matrices
+)
+from .tz_offsets import (
+    get_zone_offsets,
+    utc_offset_hours,
+    utc_offsets
+)
+from .crossings import (
+    timestamp_to_jd,
+    jd_to_iso,
+    line_ingresses,
+    gate_ingresses,
+    transit_calendar
+)
+from .cycles import (
+    NAMED_CYCLES,
+    find_longitude_crossings,
+    find_cycles
+)
+from .lunar import (
+    build_lunar_table,
+    lunar_ingresses,
+    moon_positions,
+    lunar_forecast
+)
+from .penta import (
+    penta_mask,
+    penta_scores,
+    find_best_pentas,
+    score_penta_groups
+)
 from .mechanics import (
     is_connected,
     get_auth,
@@ -33,6 +89,7 @@ from .mechanics import (
 
 __all__ = [
     "hd_features",
+    "TROPICAL_YEAR",
     "get_utc_offset_from_tz",
     "calc_single_hd_features",
     "unpack_single_features",
@@ -48,6 +105,41 @@ __all__ = [
     "get_profile",
     "get_variables",
     "get_lunar_phase",
+    "timestamp_range",
+    "iter_timestamp_chunks",
+    "datetime64_to_timestamps",
+    "BulkChartResult",
+    "calc_mult_hd_columns",
+    "BulkJob",
+    "NpzChunkSink",
+    "PersonChart",
+    "GroupCompositeEngine",
+    "GroupComposite",
+    "get_composite_records",
+    "composite_record",
+    "composite_pair",
+    "transit_overlay",
+    "gate_matrix",
+    "dyad_matrices",
+    "get_zone_offsets",
+    "utc_offset_hours",
+    "utc_offsets",
+    "timestamp_to_jd",
+    "jd_to_iso",
+    "line_ingresses",
+    "gate_ingresses",
+    "transit_calendar",
+    "NAMED_CYCLES",
+    "find_longitude_crossings",
+    "find_cycles",
+    "build_lunar_table",
+    "lunar_ingresses",
+    "moon_positions",
+    "lunar_forecast",
+    "penta_mask",
+    "penta_scores",
+    "find_best_pentas",
+    "score_penta_groups",
     "is_connected",
     "get_auth",
     "get_typ",
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+from tqdm.contrib.concurrent import process_map
+from .. import hd_constants
+from .core import calc_single_hd_features, get_timestamp_list
+
+#categories of categorical code columns (code = index in list, unknown value = -1)
+TYPE_CATEGORIES = ["Generator", "Manifesting Generator", "Projector", "Manifestor", "Reflector"]
+AUTH_CATEGORIES = list(hd_constants.INNER_AUTHORITY_NAMES_MAP.keys())
+PROFILE_CATEGORIES = list(hd_constants.IC_CROSS_TYP.keys())
+
+#column order of (N x 26) activation matrices: personality planets, then design planets
+LABELS = ["prs", "des"]
+PLANET_COLUMNS = [(label, planet) for label in LABELS for planet in hd_constants.SWE_PLANET_DICT]
+
+ACTIVATION_FIELDS = ["gate", "line", "color", "tone", "base"]
+
+def _code(categories, value):
+    ''' index of value in categories, -1 if unknown '''
+    try:
+        return categories.index(value)
+    except ValueError:
+        return -1
+
+def chart_row(single_result):
+    '''
+    compact (columnar) representation of a calc_single_hd_features result
+    Args:
+        single_result(tuple): result of calc_single_hd_features
+    Return:
+        row(tuple): (activations(np.ndarray uint8 5x26), lon(np.ndarray float32 26),
+                     typ_code, auth_code, profile_code, definition)
+    '''
+    date_to_gate_dict = single_result[6]
+    activations = np.array([date_to_gate_dict[field] for field in ACTIVATION_FIELDS], dtype=np.uint8)
+    lon = np.array(date_to_gate_dict["lon"], dtype=np.float32)
+    return (activations,
+            lon,
+            _code(TYPE_CATEGORIES, single_result[0]),
+            _code(AUTH_CATEGORIES, single_result[1]),
+            _code(PROFILE_CATEGORIES, tuple(single_result[4])),
+            int(single_result[5]))
+
+class BulkChartResult:
+    '''
+    columnar result container for bulk chart runs, backed by typed numpy arrays
+        timestamps(datetime64[s]), tz_offset(float32)     shape (N,)
+        gate,line,color,tone,base(uint8), lon(float32)    shape (N,26), cols see PLANET_COLUMNS
+        typ,auth,profile(int8 codes), definition(int8)    shape (N,)
+    slicing (result[a:b]) returns views, no data is copied
+    '''
+    COLUMNS = ["timestamps", "tz_offset", *ACTIVATION_FIELDS, "lon", "typ", "auth", "profile", "definition"]
+
+    def __init__(self, timestamps, tz_offset, gate, line, color, tone, base, lon,
+                 typ, auth, profile, definition):
+        self.timestamps = timestamps
+        self.tz_offset = tz_offset
+        self.gate = gate
+        self.line = line
+        self.color = color
+        self.tone = tone
+        self.base = base
+        self.lon = lon
+        self.typ = typ
+        self.auth = auth
+        self.profile = profile
+        self.definition = definition
+
+    @classmethod
+    def empty(cls, n=0):
+        ''' zero filled container of length n '''
+        matrix = lambda dtype: np.zeros((n, len(PLANET_COLUMNS)), dtype=dtype)
+        vector = lambda dtype: np.zeros(n, dtype=dtype)
+        return cls(vector("datetime64[s]"), vector(np.float32),
+                   *[matrix(np.uint8) for _ in ACTIVATION_FIELDS], matrix(np.float32),
+                   vector(np.int8), vector(np.int8), vector(np.int8), vector(np.int8))
+
+    @classmethod
+    def from_rows(cls, rows, timestamps):
+        '''
+        build container from chart_row results
+        Args:
+            rows(list): chart_row tuples
+            timestamps(list): hd timestamp tuples (year,month,day,hour,minute,second,tz_offset)
+        '''
+        result = cls.empty(len(rows))
+        for idx, (activations, lon, typ, auth, profile, definition) in enumerate(rows):
+            for field_idx, field in enumerate(ACTIVATION_FIELDS):
+                getattr(result, field)[idx] = activations[field_idx]
+            result.lon[idx] = lon
+            result.typ[idx] = typ
+            result.auth[idx] = auth
+            result.profile[idx] = profile
+            result.definition[idx] = definition
+        result.timestamps[:] = [np.datetime64("{:04d}-{:02d}-{:02d}T{:02d}:{:02d}:{:02d}".format(*ts[:6]))
+                                for ts in timestamps]
+        result.tz_offset[:] = [ts[6] if len(ts) > 6 else 0 for ts in timestamps]
+        return result
+
+    @classmethod
+    def from_features(cls, results, timestamps):
+        ''' build container from calc_single_hd_features results (e.g. calc_mult_hd_features) '''
+        return cls.from_rows([chart_row(single_result) for single_result in results], timestamps)
+
+    @classmethod
+    def concat(cls, results):
+        ''' concatenate several containers (copies data) '''
+        return cls(*[np.concatenate([getattr(r, col) for r in results]) for col in cls.COLUMNS])
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, key):
+        ''' basic slices return views, fancy indexing (masks, index arrays) copies like numpy '''
+        if isinstance(key, (int, np.integer)):
+            key = slice(key, key + 1 if key != -1 else None)
+        return type(self)(*[getattr(self, col)[key] for col in self.COLUMNS])
+
+    @property
+    def nbytes(self):
+        ''' memory used by all columns in bytes '''
+        return sum(getattr(self, col).nbytes for col in self.COLUMNS)
+
+    def save(self, path):
+        ''' write all columns to an uncompressed .npz file '''
+        with open(path, "wb") as f:
+            np.savez(f, **{col: getattr(self, col) for col in self.COLUMNS})
+
+    @classmethod
+    def load(cls, path):
+        ''' read container written by save '''
+        with np.load(path) as data:
+            return cls(*[data[col] for col in cls.COLUMNS])
+
+    def column(self, label, planet, field="gate"):
+        ''' single activation column, e.g. column("prs","Sun","gate") '''
+        return getattr(self, field)[:, PLANET_COLUMNS.index((label, planet))]
+
+    def to_dataframe(self, activations=True):
+        '''
+        export to pd.DataFrame (on demand, copies data)
+        categorical codes are exported as pd.Categorical
+        Args:
+            activations(bool): add one column per label/planet/field e.g. "prs_Sun_gate"
+        '''
+        data = {
+            "timestamp": self.timestamps,
+            "tz_offset": self.tz_offset,
+            "typ": pd.Categorical.from_codes(self.typ, categories=TYPE_CATEGORIES),
+            "auth": pd.Categorical.from_codes(self.auth, categories=AUTH_CATEGORIES),
+            "profile": pd.Categorical.from_codes(self.profile,
+                                                 categories=["{}/{}".format(*p) for p in PROFILE_CATEGORIES]),
+            "definition": self.definition,
+        }
+        if activations:
+            for field in [*ACTIVATION_FIELDS, "lon"]:
+                matrix = getattr(self, field)
+                for col_idx, (label, planet) in enumerate(PLANET_COLUMNS):
+                    data["{}_{}_{}".format(label, planet, field)] = matrix[:, col_idx]
+        return pd.DataFrame(data)
+
+def calc_chart_row(timestamp):
+    ''' worker function: chart of timestamp in compact chart_row format (cheap to pickle) '''
+    return chart_row(calc_single_hd_features(timestamp))
+
+def calc_mult_hd_columns(start_date,end_date,percentage,time_unit,intervall,num_cpu):
+    """
+    columnar version of calc_mult_hd_features
+    Args:
+        see calc_mult_hd_features
+    Return:
+        result(BulkChartResult): columnar result of all timestamps
+    """
+    timestamp_list = get_timestamp_list(start_date,end_date,percentage,time_unit,intervall)
+    rows = process_map(calc_chart_row,timestamp_list,max_workers=num_cpu,
+                       chunksize=max(1,len(timestamp_list)//(num_cpu*16)))
+
+    return BulkChartResult.from_rows(rows,timestamp_list)
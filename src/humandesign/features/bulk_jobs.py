@@ -0,0 +1,183 @@
+import os
+import json
+import uuid
+from datetime import datetime
+from multiprocessing import Pool
+from .bulk import BulkChartResult, calc_chart_row
+from .timestamps import iter_timestamp_chunks, datetime64_to_timestamps
+
+DEFAULT_JOB_DIR = os.getenv("HD_BULK_JOB_DIR", ".hd_jobs")
+
+def _atomic_write(path, write):
+    ''' write to temp file first and move it in place, a crash never leaves half written files '''
+    tmp_path = "{}.tmp".format(path)
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def _merge_ranges(ranges):
+    ''' merge [start,end) chunk ranges, e.g. [[0,2],[2,3],[5,6]] -> [[0,3],[5,6]] '''
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+class NpzChunkSink:
+    '''
+    append-safe output sink: one .npz file per chunk index
+    writing a chunk twice replaces the file, so resumed jobs never duplicate rows
+    '''
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, chunk_idx):
+        return os.path.join(self.directory, "chunk_{:06d}.npz".format(chunk_idx))
+
+    def has(self, chunk_idx):
+        return os.path.exists(self._path(chunk_idx))
+
+    def write(self, chunk_idx, result):
+        _atomic_write(self._path(chunk_idx), result.save)
+
+    def chunk_indices(self):
+        return sorted(int(name[6:12]) for name in os.listdir(self.directory)
+                      if name.startswith("chunk_") and name.endswith(".npz"))
+
+    def load(self):
+        ''' all written chunks in chunk order as one BulkChartResult '''
+        parts = [BulkChartResult.load(self._path(idx)) for idx in self.chunk_indices()]
+        return BulkChartResult.concat(parts) if parts else BulkChartResult.empty()
+
+class BulkJob:
+    '''
+    resumable, checkpointed bulk chart run
+        timestamps are split into deterministic chunks (iter_timestamp_chunks, forward order)
+        every finished chunk is written to the sink and recorded in <job_dir>/<job_id>/state.json
+        an interrupted job is continued with BulkJob.resume(job_id), at most one chunk is lost
+    '''
+    def __init__(self, job_id, params, job_dir=DEFAULT_JOB_DIR, completed=None, created=None):
+        self.job_id = job_id
+        self.params = params
+        self.job_dir = job_dir
+        self.completed = _merge_ranges(completed or [])
+        self.created = created or datetime.utcnow().isoformat() + "Z"
+        self.sink = NpzChunkSink(os.path.join(self.path, "chunks"))
+
+    @classmethod
+    def create(cls, start_date, end_date, time_unit="minutes", intervall=1, percentage=1,
+               chunk_size=10_000, zone=None, job_dir=DEFAULT_JOB_DIR, job_id=None):
+        '''
+        create new job and write its initial state file
+        Args:
+            start_date(tuple): (year,month,day,hour,minute,second,timezone_offset)
+            end_date(tuple): (year,month,day,hour,minute,second,timezone_offset)
+            time_unit(str), intervall(int), percentage(float): see timestamp_range
+            chunk_size(int): timestamps per checkpoint
+            zone(str): optional timezone name, dst respected offsets per timestamp
+            job_id(str): optional id, default random uuid
+        '''
+        params = {
+            "start_date": list(start_date),
+            "end_date": list(end_date),
+            "time_unit": time_unit,
+            "intervall": intervall,
+            "percentage": percentage,
+            "chunk_size": chunk_size,
+            "zone": zone,
+        }
+        job = cls(job_id or uuid.uuid4().hex, params, job_dir=job_dir)
+        if os.path.exists(job.state_path):
+            raise ValueError("job '{}' already exists, use BulkJob.resume".format(job.job_id))
+        job.save_state()
+        return job
+
+    @classmethod
+    def resume(cls, job_id, job_dir=DEFAULT_JOB_DIR):
+        ''' load job from its state file '''
+        state_path = os.path.join(job_dir, job_id, "state.json")
+        if not os.path.exists(state_path):
+            raise FileNotFoundError("No state file for job '{}' in {}".format(job_id, job_dir))
+        with open(state_path) as f:
+            state = json.load(f)
+        return cls(job_id, state["params"], job_dir=job_dir,
+                   completed=state["completed"], created=state["created"])
+
+    @property
+    def path(self):
+        return os.path.join(self.job_dir, self.job_id)
+
+    @property
+    def state_path(self):
+        return os.path.join(self.path, "state.json")
+
+    def save_state(self):
+        state = {
+            "job_id": self.job_id,
+            "params": self.params,
+            "completed": self.completed,
+            "created": self.created,
+            "updated": datetime.utcnow().isoformat() + "Z",
+        }
+        os.makedirs(self.path, exist_ok=True)
+        def write(path):
+            with open(path, "w") as f:
+                json.dump(state, f)
+        _atomic_write(self.state_path, write)
+
+    def is_completed(self, chunk_idx):
+        return any(start <= chunk_idx < end for start, end in self.completed)
+
+    def mark_completed(self, chunk_idx):
+        self.completed = _merge_ranges(self.completed + [[chunk_idx, chunk_idx + 1]])
+        self.save_state()
+
+    def iter_chunks(self):
+        ''' (chunk_idx, datetime64 array) of all chunks of the job '''
+        p = self.params
+        chunks = iter_timestamp_chunks(tuple(p["start_date"]), tuple(p["end_date"]), p["time_unit"],
+                                       p["intervall"], chunk_size=p["chunk_size"],
+                                       percentage=p["percentage"], forward=True)
+        return enumerate(chunks)
+
+    def run(self, num_cpu=1, max_chunks=None):
+        '''
+        calculate all open chunks, finished chunks are skipped
+        Args:
+            num_cpu(int): worker processes per chunk (1 = in process)
+            max_chunks(int): stop after X computed chunks (e.g. for time boxed runs)
+        Return:
+            done(bool): True if all chunks are completed
+        '''
+        p = self.params
+        tz_offset = p["start_date"][6] if len(p["start_date"]) > 6 else 0
+        computed = 0
+        pool = Pool(num_cpu) if num_cpu > 1 else None
+        try:
+            for chunk_idx, stamps in self.iter_chunks():
+                if self.is_completed(chunk_idx):
+                    continue
+                #chunk written but state not updated (crash in between) -> only record it
+                if not self.sink.has(chunk_idx):
+                    if max_chunks is not None and computed >= max_chunks:
+                        return False
+                    timestamps = datetime64_to_timestamps(stamps, tz_offset=tz_offset, zone=p["zone"])
+                    if pool:
+                        rows = pool.map(calc_chart_row, timestamps,
+                                        chunksize=max(1, len(timestamps) // (num_cpu * 4)))
+                    else:
+                        rows = [calc_chart_row(ts) for ts in timestamps]
+                    self.sink.write(chunk_idx, BulkChartResult.from_rows(rows, timestamps))
+                    computed += 1
+                self.mark_completed(chunk_idx)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        return True
+
+    def result(self):
+        ''' all finished chunks as one BulkChartResult '''
+        return self.sink.load()
@@ -2,11 +2,7 @@ from .. import hd_constants
 import swisseph  as swe  
 from IPython.display import display
 import pandas as pd
-import itertools
-from datetime import timedelta
-from dateutil.relativedelta import relativedelta
 from datetime import datetime
-from pytz import timezone
 from multiprocessing import Pool
 from tqdm.contrib.concurrent import process_map
 import sys
@@ -21,20 +17,29 @@ from .mechanics import (
     get_auth,
     get_definition
 )
+from .timestamps import (
+    timestamp_range,
+    datetime64_to_timestamps
+)
+from .tz_offsets import utc_offset_hours
+
+#mean tropical year in days, the solar return search of a year offset is seeded
+#with birth + year_offset * TROPICAL_YEAR - SOLAR_RETURN_MARGIN
+TROPICAL_YEAR = 365.24219
+SOLAR_RETURN_MARGIN = 5
 
 def get_utc_offset_from_tz(timestamp,zone):
     """
     get utc offset from given time_zone. 
-    dst (daylightsavingtime) is respected (data from pytz lib)
+    dst (daylightsavingtime) is respected (data from pytz lib, cached per zone as
+    transition table, see tz_offsets.ZoneOffsets; ambiguous/nonexistent local times
+    resolve like pytz localize with is_dst=False)
     Args:
         zone(str): e.g. "Europe/Berlin"
     Return:
         hours(float): offset hours (decimal hours e.g. 0.75 for 45 min)
     """
-    country = timezone(zone)
-    tz_offset = country.localize(datetime(*timestamp)).utcoffset().total_seconds()
-    hours = tz_offset/3600
-    return hours
+    return utc_offset_hours(timestamp, zone)
 
 class hd_features:
     ''' 
@@ -276,6 +281,36 @@ class hd_features:
         
         return sr_jdut
 
+    def calc_solar_return_series(self, jdut, year_offsets):
+        '''
+        Julian dates of the Solar Returns of several year offsets.
+        The natal Sun longitude is calculated once, the search of each offset starts
+        year_offset tropical years after birth (minus SOLAR_RETURN_MARGIN days), so the
+        return of an offset does not depend on the other requested offsets.
+        Args:
+           jdut (float): Julian date of birth.
+           year_offsets (iterable): Year offsets from birth.
+        Return:
+            dict: year_offset -> sr_julian_day (float)
+        '''
+        natal_sun_lon = swe.calc_ut(jdut, swe.SUN)[0][0]
+        sr_jds = {}
+        for year_offset in sorted(set(year_offsets)):
+            tstart = jdut + year_offset * TROPICAL_YEAR - SOLAR_RETURN_MARGIN
+            sr_jds[year_offset] = swe.solcross_ut(natal_sun_lon, tstart)
+        return sr_jds
+
+    def get_solar_return_dates(self, year_offsets):
+        '''
+        UTC dates (year, month, day, hour, minute, second) of the Solar Returns of several
+        year offsets, see calc_solar_return_series.
+        Return:
+            dict: year_offset -> sr_utc_date_tuple
+        '''
+        birth_julday = self.timestamp_to_juldate(self.time_stamp)
+        sr_jds = self.calc_solar_return_series(birth_julday, year_offsets)
+        return {year_offset: swe.jdut1_to_utc(sr_jd)[:6] for year_offset, sr_jd in sr_jds.items()}
+
     def get_solar_return_date(self, year_offset):
         '''
         Calculates the UTC date and time of the Solar Return.
@@ -390,21 +425,23 @@ def unpack_single_features(single_result):
     
     return return_dict
 
-def get_timestamp_list(start_date,end_date,percentage,time_unit,intervall): 
+def get_timestamp_list(start_date,end_date,percentage,time_unit,intervall,forward=False,zone=None): 
     ''' 
-    make list of timestamps (format: year,month,day,hour,minute) 
-        in given time range (start->end)
-        seconds, and tz_offset will be automatic zero
+    make list of timestamps (format: year,month,day,hour,minute,second,tz_offset) 
+        in given time range (start->end), based on vectorized numpy datetime64 ranges
+        tz_offset is taken from start_date (or calculated per timestamp if zone is given)
     Args:
         start_date(tuple): (year,month,day,hour,minute,second,timezone_offset)
         end_date(tuple): (year,month,day,hour,minute,second,timezone_offset)
         percentage(float): how much % of list is processed (e.g. for trial runs)
-        time_unit (str): = years,months,days,hours,minutes can be used
-        intervall (int) = stepwith, count every X unit(years,months,days,hours,minutes are supported)
+        time_unit (str): = years,months,days,hours,minutes,seconds can be used
+        intervall (int) = stepwith, count every X unit
+        forward(bool): False -> newest first (end excluded start), True -> oldest first (start excluded end)
+        zone(str): e.g. "Europe/Berlin", dst respected offsets per timestamp
     Return: 
         list of tuple: format: year,month,day,hour,minute,second,tz_offset
     
-    Examples : get_timestamp_list((2000,12,31,23,57),(2000,12,31,23,59),1,"minutes",1)
+    Examples : get_timestamp_list((2000,12,31,23,57,0,0),(2000,12,31,23,59,0,0),1,"minutes",1)
                -> [(2000,12,31,23,59,0,0),(2000,12,31,23,58,0,0)]           
     Note: 
        Precision for hd_calculations
@@ -413,37 +450,12 @@ def get_timestamp_list(start_date,end_date,percentage,time_unit,intervall):
            every color changes in 0.16 days, 3.80 hours, 228.28 minutes
            every tone changes in 0.03 days, 0.63 hours, 38.05 minutes
            every base changes in 0.01 days, 0.13 hours, 7.61 minutes
+       for large ranges use iter_timestamp_chunks (lazy) instead of a full list
     '''
-    start_date = datetime(*start_date)
-    end_date = datetime(*end_date)
-
-    if  time_unit =="years":
-        unit=60*60*24*365.2425
-    elif time_unit =="months":
-        unit=60*60*24*365.25/12
-    if time_unit =="days":
-        unit=60*60*24 
-    elif time_unit =="hours":
-        unit=60*60 
-    elif time_unit =="minutes":
-        unit=60
-        
-    time_diff_range = int((end_date-start_date).total_seconds()/(unit)) 
-    timestamp_list = []
-    for idx,i in enumerate(range(int(time_diff_range*percentage/intervall))):
-        #relativdelta native supports year,month
-        if (time_unit == "years") | (time_unit == "months"):
-            new_date = end_date-i*relativedelta(**{time_unit: intervall})
-        #timedelta is faster
-        else:
-            new_date = end_date-i*timedelta(**{"seconds": unit*intervall})
-            
-        timestamp = new_date.year,new_date.month,new_date.day,new_date.hour,new_date.minute,0,0
-        timestamp_list.append(timestamp)
+    tz_offset = start_date[6] if len(start_date) > 6 else 0
+    stamps = timestamp_range(start_date,end_date,time_unit,intervall,percentage,forward)
+    timestamp_list = datetime64_to_timestamps(stamps,tz_offset=tz_offset,zone=zone)
 
-    #sanity check, if date range or intervall makes sense    
-    if not len(timestamp_list):
-        raise ValueError('check startdate < enddate & (enddate-intervall) >= startdate')  
     return timestamp_list
     
 def calc_mult_hd_features(start_date,end_date,percentage,time_unit,intervall,num_cpu):
@@ -525,7 +537,7 @@ def get_single_hd_features(persons_dict,key,feature):
 def composite_chakras_channels(persons_dict,identity,other_person):
     """
     get composite chakras and channels of two identities
-    uses pd.DataFrames format, therefore might be slower
+    uses pd.DataFrames format, therefore might be slower (plain version: group.composite_pair)
     Args:
         person dict(dict): eg {"person1":(2022,2,2,2,22,0,2),"person2":(1922,2,2,2,22,0,2)}
         identity: person1 (in person dict)
@@ -566,48 +578,19 @@ def get_composite_combinations(persons_dict):
     ''' 
     get composite features of two persones in pd.dataframe format
     If more than two persons in dict, every combination is calculated
+    DataFrame adapter of get_composite_records (plain dicts, each chart is calculated once)
     Args:
         person dict(dict): eg {"person1":(2022,2,2,2,22,0,2),"person2":(1922,2,2,2,22,0,2)}
     Return:
         pd.Dataframe of composite features of every pair combination in persons dict
     '''
-    result_dict = {
-        "id": [],
-        "other_person": [],
-        "new_chakra": [],
-        "chakra_count": [],
-        "new_channels": [],
-        "new_ch_meaning": [],
-        "duplicated_channels": [],
-        "duplicated_ch_meaning": []
-    }
-    
-    for idx, combination in enumerate(list(itertools.combinations(persons_dict.keys(), 2))):
+    from .group import get_composite_records, COMPOSITE_COLUMNS
 
-        identity = combination[0]
-        other_person = combination[1]
-        new_channels, dupl_channels, new_chakras, comp_chakras = composite_chakras_channels(
-            persons_dict, identity, other_person)
-
-        result_dict["id"].append(identity)
-        result_dict["other_person"].append(other_person)
-        result_dict["new_chakra"].append(list(new_chakras))
-        result_dict["chakra_count"].append(int(len(comp_chakras)))
-        
-        # New Enahnced Channels
-        result_dict["new_channels"].append(list(zip(new_channels["gate"], new_channels["ch_gate"])))
-        result_dict["new_ch_meaning"].append(list(new_channels["meaning"]))
-        
-        # Duplicated (Shared) Stability Channels
-        result_dict["duplicated_channels"].append(list(zip(dupl_channels["gate"], dupl_channels["ch_gate"])))
-        result_dict["duplicated_ch_meaning"].append(list(dupl_channels["meaning"]))
-
-    result_df = pd.DataFrame(dict([(k, pd.Series(v)) for k, v in result_dict.items()]))
+    result_df = pd.DataFrame(get_composite_records(persons_dict), columns=COMPOSITE_COLUMNS)
     
     return result_df
 
 
-
 def analyze_dynamics_gold(owners_g1, owners_g2):
     """
     Determines the social dynamic of a channel with Gold Standard Codes.
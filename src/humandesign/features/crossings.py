@@ -0,0 +1,209 @@
+import heapq
+from datetime import datetime, timedelta
+import swisseph as swe
+from .. import hd_constants
+from .mechanics import (
+    gate_mask,
+    channel_mask,
+    channels_from_mask,
+    chakras_from_channel_mask
+)
+
+#384 lines on the rave wheel (64 gates x 6 lines)
+LINES_PER_WHEEL = 64 * 6
+LINE_WIDTH = 360 / LINES_PER_WHEEL
+
+#sampling step in days per planet, well below the shortest stay in one line
+#(Moon ~1.7h per line, Mercury at max. speed ~10h per line)
+DEFAULT_STEP = 0.25
+PLANET_STEPS = {"Moon": 1 / 24}
+
+#default precision of crossing times in days (1 second)
+DEFAULT_TOLERANCE = 1 / 86400
+
+def timestamp_to_jd(timestamp):
+    '''
+    julian day (UT) of a timestamp, same conversion as hd_features.timestamp_to_juldate
+    Args:
+        timestamp(tuple): (year,month,day,hour,minute,second,tz_offset)
+    Return:
+        julian day(float)
+    '''
+    return swe.utc_to_jd(*swe.utc_time_zone(*timestamp))[1]
+
+def jd_to_iso(jd):
+    ''' julian day (UT) -> ISO UTC string with second precision, e.g. "2025-01-10T12:00:00Z" '''
+    year, month, day, hour, minute, second = swe.jdut1_to_utc(jd)
+    utc = datetime(int(year), int(month), int(day), int(hour), int(minute)) + timedelta(seconds=round(second))
+    return utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def planet_longitude(jd, planet):
+    '''
+    ecliptic longitude of a planet of SWE_PLANET_DICT, Earth and South_Node are
+    opposite to Sun and North_Node (same convention as hd_features.date_to_gate)
+    Args:
+        jd(float): julian day (UT)
+        planet(str): key of hd_constants.SWE_PLANET_DICT
+    Return:
+        longitude(float)
+    '''
+    lon = swe.calc_ut(jd, hd_constants.SWE_PLANET_DICT[planet])[0][0]
+    if planet in ("Earth", "South_Node"):
+        lon = (lon + 180) % 360
+    return lon
+
+def wheel_line(lon):
+    ''' index (0-383) of the line on the rave wheel at a longitude '''
+    angle = (lon + hd_constants.IGING_offset) % 360
+    return min(int(angle / LINE_WIDTH), LINES_PER_WHEEL - 1)
+
+def gate_line(index):
+    ''' (gate, line) of a wheel line index '''
+    return hd_constants.IGING_CIRCLE_LIST[index // 6], index % 6 + 1
+
+def _first_change(planet, jd_start, jd_end, index, tol, width=1):
+    '''
+    bisect the first moment in (jd_start, jd_end] where the wheel index
+    (line index // width, width 6 for gates) differs from index
+    '''
+    while jd_end - jd_start > tol:
+        mid = (jd_start + jd_end) / 2
+        if wheel_line(planet_longitude(mid, planet)) // width == index:
+            jd_start = mid
+        else:
+            jd_end = mid
+    return jd_end
+
+def _iter_ingresses(planet, jd_start, jd_end, step, tol, width):
+    ''' sampled and bisected changes of the wheel index line index // width '''
+    step = step or PLANET_STEPS.get(planet, DEFAULT_STEP)
+    jd = jd_start
+    index = wheel_line(planet_longitude(jd, planet)) // width
+    while jd < jd_end:
+        jd_next = min(jd + step, jd_end)
+        next_index = wheel_line(planet_longitude(jd_next, planet)) // width
+        #more than one crossing per interval (e.g. station at a border) is resolved one by one
+        while next_index != index:
+            crossing = _first_change(planet, jd, jd_next, index, tol, width)
+            new_index = wheel_line(planet_longitude(crossing, planet)) // width
+            yield crossing, planet, index, new_index
+            jd, index = crossing, new_index
+        jd = jd_next
+
+def iter_line_ingresses(planet, jd_start, jd_end, step=None, tol=DEFAULT_TOLERANCE):
+    '''
+    event driven line ingress solver of one planet:
+    positions are sampled every step days, every sample interval with a line change
+    is bisected to the exact crossing time (retrograde passes included)
+    Args:
+        planet(str): key of hd_constants.SWE_PLANET_DICT
+        jd_start, jd_end(float): julian day range (UT)
+        step(float): sampling step in days (default from PLANET_STEPS)
+        tol(float): precision of the crossing times in days
+    Return:
+        generator of (jd, planet, from_index, to_index) in time order
+    '''
+    return _iter_ingresses(planet, jd_start, jd_end, step, tol, 1)
+
+def iter_gate_ingresses(planet, jd_start, jd_end, step=None, tol=DEFAULT_TOLERANCE):
+    '''
+    gate ingress solver of one planet, same sampling as iter_line_ingresses but only
+    gate changes are bisected (line changes within a gate cost no extra positions)
+    Return:
+        generator of (jd, planet, from_gate, gate) in time order
+    '''
+    for jd, planet, from_index, to_index in _iter_ingresses(planet, jd_start, jd_end, step, tol, 6):
+        yield (jd, planet, hd_constants.IGING_CIRCLE_LIST[from_index],
+               hd_constants.IGING_CIRCLE_LIST[to_index])
+
+def line_ingresses(jd_start, jd_end, planets=None, tol=DEFAULT_TOLERANCE):
+    '''
+    line ingresses of several planets merged in time order
+    Args:
+        jd_start, jd_end(float): julian day range (UT)
+        planets(list): keys of SWE_PLANET_DICT, default all
+    Return:
+        generator of (jd, planet, from_index, to_index)
+    '''
+    planets = planets or list(hd_constants.SWE_PLANET_DICT)
+    return heapq.merge(*[iter_line_ingresses(planet, jd_start, jd_end, tol=tol) for planet in planets],
+                       key=lambda event: event[0])
+
+def gate_ingresses(jd_start, jd_end, planets=None, tol=DEFAULT_TOLERANCE):
+    '''
+    gate ingresses of several planets merged in time order (see iter_gate_ingresses)
+    Return:
+        generator of (jd, planet, from_gate, gate)
+    '''
+    planets = planets or list(hd_constants.SWE_PLANET_DICT)
+    return heapq.merge(*[iter_gate_ingresses(planet, jd_start, jd_end, tol=tol) for planet in planets],
+                       key=lambda event: event[0])
+
+def _composite_state(natal_mask, transit_gates):
+    ''' channel mask and defined chakras of natal gates + transit gates '''
+    ch_mask = channel_mask(natal_mask | gate_mask(transit_gates.values()))
+    return ch_mask, chakras_from_channel_mask(ch_mask)
+
+def transit_calendar(natal_gates, jd_start, jd_end, planets=None, tol=DEFAULT_TOLERANCE):
+    '''
+    transit events of a time range against one natal chart:
+        gate_ingress/line_ingress   a transit planet enters a new gate/line
+        channel_formed/dissolved    a composite channel (natal + transit gates) appears/disappears
+        center_defined/undefined    a composite center gets defined/undefined
+    composite events are derived from gate ingresses with bitmask operations,
+    the natal chart enters only as its gate mask
+    Args:
+        natal_gates(iterable): natal gates (personality and design)
+        jd_start, jd_end(float): julian day range (UT)
+        planets(list): transit planets (keys of SWE_PLANET_DICT), default all
+        tol(float): precision of the crossing times in days
+    Return:
+        dict: start (transit positions and composite at jd_start), events (list in time order)
+    '''
+    planets = planets or list(hd_constants.SWE_PLANET_DICT)
+    natal_mask = gate_mask(natal_gates)
+    natal_channels = channel_mask(natal_mask)
+
+    positions = {planet: wheel_line(planet_longitude(jd_start, planet)) for planet in planets}
+    transit_gates = {planet: gate_line(index)[0] for planet, index in positions.items()}
+    ch_mask, chakras = _composite_state(natal_mask, transit_gates)
+    start = {
+        "time": jd_to_iso(jd_start),
+        "positions": [dict(zip(("planet", "gate", "line"), (planet, *gate_line(index))))
+                      for planet, index in positions.items()],
+        "new_channels": channels_from_mask(ch_mask & ~natal_channels),
+        "defined_centers": sorted(chakras),
+    }
+
+    events = []
+    for jd, planet, from_index, to_index in line_ingresses(jd_start, jd_end, planets, tol):
+        from_gate, from_line = gate_line(from_index)
+        gate, line = gate_line(to_index)
+        time = jd_to_iso(jd)
+        events.append({
+            "time": time,
+            "jd": jd,
+            "event": "gate_ingress" if gate != from_gate else "line_ingress",
+            "planet": planet,
+            "gate": gate,
+            "line": line,
+            "from_gate": from_gate,
+            "from_line": from_line,
+        })
+        if gate == from_gate:
+            continue
+        transit_gates[planet] = gate
+        new_ch_mask, new_chakras = _composite_state(natal_mask, transit_gates)
+        for event, mask in (("channel_formed", new_ch_mask & ~ch_mask),
+                            ("channel_dissolved", ch_mask & ~new_ch_mask)):
+            for channel in channels_from_mask(mask):
+                events.append({"time": time, "jd": jd, "event": event, "planet": planet,
+                               "channel": channel})
+        for event, centers in (("center_defined", new_chakras - chakras),
+                               ("center_undefined", chakras - new_chakras)):
+            for center in sorted(centers):
+                events.append({"time": time, "jd": jd, "event": event, "planet": planet,
+                               "center": center})
+        ch_mask, chakras = new_ch_mask, new_chakras
+
+    return {"start": start, "events": events}
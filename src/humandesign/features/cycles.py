@@ -0,0 +1,205 @@
+import functools
+import numpy as np
+import swisseph as swe
+from .. import hd_constants
+from .crossings import jd_to_iso, DEFAULT_TOLERANCE
+
+#named life cycles: (transit planet, aspect offset in degrees to the natal position of the same planet)
+NAMED_CYCLES = {"jupiter_return": ("Jupiter", 0),
+                "saturn_return": ("Saturn", 0),
+                "saturn_opposition": ("Saturn", 180),
+                "uranus_square": ("Uranus", 90),
+                "uranus_opposition": ("Uranus", 180),
+                "neptune_square": ("Neptune", 90),
+                "pluto_square": ("Pluto", 90),
+                "nodal_return": ("North_Node", 0),
+               }
+
+#tabulation step in days per planet: small enough that a longitude target is crossed
+#at most once per step outside of stations (stations are resolved separately)
+DEFAULT_CYCLE_STEP = 8
+CYCLE_STEPS = {"Moon": 0.5,
+               "Sun": 5,
+               "Earth": 5,
+               "Mercury": 2,
+               "Venus": 2,
+               "Mars": 4,
+               "North_Node": 2,
+               "South_Node": 2,
+               "Jupiter": 4,
+              }
+#samples per cached table chunk
+CHUNK_SIZE = 512
+
+def planet_position(jd, planet):
+    '''
+    longitude and longitude speed (deg/day) of a planet of SWE_PLANET_DICT,
+    Earth and South_Node are opposite to Sun and North_Node
+    Return:
+        (longitude, speed)
+    '''
+    xx = swe.calc_ut(jd, hd_constants.SWE_PLANET_DICT[planet])[0]
+    lon = xx[0]
+    if planet in ("Earth", "South_Node"):
+        lon = (lon + 180) % 360
+    return lon, xx[3]
+
+@functools.lru_cache(maxsize=256)
+def _table_chunk(planet, step, chunk):
+    ''' positions of CHUNK_SIZE + 1 samples starting at jd chunk * CHUNK_SIZE * step (global grid) '''
+    jds = (chunk * CHUNK_SIZE + np.arange(CHUNK_SIZE + 1)) * step
+    positions = np.array([planet_position(jd, planet) for jd in jds])
+    return jds, positions[:, 0], positions[:, 1]
+
+def position_table(planet, jd_start, jd_end, step=None):
+    '''
+    tabulated positions of a planet on a global grid of step days covering [jd_start, jd_end],
+    chunks of the grid are cached and shared by all queries
+    Args:
+        planet(str): key of hd_constants.SWE_PLANET_DICT
+        jd_start, jd_end(float): julian day range (UT)
+        step(float): grid step in days (default from CYCLE_STEPS)
+    Return:
+        jds, longitudes, speeds (np.ndarray)
+    '''
+    step = step or CYCLE_STEPS.get(planet, DEFAULT_CYCLE_STEP)
+    first = int(np.floor(jd_start / step))
+    last = int(np.ceil(jd_end / step))
+    parts = []
+    for chunk in range(first // CHUNK_SIZE, last // CHUNK_SIZE + 1):
+        jds, lons, speeds = _table_chunk(planet, step, chunk)
+        parts.append((jds[:-1], lons[:-1], speeds[:-1]))
+    parts.append((jds[-1:], lons[-1:], speeds[-1:]))
+    jds, lons, speeds = (np.concatenate(column) for column in zip(*parts))
+    offset = first - (first // CHUNK_SIZE) * CHUNK_SIZE
+    window = slice(offset, offset + last - first + 1)
+    return jds[window], lons[window], speeds[window]
+
+def _station(planet, jd_lo, jd_hi, tol):
+    ''' bisect the station (speed sign change) inside [jd_lo, jd_hi] '''
+    sign_lo = planet_position(jd_lo, planet)[1] > 0
+    while jd_hi - jd_lo > tol:
+        mid = (jd_lo + jd_hi) / 2
+        if (planet_position(mid, planet)[1] > 0) == sign_lo:
+            jd_lo = mid
+        else:
+            jd_hi = mid
+    return (jd_lo + jd_hi) / 2
+
+def _refine(planet, target, jd_lo, jd_hi, tol, max_iter=50):
+    '''
+    crossing time of target longitude inside the bracket [jd_lo, jd_hi]:
+    Newton steps with the longitude speed, bisection if a step leaves the bracket
+    '''
+    d_lo = swe.difdeg2n(planet_position(jd_lo, planet)[0], target)
+    jd = jd_lo + (jd_hi - jd_lo) / 2
+    for _ in range(max_iter):
+        lon, speed = planet_position(jd, planet)
+        d = swe.difdeg2n(lon, target)
+        #keep the bracket around the root
+        if (d > 0) == (d_lo > 0):
+            jd_lo, d_lo = jd, d
+        else:
+            jd_hi = jd
+        jd_next = jd - d / speed if speed else None
+        if jd_next is None or not jd_lo <= jd_next <= jd_hi:
+            jd_next = (jd_lo + jd_hi) / 2
+        if abs(jd_next - jd) < tol or jd_hi - jd_lo < tol:
+            return jd_next
+        jd = jd_next
+    return jd
+
+def find_longitude_crossings(planet, targets, jd_start, jd_end, tol=DEFAULT_TOLERANCE):
+    '''
+    all moments in [jd_start, jd_end] when a planet reaches the target longitudes,
+    direct and retrograde passes included.
+    crossings are bracketed on the tabulated positions (vectorized for all targets),
+    intervals with a station are split at the station, roots are refined with Newton steps
+    Args:
+        planet(str): key of hd_constants.SWE_PLANET_DICT
+        targets(iterable): target longitudes (degrees)
+        jd_start, jd_end(float): julian day range (UT)
+        tol(float): precision of the crossing times in days
+    Return:
+        dict: target -> list of (jd, speed) in time order
+    '''
+    jds, lons, speeds = position_table(planet, jd_start, jd_end)
+    stations = np.flatnonzero(np.sign(speeds[:-1]) != np.sign(speeds[1:]))
+    #max. motion inside a station interval (speed is below the end point speeds near a station)
+    reach = 2 * (jds[1] - jds[0]) * np.maximum(np.abs(speeds[:-1]), np.abs(speeds[1:]))
+    station_jds = {}
+
+    result = {}
+    for target in targets:
+        diff = (lons - target + 180) % 360 - 180
+        #sign change without the +-180 wrap (opposite side of the wheel)
+        brackets = np.flatnonzero((np.signbit(diff[:-1]) != np.signbit(diff[1:]))
+                                  & (np.abs(diff[:-1] - diff[1:]) < 180))
+        intervals = {int(i): [(jds[i], jds[i + 1])] for i in brackets}
+        #a station close to the target may hide two crossings (or one on either side) in one interval,
+        #stations are located lazily and shared by all targets
+        near = stations[np.minimum(np.abs(diff[stations]), np.abs(diff[stations + 1])) < reach[stations]]
+        for i in (int(i) for i in near):
+            if i not in station_jds:
+                station_jds[i] = _station(planet, jds[i], jds[i + 1], tol)
+            jd_station = station_jds[i]
+            d_station = swe.difdeg2n(planet_position(jd_station, planet)[0], target)
+            pieces = []
+            for jd_lo, jd_hi, d_lo, d_hi in ((jds[i], jd_station, diff[i], d_station),
+                                             (jd_station, jds[i + 1], d_station, diff[i + 1])):
+                if (d_lo > 0) != (d_hi > 0) and abs(d_lo - d_hi) < 180:
+                    pieces.append((jd_lo, jd_hi))
+            intervals[i] = pieces
+        crossings = []
+        for i in sorted(intervals):
+            for jd_lo, jd_hi in intervals[i]:
+                jd = _refine(planet, target, jd_lo, jd_hi, tol)
+                if jd_start < jd <= jd_end:
+                    crossings.append((jd, planet_position(jd, planet)[1]))
+        result[target] = crossings
+    return result
+
+def find_cycles(natal_lons, cycles, jd_start, jd_end, tol=DEFAULT_TOLERANCE):
+    '''
+    planetary returns and aspect cycles (e.g. Saturn return, Uranus opposition) against natal positions
+    cycles of the same transit planet share one position table
+    Args:
+        natal_lons(dict): natal planet -> longitude (e.g. personality positions)
+        cycles(list): cycle names of NAMED_CYCLES or dicts with keys
+                      planet, aspect (degrees, default 0), natal_planet (default planet)
+        jd_start, jd_end(float): julian day range (UT)
+    Return:
+        list of dicts (cycle, planet, natal_planet, aspect, target_lon,
+                       passes [time, jd, direction, pass]) in order of cycles
+    '''
+    specs = []
+    for cycle in cycles:
+        if isinstance(cycle, str):
+            if cycle not in NAMED_CYCLES:
+                raise ValueError("unknown cycle {}, use one of {}".format(cycle, list(NAMED_CYCLES)))
+            planet, aspect = NAMED_CYCLES[cycle]
+            spec = {"cycle": cycle, "planet": planet, "natal_planet": planet, "aspect": aspect}
+        else:
+            planet = cycle["planet"]
+            aspect = cycle.get("aspect", 0)
+            natal_planet = cycle.get("natal_planet") or planet
+            spec = {"cycle": cycle.get("cycle") or "{}_{}_{}".format(planet, aspect, natal_planet).lower(),
+                    "planet": planet, "natal_planet": natal_planet, "aspect": aspect}
+        if spec["planet"] not in hd_constants.SWE_PLANET_DICT or spec["natal_planet"] not in natal_lons:
+            raise ValueError("unknown planet in cycle {}, use keys of SWE_PLANET_DICT".format(spec["cycle"]))
+        spec["target_lon"] = (natal_lons[spec["natal_planet"]] + spec["aspect"]) % 360
+        specs.append(spec)
+
+    targets = {}
+    for spec in specs:
+        targets.setdefault(spec["planet"], set()).add(spec["target_lon"])
+    crossings = {planet: find_longitude_crossings(planet, planet_targets, jd_start, jd_end, tol)
+                 for planet, planet_targets in targets.items()}
+
+    for spec in specs:
+        spec["passes"] = [{"time": jd_to_iso(jd),
+                           "jd": jd,
+                           "direction": "direct" if speed >= 0 else "retrograde",
+                           "pass": n + 1}
+                          for n, (jd, speed) in enumerate(crossings[spec["planet"]][spec["target_lon"]])]
+    return specs
@@ -0,0 +1,103 @@
+import numpy as np
+from .. import hd_constants
+from .mechanics import CHANNEL_LIST, CHANNEL_CHAKRAS
+
+#circuit groups of new channel counts (order of the "circuitry" axis)
+CIRCUIT_GROUPS = ["Individual", "Tribal", "Collective", "Integration"]
+
+#gate columns of all channels (CHANNEL_LIST order), gate g -> column g-1
+CHANNEL_GATE_1 = np.array([g1 - 1 for g1, _ in CHANNEL_LIST])
+CHANNEL_GATE_2 = np.array([g2 - 1 for _, g2 in CHANNEL_LIST])
+
+#(36 x 4) channel -> circuit group one hot matrix
+CHANNEL_CIRCUIT_GROUPS = np.array([
+    [hd_constants.circuit_group_typ_dict.get(
+        hd_constants.circuit_typ_dict.get(tuple(sorted(channel)), "Unknown"), "Unknown") == group
+     for group in CIRCUIT_GROUPS]
+    for channel in CHANNEL_LIST
+], dtype=np.float32)
+
+#(36 x 9) channel -> chakra matrix (CHAKRA_LIST order)
+CHANNEL_CENTERS = np.array([
+    [chakra in chakras for chakra in hd_constants.CHAKRA_LIST] for chakras in CHANNEL_CHAKRAS
+], dtype=np.float32)
+
+def gate_matrix(gates_list):
+    '''
+    (N x 64) bool matrix of activated gates, column g-1 = gate g
+    Args:
+        gates_list(list): gate iterables per person
+    Return:
+        np.ndarray bool
+    '''
+    matrix = np.zeros((len(gates_list), 64), dtype=bool)
+    for row, gates in enumerate(gates_list):
+        matrix[row, [int(g) - 1 for g in gates]] = True
+    return matrix
+
+def dyad_matrices(persons, block_size=128):
+    '''
+    pairwise Maia metrics of all pairs at once as dense (N x N) arrays
+    per channel and person: full (both gates), a_only, b_only, none
+    all pair counts are matrix products of these (N x 36) matrices:
+        companionship   channel defined by both alone                    full @ full.T
+        dominance       defined by one alone, other has neither gate     full @ none.T (+ transposed)
+        compromise      defined by one alone, other has one gate          full @ one.T (+ transposed)
+        electromagnetic each has the other gate (= new channels)          a_only @ b_only.T (+ transposed)
+    composite centers are counted in row blocks of block_size (memory N x block_size x 36)
+    the diagonal is a person paired with itself
+    Args:
+        persons(dict): id -> gates (iterable), e.g. date_to_gate_dict["gate"]
+        block_size(int): rows per block of the center count
+    Return:
+        dict: ids(list),
+              companionship, dominance, compromise, electromagnetic, new_channels,
+              composite_centers (N x N int arrays, symmetric),
+              circuitry (N x N x 4 int array, new channels per CIRCUIT_GROUPS)
+    '''
+    ids = list(persons)
+    gates = gate_matrix([persons[p] for p in ids])
+    has_1 = gates[:, CHANNEL_GATE_1]
+    has_2 = gates[:, CHANNEL_GATE_2]
+    #float32 products use BLAS and are exact for counts <= 36
+    full = (has_1 & has_2).astype(np.float32)
+    one = (has_1 ^ has_2).astype(np.float32)
+    none = (~has_1 & ~has_2).astype(np.float32)
+    only_1 = (has_1 & ~has_2).astype(np.float32)
+    only_2 = (~has_1 & has_2).astype(np.float32)
+
+    def symmetric(left, right):
+        product = left @ right.T
+        return (product + product.T).astype(np.int32)
+
+    companionship = (full @ full.T).astype(np.int32)
+    dominance = symmetric(full, none)
+    compromise = symmetric(full, one)
+    electromagnetic = symmetric(only_1, only_2)
+
+    #new channels per circuit group: weight the channel columns of one side by group
+    circuitry = np.stack([
+        symmetric(only_1 * CHANNEL_CIRCUIT_GROUPS[:, g], only_2)
+        for g in range(len(CIRCUIT_GROUPS))
+    ], axis=-1)
+
+    #composite channel defined, if the union of both persons has both gates
+    n = len(ids)
+    composite_centers = np.zeros((n, n), dtype=np.int32)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        defined = ((has_1[start:stop, None, :] | has_1[None, :, :])
+                   & (has_2[start:stop, None, :] | has_2[None, :, :]))
+        centers = defined.astype(np.float32) @ CHANNEL_CENTERS
+        composite_centers[start:stop] = (centers > 0).sum(axis=-1)
+
+    return {
+        "ids": ids,
+        "companionship": companionship,
+        "dominance": dominance,
+        "compromise": compromise,
+        "electromagnetic": electromagnetic,
+        "new_channels": electromagnetic,
+        "composite_centers": composite_centers,
+        "circuitry": circuitry,
+    }
@@ -0,0 +1,370 @@
+import functools
+import itertools
+from .. import hd_constants
+from .core import calc_single_hd_features, unpack_single_features
+from .mechanics import (
+    gate_mask,
+    channel_mask,
+    channels_from_mask,
+    chakras_from_channel_mask,
+    channel_ids,
+    active_channels_from_mask,
+    get_typ,
+    get_auth,
+    get_definition,
+    CHANNEL_LIST,
+    CHANNEL_GATE_MASKS,
+    CHANNEL_CHAKRAS,
+    GATE_CHANNEL_IDS
+)
+from .penta import penta_mask, penta_scores
+
+class PersonChart:
+    '''
+    chart of one person, calculated once and reused for every composite combination
+        hd_data(dict): unpacked calc_single_hd_features result (see unpack_single_features)
+        gates(set): all activated gates (personality + design)
+        gate_mask(int): bitmask of gates, bit g = gate g
+        channel_mask(int): bitmask of defined channels, bit = channel id (see mechanics.CHANNEL_LIST)
+        chakras(set): defined chakras
+    '''
+    def __init__(self, name, timestamp, hd_data):
+        self.name = name
+        self.timestamp = timestamp
+        self.hd_data = hd_data
+        self.gates = set(int(g) for g in hd_data["date_to_gate_dict"]["gate"])
+        self.gate_mask = gate_mask(self.gates)
+        self.channel_mask = channel_mask(self.gate_mask)
+        self.chakras = chakras_from_channel_mask(self.channel_mask)
+
+    @classmethod
+    def from_timestamp(cls, name, timestamp, channel_meaning=False):
+        ''' calculate chart of timestamp (year,month,day,hour,minute,second,tz_offset) '''
+        single_result = calc_single_hd_features(timestamp, report=False, channel_meaning=channel_meaning)
+        return cls(name, timestamp, unpack_single_features(single_result))
+
+class GroupCompositeEngine:
+    '''
+    composite charts of all pairs of a group
+    every participant chart is calculated once (memoized), pairs are derived from
+    cached gate and channel masks without further ephemeris calculations
+    Args:
+        persons_dict(dict): eg {"person1":(2022,2,2,2,22,0,2),"person2":(1922,2,2,2,22,0,2)}
+        charts(dict): optional precalculated PersonChart objects by key
+    '''
+    def __init__(self, persons_dict, charts=None):
+        self.persons_dict = persons_dict
+        self.charts = dict(charts or {})
+
+    def chart(self, key):
+        ''' PersonChart of key, calculated on first access '''
+        if key not in self.charts:
+            self.charts[key] = PersonChart.from_timestamp(key, self.persons_dict[key])
+        return self.charts[key]
+
+    def pair(self, identity, other_person):
+        '''
+        composite features of two identities
+        Return:
+            dict: new_channels(list): channels only defined in composite chart, e.g. [(20,34)]
+                  duplicated_channels(list): channels defined in both persons
+                  new_chakras(set): chakras of composite not defined in identity
+                  composite_chakras(set): all chakras of composite chart
+        '''
+        id_chart = self.chart(identity)
+        other_chart = self.chart(other_person)
+        composite_channels = channel_mask(id_chart.gate_mask | other_chart.gate_mask)
+        composite_chakras = chakras_from_channel_mask(composite_channels)
+        new_channels = composite_channels & ~(id_chart.channel_mask | other_chart.channel_mask)
+        duplicated_channels = id_chart.channel_mask & other_chart.channel_mask
+
+        return {
+            "new_channels": channels_from_mask(new_channels),
+            "duplicated_channels": channels_from_mask(duplicated_channels),
+            "new_chakras": composite_chakras - id_chart.chakras,
+            "composite_chakras": composite_chakras,
+        }
+
+    def combinations(self):
+        ''' (identity, other_person, pair features) of every pair combination '''
+        for identity, other_person in itertools.combinations(self.persons_dict.keys(), 2):
+            yield identity, other_person, self.pair(identity, other_person)
+
+    def records(self):
+        ''' composite features of every pair combination as list of dicts (see COMPOSITE_COLUMNS) '''
+        return [composite_record(identity, other_person, pair)
+                for identity, other_person, pair in self.combinations()]
+
+#keys of composite records, column order of get_composite_combinations
+COMPOSITE_COLUMNS = ["id", "other_person", "new_chakra", "chakra_count", "new_channels",
+                     "new_ch_meaning", "duplicated_channels", "duplicated_ch_meaning"]
+
+def channel_meanings(channels):
+    ''' meanings of channels in gate tuple format '''
+    return [hd_constants.CHANNEL_MEANING_DICT[channel] for channel in channels]
+
+def channel_details(channels):
+    ''' channels in gate tuple format as list of dicts {"gate","ch_gate","meaning"} '''
+    return [{"gate": g1, "ch_gate": g2, "meaning": hd_constants.CHANNEL_MEANING_DICT[(g1, g2)]}
+            for g1, g2 in channels]
+
+def composite_record(identity, other_person, pair):
+    ''' plain dict of one pair combination (GroupCompositeEngine.pair result) '''
+    return {
+        "id": identity,
+        "other_person": other_person,
+        "new_chakra": sorted(pair["new_chakras"]),
+        "chakra_count": len(pair["composite_chakras"]),
+        "new_channels": pair["new_channels"],
+        "new_ch_meaning": channel_meanings(pair["new_channels"]),
+        "duplicated_channels": pair["duplicated_channels"],
+        "duplicated_ch_meaning": channel_meanings(pair["duplicated_channels"]),
+    }
+
+def get_composite_records(persons_dict, charts=None):
+    '''
+    pandas free version of get_composite_combinations
+    Args:
+        persons_dict(dict): eg {"person1":(2022,2,2,2,22,0,2),"person2":(1922,2,2,2,22,0,2)}
+        charts(dict): optional precalculated PersonChart objects by key
+    Return:
+        list of dict: composite features of every pair combination (keys see COMPOSITE_COLUMNS)
+    '''
+    return GroupCompositeEngine(persons_dict, charts).records()
+
+def composite_pair(persons_dict, identity, other_person):
+    '''
+    pandas free version of composite_chakras_channels
+    Args:
+        persons_dict(dict): eg {"person1":(2022,2,2,2,22,0,2),"person2":(1922,2,2,2,22,0,2)}
+        identity: person1 (in person dict)
+        other_person: person2 (in person dict)
+    Return:
+        dict: new_channels(list): channels of composite chart, not defined in one person alone
+                                  format: [{"gate":20,"ch_gate":34,"meaning":[name,description]}]
+              duplicated_channels(list): channels that are present in both persons (same format)
+              new_chakras(set): new chakras that are activated by connecting gates of both persons
+              composite_chakras(set): all chakras in new composite chart
+    '''
+    pair = GroupCompositeEngine(persons_dict).pair(identity, other_person)
+    return {
+        "new_channels": channel_details(pair["new_channels"]),
+        "duplicated_channels": channel_details(pair["duplicated_channels"]),
+        "new_chakras": pair["new_chakras"],
+        "composite_chakras": pair["composite_chakras"],
+    }
+
+@functools.lru_cache(maxsize=4096)
+def composite_mechanics(ch_mask):
+    '''
+    type, authority and definition of a composite channel mask (memoized, groups that
+    toggle between the same members hit the cache)
+    Return:
+        typ(str), auth(str), definition(int)
+    '''
+    active_channels_dict = active_channels_from_mask(ch_mask)
+    active_chakras = chakras_from_channel_mask(ch_mask)
+    return (get_typ(active_channels_dict, active_chakras),
+            get_auth(active_chakras, active_channels_dict),
+            get_definition(active_channels_dict, active_chakras))
+
+class GroupComposite:
+    '''
+    composite chart of N persons with incremental member add/remove
+    keeps per gate owner counts, the union gate mask, composite channels and
+    per chakra channel counts up to date, an update only touches the channels of gates
+    that switch between owned and not owned (O(changed gates))
+    type, authority and definition are derived lazily from the channel mask
+    Args:
+        members(dict): optional name -> gates (iterable), PersonChart or gate mask (int)
+    '''
+    def __init__(self, members=None):
+        self.member_masks = {}
+        self.member_channels = {}
+        self.owner_counts = [0] * 65
+        self.gate_mask = 0
+        self.channel_mask = 0
+        self.chakra_counts = {chakra: 0 for chakra in hd_constants.CHAKRA_LIST}
+        #number of members that define a channel alone (new channels have 0)
+        self.solo_counts = [0] * len(CHANNEL_GATE_MASKS)
+        for name, gates in (members or {}).items():
+            self.add(name, gates)
+
+    @staticmethod
+    def _member_mask(gates):
+        if isinstance(gates, PersonChart):
+            return gates.gate_mask
+        if isinstance(gates, int):
+            return gates
+        return gate_mask(gates)
+
+    @staticmethod
+    def _gate_bits(mask):
+        gate = 1
+        mask >>= 1
+        while mask:
+            if mask & 1:
+                yield gate
+            mask >>= 1
+            gate += 1
+
+    def _toggle_channel(self, ch_id, on):
+        bit = 1 << ch_id
+        if bool(self.channel_mask & bit) == on:
+            return
+        self.channel_mask ^= bit
+        step = 1 if on else -1
+        for chakra in CHANNEL_CHAKRAS[ch_id]:
+            self.chakra_counts[chakra] += step
+
+    def add(self, name, gates):
+        ''' add (or replace) member name '''
+        if name in self.member_masks:
+            self.remove(name)
+        mask = self._member_mask(gates)
+        self.member_masks[name] = mask
+        self.member_channels[name] = channel_ids(channel_mask(mask))
+        for gate in self._gate_bits(mask):
+            self.owner_counts[gate] += 1
+            if self.owner_counts[gate] == 1:
+                self.gate_mask |= 1 << gate
+                for ch_id in GATE_CHANNEL_IDS[gate]:
+                    ch_gates = CHANNEL_GATE_MASKS[ch_id]
+                    if self.gate_mask & ch_gates == ch_gates:
+                        self._toggle_channel(ch_id, True)
+        for ch_id in self.member_channels[name]:
+            self.solo_counts[ch_id] += 1
+
+    def remove(self, name):
+        ''' remove member name (KeyError if unknown) '''
+        mask = self.member_masks.pop(name)
+        for ch_id in self.member_channels.pop(name):
+            self.solo_counts[ch_id] -= 1
+        for gate in self._gate_bits(mask):
+            self.owner_counts[gate] -= 1
+            if self.owner_counts[gate] == 0:
+                self.gate_mask &= ~(1 << gate)
+                for ch_id in GATE_CHANNEL_IDS[gate]:
+                    self._toggle_channel(ch_id, False)
+
+    def __contains__(self, name):
+        return name in self.member_masks
+
+    def __len__(self):
+        return len(self.member_masks)
+
+    @property
+    def members(self):
+        return list(self.member_masks)
+
+    @property
+    def gates(self):
+        ''' set of gates owned by at least one member '''
+        return set(self._gate_bits(self.gate_mask))
+
+    def owners(self, gate):
+        ''' members that own gate '''
+        return [name for name, mask in self.member_masks.items() if mask >> gate & 1]
+
+    @property
+    def channels(self):
+        ''' composite channels in gate tuple format '''
+        return channels_from_mask(self.channel_mask)
+
+    @property
+    def new_channels(self):
+        ''' composite channels that no member defines alone '''
+        return [CHANNEL_LIST[ch_id] for ch_id in channel_ids(self.channel_mask) if not self.solo_counts[ch_id]]
+
+    @property
+    def chakras(self):
+        ''' defined chakras of the composite '''
+        return {chakra for chakra, count in self.chakra_counts.items() if count}
+
+    @property
+    def typ(self):
+        return composite_mechanics(self.channel_mask)[0]
+
+    @property
+    def auth(self):
+        return composite_mechanics(self.channel_mask)[1]
+
+    @property
+    def definition(self):
+        return composite_mechanics(self.channel_mask)[2]
+
+    def summary(self):
+        ''' plain dict of the composite: members, gates, channels, new_channels, chakras, typ, auth, definition '''
+        typ, auth, definition = composite_mechanics(self.channel_mask)
+        return {
+            "members": self.members,
+            "gates": sorted(self.gates),
+            "channels": self.channels,
+            "new_channels": self.new_channels,
+            "chakras": sorted(self.chakras, key=hd_constants.CHAKRA_LIST.index),
+            "typ": typ,
+            "auth": auth,
+            "definition": definition,
+        }
+
+
+def _sorted_chakras(chakras):
+    return sorted(chakras, key=hd_constants.CHAKRA_LIST.index)
+
+def transit_overlay(members, transit_gates, transit_name="transit"):
+    '''
+    overlay of one transit on every member and on the group composite
+    the transit enters as one gate mask, per member the overlay is two channel mask
+    calculations, the group composite is updated incrementally (GroupComposite.add)
+    Args:
+        members(dict): name -> gates (iterable), PersonChart or gate mask (int)
+        transit_gates(iterable): transit gates (e.g. day chart gates)
+        transit_name(str): member name of the transit in the group composite, a suffix
+                           ("transit_2", ...) is added if a member has the same name
+    Return:
+        dict: transit_name (name used for the transit),
+              members (name -> new_channels, new_centers, composite typ),
+              group (before/after summary, new_channels, new_centers),
+              penta (before/after penta_scores, activated_channels)
+    '''
+    transit_mask = gate_mask(transit_gates)
+    group = GroupComposite(members)
+    #the transit must not replace a member of the same name
+    base_name, suffix = transit_name, 1
+    while transit_name in group:
+        suffix += 1
+        transit_name = "{}_{}".format(base_name, suffix)
+
+    member_overlay = {}
+    for name, mask in group.member_masks.items():
+        natal_channels = channel_mask(mask)
+        composite_channels = channel_mask(mask | transit_mask)
+        member_overlay[name] = {
+            "new_channels": channels_from_mask(composite_channels & ~natal_channels),
+            "new_centers": _sorted_chakras(chakras_from_channel_mask(composite_channels)
+                                           - chakras_from_channel_mask(natal_channels)),
+            "typ": composite_mechanics(composite_channels)[0],
+        }
+
+    before = group.summary()
+    penta_before = penta_scores(penta_mask(group.gates))
+    group.add(transit_name, transit_mask)
+    after = group.summary()
+    penta_after = penta_scores(penta_mask(group.gates))
+
+    return {
+        "transit_name": transit_name,
+        "members": member_overlay,
+        "group": {
+            "before": before,
+            "after": after,
+            "new_channels": [ch for ch in after["channels"] if ch not in before["channels"]],
+            "new_centers": [c for c in after["chakras"] if c not in before["chakras"]],
+        },
+        "penta": {
+            "before": penta_before,
+            "after": penta_after,
+            "activated_channels": [ch for ch in penta_after["active_channels"]
+                                   if ch not in penta_before["active_channels"]],
+        },
+    }
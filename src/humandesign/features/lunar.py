@@ -0,0 +1,243 @@
+import functools
+import os
+import tempfile
+import numpy as np
+import swisseph as swe
+from .. import hd_constants
+from .crossings import LINES_PER_WHEEL, LINE_WIDTH, DEFAULT_TOLERANCE, jd_to_iso
+from .mechanics import (
+    full_dict,
+    gate_mask,
+    channel_mask,
+    channels_from_mask,
+    chakras_from_channel_mask
+)
+
+#years covered by the lunar ingress table (one npz file per year)
+LUNAR_TABLE_YEARS = (1800, 2100)
+DEFAULT_TABLE_DIR = os.getenv("HD_LUNAR_TABLE_DIR", ".hd_lunar")
+
+#sampling step of the table build in days, the Moon moves ~0.55 deg (~0.6 lines) per hour
+LUNAR_SAMPLE_STEP = 1 / 24
+
+#wheel line index -> gate / line
+LINE_GATES = np.repeat(np.array(hd_constants.IGING_CIRCLE_LIST), 6)
+LINE_LINES = np.tile(np.arange(1, 7), 64)
+
+def _year_range(year):
+    ''' julian days (UT) of Jan 1 00:00 of year and of the following year '''
+    return swe.julday(year, 1, 1, 0), swe.julday(year + 1, 1, 1, 0)
+
+def _moon(jd):
+    ''' wheel angle (longitude + IGING_offset) and speed of the Moon '''
+    xx = swe.calc_ut(jd, hd_constants.SWE_PLANET_DICT["Moon"])[0]
+    return (xx[0] + hd_constants.IGING_offset) % 360, xx[3]
+
+def calc_lunar_ingresses(jd_start, jd_end, tol=DEFAULT_TOLERANCE):
+    '''
+    all line ingresses of the Moon in (jd_start, jd_end]
+    the Moon is never retrograde, so every line border is crossed exactly once:
+    border crossings are interpolated on an hourly grid and refined with Newton steps
+    Args:
+        jd_start, jd_end(float): julian day range (UT)
+        tol(float): precision of the ingress times in days
+    Return:
+        jds(np.ndarray float64), indices(np.ndarray uint16, wheel line index entered)
+    '''
+    grid = np.append(np.arange(jd_start, jd_end, LUNAR_SAMPLE_STEP), jd_end)
+    angles = np.array([_moon(jd)[0] for jd in grid])
+    #continuous wheel angle
+    unwrapped = angles + 360 * np.concatenate(([0], np.cumsum(np.diff(angles) < 0)))
+
+    borders = np.arange(np.floor(unwrapped[0] / LINE_WIDTH) + 1,
+                        np.floor(unwrapped[-1] / LINE_WIDTH) + 1) * LINE_WIDTH
+    i = np.searchsorted(unwrapped, borders) - 1
+    fraction = (borders - unwrapped[i]) / (unwrapped[i + 1] - unwrapped[i])
+    jds = grid[i] + fraction * (grid[i + 1] - grid[i])
+    targets = borders % 360
+
+    for n in range(len(jds)):
+        for _ in range(10):
+            angle, speed = _moon(jds[n])
+            delta = ((angle - targets[n] + 180) % 360 - 180) / speed
+            jds[n] -= delta
+            if abs(delta) < tol:
+                break
+    indices = (np.rint(borders / LINE_WIDTH).astype(np.int64) % LINES_PER_WHEEL).astype(np.uint16)
+    return jds, indices
+
+def build_lunar_table(start_year=LUNAR_TABLE_YEARS[0], end_year=LUNAR_TABLE_YEARS[1], table_dir=None):
+    '''
+    precompute the lunar ingress table of the years start_year..end_year (inclusive),
+    years already stored are skipped (~1 s per year, the full 1800-2100 table takes a few minutes)
+    Return:
+        number of newly calculated years
+    '''
+    added = 0
+    for year in range(start_year, end_year + 1):
+        path = _table_path(year, table_dir)
+        if not os.path.exists(path):
+            _store_year(year, path)
+            added += 1
+    return added
+
+def _table_path(year, table_dir=None):
+    return os.path.join(table_dir or DEFAULT_TABLE_DIR, "moon_ingresses_{}.npz".format(year))
+
+def _store_year(year, path):
+    jds, indices = calc_lunar_ingresses(*_year_range(year))
+    table_dir = os.path.dirname(path)
+    os.makedirs(table_dir, exist_ok=True)
+    #write to a unique temporary file first, concurrent readers only see complete tables
+    #and concurrent writers of the same year do not share a file
+    fd, tmp_path = tempfile.mkstemp(dir=table_dir, suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, jd=jds, index=indices)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return jds, indices
+
+@functools.lru_cache(maxsize=32)
+def lunar_ingress_year(year, table_dir=None):
+    '''
+    lunar line ingresses of one calendar year (UT), loaded from the npz table
+    or calculated and stored on first use
+    Args:
+        year(int): year within LUNAR_TABLE_YEARS
+        table_dir(str): table directory (default HD_LUNAR_TABLE_DIR or .hd_lunar)
+    Return:
+        jds(np.ndarray), indices(np.ndarray)
+    '''
+    if not LUNAR_TABLE_YEARS[0] <= year <= LUNAR_TABLE_YEARS[1]:
+        raise ValueError("lunar ingress table covers the years {}-{}".format(*LUNAR_TABLE_YEARS))
+    path = _table_path(year, table_dir)
+    if os.path.exists(path):
+        with np.load(path) as table:
+            return table["jd"], table["index"]
+    return _store_year(year, path)
+
+def lunar_ingresses(jd_start, jd_end, table_dir=None):
+    '''
+    lunar line ingresses in (jd_start, jd_end] from the table (binary search per year)
+    Return:
+        index(int): wheel line index of the Moon at jd_start
+        jds(np.ndarray), indices(np.ndarray): ingress times and wheel line indices entered
+    '''
+    first_year = int(swe.revjul(jd_start)[0])
+    last_year = int(swe.revjul(jd_end)[0])
+    parts = []
+    for year in range(first_year, last_year + 1):
+        jds, indices = lunar_ingress_year(year, table_dir)
+        lo, hi = np.searchsorted(jds, [jd_start, jd_end], side="right")
+        if year == first_year:
+            #the Moon moves forward only: the line before the first ingress precedes its index
+            index = int(indices[lo - 1]) if lo else (int(indices[0]) - 1) % LINES_PER_WHEEL
+        parts.append((jds[lo:hi], indices[lo:hi]))
+    jds = np.concatenate([part[0] for part in parts])
+    indices = np.concatenate([part[1] for part in parts])
+    return index, jds, indices
+
+def moon_positions(jds, table_dir=None):
+    '''
+    vectorized gate/line of the Moon at many moments (e.g. an hourly grid)
+    Args:
+        jds(array-like): julian days (UT) in ascending order
+    Return:
+        gates(np.ndarray), lines(np.ndarray)
+    '''
+    jds = np.asarray(jds, dtype=float)
+    index, ingress_jds, indices = lunar_ingresses(jds[0], jds[-1], table_dir)
+    states = np.concatenate(([index], indices))
+    current = states[np.searchsorted(ingress_jds, jds, side="right")]
+    return LINE_GATES[current], LINE_LINES[current]
+
+def _gate_effects(natal_mask):
+    ''' composite effect of every possible Moon gate against a natal gate mask '''
+    natal_channels = channel_mask(natal_mask)
+    natal_chakras = chakras_from_channel_mask(natal_channels)
+    effects = {}
+    for gate in range(1, 65):
+        composite = channel_mask(natal_mask | 1 << gate) & ~natal_channels
+        channels = channels_from_mask(composite)
+        effects[gate] = {
+            "center": full_dict["full_gate_chakra_dict"][gate],
+            "hanging_gates": sorted(g for channel in channels for g in channel if g != gate),
+            "new_channels": channels,
+            "new_centers": sorted(chakras_from_channel_mask(composite | natal_channels) - natal_chakras,
+                                  key=hd_constants.CHAKRA_LIST.index),
+        }
+    return effects, natal_chakras
+
+def lunar_forecast(natal_gates, jd_start, jd_end, resolution="gate", hourly=False, table_dir=None):
+    '''
+    lunar transit forecast against one natal chart (e.g. a 28 day Reflector cycle):
+    every Moon gate (or line) period with the open center it conditions, the hanging natal
+    gates it bridges and the composite channels/centers it forms.
+    the Moon positions come from the ingress table, the effect of each of the 64 gates
+    on the natal mask is calculated once
+    Args:
+        natal_gates(iterable): natal gates (personality and design)
+        jd_start, jd_end(float): julian day range (UT)
+        resolution(str): "gate" or "line" periods
+        hourly(bool): add the Moon gate/line of every hour
+    Return:
+        dict: periods, open_centers (hours per open center), hanging_gates (hours per bridged
+              natal gate), hourly (optional)
+    '''
+    if resolution not in ("gate", "line"):
+        raise ValueError("resolution must be 'gate' or 'line'")
+    natal_mask = gate_mask(natal_gates)
+    effects, natal_chakras = _gate_effects(natal_mask)
+    open_centers = [c for c in hd_constants.CHAKRA_LIST if c not in natal_chakras]
+
+    index, jds, indices = lunar_ingresses(jd_start, jd_end, table_dir)
+    states = np.concatenate(([index], indices)).astype(np.int64)
+    starts = np.concatenate(([jd_start], jds))
+    if resolution == "gate":
+        #keep gate ingresses only (line 1 entered)
+        keep = np.concatenate(([True], LINE_LINES[states[1:]] == 1))
+        states, starts = states[keep], starts[keep]
+    ends = np.append(starts[1:], jd_end)
+    hours = (ends - starts) * 24
+
+    periods = []
+    center_hours = dict.fromkeys(open_centers, 0.0)
+    hanging_hours = {}
+    for state, start, end, duration in zip(states, starts, ends, hours):
+        gate = int(LINE_GATES[state])
+        effect = effects[gate]
+        period = {
+            "start": jd_to_iso(start),
+            "end": jd_to_iso(end),
+            "gate": gate,
+            "center": effect["center"],
+            "open_center": effect["center"] in center_hours,
+            "hanging_gates": effect["hanging_gates"],
+            "new_channels": effect["new_channels"],
+            "new_centers": effect["new_centers"],
+        }
+        if resolution == "line":
+            period["line"] = int(LINE_LINES[state])
+        periods.append(period)
+        if period["open_center"]:
+            center_hours[effect["center"]] += duration
+        for natal_gate in effect["hanging_gates"]:
+            hanging_hours[natal_gate] = hanging_hours.get(natal_gate, 0.0) + duration
+
+    forecast = {
+        "start": jd_to_iso(jd_start),
+        "end": jd_to_iso(jd_end),
+        "periods": periods,
+        "open_centers": {center: round(float(h), 2) for center, h in center_hours.items()},
+        "hanging_gates": {gate: round(float(h), 2) for gate, h in sorted(hanging_hours.items())},
+    }
+    if hourly:
+        grid = jd_start + np.arange(int(np.floor((jd_end - jd_start) * 24)) + 1) / 24
+        gates, lines = moon_positions(grid, table_dir)
+        forecast["hourly"] = [{"time": jd_to_iso(jd), "gate": int(gate), "line": int(line)}
+                              for jd, gate, line in zip(grid, gates, lines)]
+    return forecast
@@ -417,6 +417,72 @@ def calc_full_gates_chakra_dict(gates_chakra_dict):
 #from chakra dict create full_dict (add keys in reversed order) 
 full_dict = calc_full_gates_chakra_dict(hd_constants.GATES_CHAKRA_DICT)
 
+#channel ids for bitmask calculations: id = index in GATES_CHAKRA_DICT
+CHANNEL_LIST = list(hd_constants.GATES_CHAKRA_DICT.keys())
+CHANNEL_GATE_MASKS = [(1 << g1) | (1 << g2) for g1, g2 in CHANNEL_LIST]
+CHANNEL_CHAKRAS = list(hd_constants.GATES_CHAKRA_DICT.values())
+
+def gate_mask(gates):
+    ''' 
+    bitmask of gates (bit g is set for gate g, gates 1-64)
+    Args:
+        gates(iterable): gate numbers
+    Return:
+        mask(int)
+    '''
+    mask = 0
+    for gate in gates:
+        mask |= 1 << int(gate)
+    return mask
+
+def channel_mask(gates_mask):
+    ''' 
+    bitmask of all channels (bit = channel id) that are defined by the given gate mask
+    Args:
+        gates_mask(int): see gate_mask
+    Return:
+        mask(int)
+    '''
+    mask = 0
+    for ch_id, ch_gates_mask in enumerate(CHANNEL_GATE_MASKS):
+        if gates_mask & ch_gates_mask == ch_gates_mask:
+            mask |= 1 << ch_id
+    return mask
+
+def channel_ids(ch_mask):
+    ''' channel ids of a channel mask in ascending order '''
+    return [ch_id for ch_id in range(len(CHANNEL_LIST)) if ch_mask >> ch_id & 1]
+
+def channels_from_mask(ch_mask):
+    ''' channels of a channel mask in gate tuple format, e.g. [(64,47),(20,34)] '''
+    return [CHANNEL_LIST[ch_id] for ch_id in channel_ids(ch_mask)]
+
+def chakras_from_channel_mask(ch_mask):
+    ''' set of chakras that are defined by the channels of a channel mask '''
+    chakras = set()
+    for ch_id in channel_ids(ch_mask):
+        chakras.update(CHANNEL_CHAKRAS[ch_id])
+    return chakras
+
+#channel ids of every gate (gates 1-64), e.g. GATE_CHANNEL_IDS[34] -> ids of 34-20, 34-10, 34-57
+GATE_CHANNEL_IDS = {gate: [ch_id for ch_id, channel in enumerate(CHANNEL_LIST) if gate in channel]
+                    for gate in range(1, 65)}
+
+def active_channels_from_mask(ch_mask):
+    '''
+    active channels dict of a channel mask, input format of is_connected, get_typ, get_auth
+    and get_definition
+    Return:
+        active_channels_dict(dict): keys ["gate","ch_gate","gate_chakra","ch_gate_chakra"]
+    '''
+    ids = channel_ids(ch_mask)
+    return {
+        "gate": [CHANNEL_LIST[ch_id][0] for ch_id in ids],
+        "ch_gate": [CHANNEL_LIST[ch_id][1] for ch_id in ids],
+        "gate_chakra": [CHANNEL_CHAKRAS[ch_id][0] for ch_id in ids],
+        "ch_gate_chakra": [CHANNEL_CHAKRAS[ch_id][1] for ch_id in ids],
+    }
+
 def calc_full_channel_meaning_dict():
     """from meaning dict create full dict (add keys in reversed ordere.g. (1,2)/(2,1))"""
     meaning_dict = hd_constants.CHANNEL_MEANING_DICT
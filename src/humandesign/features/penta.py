@@ -0,0 +1,250 @@
+import heapq
+import numpy as np
+from .. import hd_constants
+
+#bit of every penta gate in 12 bit ownership masks
+PENTA_GATE_BITS = {gate: bit for bit, gate in enumerate(hd_constants.PENTA_GATES)}
+FULL_PENTA_MASK = (1 << len(hd_constants.PENTA_GATES)) - 1
+
+#scoring rules of get_penta
+BACKBONE_CHANNELS = ["15-5", "2-14", "46-29"]
+STABILITY_SCORE_MAP = {3: 100, 2: 70, 1: 40, 0: 10}
+
+#(zone_key, ch_key, channel mask) of all penta channels
+PENTA_CHANNEL_MASKS = [
+    (zone_key, ch_key, (1 << PENTA_GATE_BITS[ch_def["gates"][0]]) | (1 << PENTA_GATE_BITS[ch_def["gates"][1]]))
+    for zone_key, zone_def in hd_constants.PENTA_DEFINITIONS.items()
+    for ch_key, ch_def in zone_def["channels"].items()
+]
+
+def penta_mask(gates):
+    '''
+    12 bit ownership mask of penta gates (bit see PENTA_GATE_BITS), other gates are ignored
+    Args:
+        gates(iterable): gate numbers, e.g. date_to_gate_dict["gate"]
+    Return:
+        mask(int)
+    '''
+    mask = 0
+    for gate in gates:
+        bit = PENTA_GATE_BITS.get(int(gate))
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+def _calc_scores(mask):
+    ''' (stability, vision, action) score of a group ownership mask, same rules as get_penta '''
+    upper = lower = backbone = 0
+    for zone_key, ch_key, ch_mask in PENTA_CHANNEL_MASKS:
+        if mask & ch_mask == ch_mask:
+            if zone_key == "upper_penta":
+                upper += 1
+            else:
+                lower += 1
+            if ch_key in BACKBONE_CHANNELS:
+                backbone += 1
+    return STABILITY_SCORE_MAP[backbone], round(upper / 3 * 100), round(lower / 3 * 100)
+
+#scores only depend on the union of gates -> lookup table of all 4096 group masks
+SCORE_TABLE = [_calc_scores(mask) for mask in range(FULL_PENTA_MASK + 1)]
+
+def active_penta_channels(mask):
+    ''' channel keys (e.g. "15-5") that are active in group ownership mask '''
+    return [ch_key for _, ch_key, ch_mask in PENTA_CHANNEL_MASKS if mask & ch_mask == ch_mask]
+
+def penta_scores(mask):
+    '''
+    scores of a group ownership mask
+    Return:
+        dict: stability_score, vision_score, action_score, active_channels
+    '''
+    stability, vision, action = SCORE_TABLE[mask]
+    return {
+        "stability_score": stability,
+        "vision_score": vision,
+        "action_score": action,
+        "active_channels": active_penta_channels(mask),
+    }
+
+#group rank of every mask as one int: stability first, then vision + action (max. 200)
+SCORE_RANK = np.array([stability * 1000 + vision + action for stability, vision, action in SCORE_TABLE],
+                      dtype=np.int64)
+
+def _rank_key(mask, size):
+    ''' ranking of groups: stability, then vision + action, then smaller groups first '''
+    return (int(SCORE_RANK[mask]), -size)
+
+def _slot_bound_tables(masks, max_slots):
+    '''
+    bound[r][m]: best SCORE_RANK reachable from group mask m by adding <= r candidates
+    dynamic programming over all 4096 masks: bound[r] = max(bound[r-1], bound[r-1][m | p]) for every
+    distinct candidate mask p
+    '''
+    all_masks = np.arange(FULL_PENTA_MASK + 1)
+    distinct = [p for p in set(masks) if p]
+    bounds = [SCORE_RANK]
+    for _ in range(max_slots):
+        prev = bounds[-1]
+        current = prev.copy()
+        for p in distinct:
+            np.maximum(current, prev[all_masks | p], out=current)
+        bounds.append(current)
+    return [bound.tolist() for bound in bounds]
+
+def _candidate_mask(gates):
+    ''' candidate input (gate list, get_penta style dict or mask) to ownership mask '''
+    if isinstance(gates, int):
+        return gates & FULL_PENTA_MASK
+    if isinstance(gates, dict):
+        gates = gates.get("gate", [])
+    return penta_mask(gates)
+
+def find_best_pentas(candidates, top_k=10, min_size=3, max_size=5):
+    '''
+    top-k penta groups of a candidate roster
+    branch and bound search over penta gate ownership masks:
+        candidates are visited by number of penta gates (descending), the upper bound of a
+        branch is the smaller of
+            score of current mask | OR of all remaining candidates
+            best score reachable with the remaining free slots (dp table over all 4096 masks)
+        branches that can not beat the k-th best group are cut (early exit)
+    Args:
+        candidates(dict): id -> gates (list), get_penta participant dict ({"gate": [...]}) or penta_mask
+        top_k(int): number of returned groups
+        min_size(int): min. group size (penta: 3)
+        max_size(int): max. group size (penta: 5)
+    Return:
+        list of dict: members, group_size, stability_score, vision_score, action_score, active_channels
+                      best group first
+    '''
+    if not 1 <= min_size <= max_size:
+        raise ValueError("min_size must be >= 1 and <= max_size")
+    if top_k < 1:
+        return []
+
+    ids = list(candidates)
+    masks = [_candidate_mask(candidates[c]) for c in ids]
+    order = sorted(range(len(ids)), key=lambda idx: (-bin(masks[idx]).count("1"), idx))
+    masks = [masks[idx] for idx in order]
+    ids = [ids[idx] for idx in order]
+    n = len(ids)
+
+    #suffix_or[i]: all gates that candidates i..n-1 can add
+    suffix_or = [0] * (n + 1)
+    for idx in range(n - 1, -1, -1):
+        suffix_or[idx] = suffix_or[idx + 1] | masks[idx]
+
+    slot_bounds = _slot_bound_tables(masks, max_size)
+    score_rank = SCORE_RANK.tolist()
+
+    heap = [] #(rank key, -found counter, members, mask), heap[0] = k-th best group
+    counter = 0
+
+    def offer(mask, members):
+        nonlocal counter
+        counter += 1
+        key = _rank_key(mask, len(members))
+        if len(heap) < top_k:
+            heapq.heappush(heap, (key, -counter, members, mask))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, -counter, members, mask))
+
+    def search(start, mask, members):
+        size = len(members)
+        if size >= min_size:
+            offer(mask, members)
+        if size == max_size:
+            return
+        bound_size = -max(size + 1, min_size)
+        slot_bound = slot_bounds[max_size - size][mask]
+        if len(heap) == top_k and (slot_bound, bound_size) <= heap[0][0]:
+            return
+        for idx in range(start, n - (min_size - size - 1 if size + 1 < min_size else 0)):
+            #suffix masks only shrink -> bound only decreases, cut remaining siblings too
+            bound = min(score_rank[mask | suffix_or[idx]], slot_bound)
+            if len(heap) == top_k and (bound, bound_size) <= heap[0][0]:
+                break
+            search(idx + 1, mask | masks[idx], members + [idx])
+
+    search(0, 0, [])
+
+    result = []
+    for key, _, members, mask in sorted(heap, reverse=True):
+        group = {"members": [ids[idx] for idx in members], "group_size": len(members)}
+        group.update(penta_scores(mask))
+        result.append(group)
+    return result
+
+#gate columns of penta channels in ownership matrices (channel order of PENTA_CHANNEL_MASKS)
+PENTA_CHANNEL_GATES = [
+    tuple(PENTA_GATE_BITS[g] for g in ch_def["gates"])
+    for zone_def in hd_constants.PENTA_DEFINITIONS.values()
+    for ch_def in zone_def["channels"].values()
+]
+
+def ownership_matrix(candidates):
+    '''
+    (N x 12) bool matrix of penta gate ownership, column order see PENTA_GATE_BITS
+    Args:
+        candidates(dict): id -> gates (list), get_penta participant dict ({"gate": [...]}) or penta_mask
+    Return:
+        ids(list), matrix(np.ndarray bool)
+    '''
+    ids = list(candidates)
+    masks = np.array([_candidate_mask(candidates[c]) for c in ids], dtype=np.int64)
+    matrix = (masks[:, None] >> np.arange(len(hd_constants.PENTA_GATES))) & 1
+    return ids, matrix.astype(bool)
+
+def score_penta_groups(candidates, groups):
+    '''
+    compact penta scores of many groups of one roster (vectorized, no penta_anatomy)
+    same metrics as get_penta analytical_metrics / hiring_logic
+    Args:
+        candidates(dict): id -> gates (list), get_penta participant dict ({"gate": [...]}) or penta_mask
+        groups(list): member id lists, e.g. [["alice","bob","carol"],["alice","dave","eve"]]
+    Return:
+        list of dict: members, stability_score, vision_score, action_score,
+                      bottlenecks (members that solo drive a channel), urgent_needs (max. 3 missing gates)
+    '''
+    ids, owned = ownership_matrix(candidates)
+    if not groups:
+        return []
+    index = {c: idx for idx, c in enumerate(ids)}
+    for group in groups:
+        if not group:
+            raise ValueError("groups must not be empty")
+        unknown = [member for member in group if member not in index]
+        if unknown:
+            raise ValueError("Unknown group members: {}".format(unknown))
+    flat = np.array([index[member] for group in groups for member in set(group)], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum([len(set(group)) for group in groups])[:-1]])
+
+    #owners per gate and group (G x 12), solo owners of both channel gates (G x 6)
+    gate_counts = np.add.reduceat(owned[flat].astype(np.int32), offsets, axis=0)
+    gate_1 = [g1 for g1, _ in PENTA_CHANNEL_GATES]
+    gate_2 = [g2 for _, g2 in PENTA_CHANNEL_GATES]
+    solo = owned[:, gate_1] & owned[:, gate_2]
+    solo_counts = np.add.reduceat(solo[flat].astype(np.int32), offsets, axis=0)
+    dominant = (gate_counts[:, gate_1] == 1) & (gate_counts[:, gate_2] == 1) & (solo_counts == 1)
+
+    group_masks = (gate_counts > 0).astype(np.int64) @ (1 << np.arange(len(hd_constants.PENTA_GATES)))
+    #missing gates (their channel is inactive), get_penta order = PENTA_GATES order
+    missing = gate_counts == 0
+
+    result = []
+    for g_idx, group in enumerate(groups):
+        stability, vision, action = SCORE_TABLE[int(group_masks[g_idx])]
+        bottlenecks = []
+        for ch_idx in np.flatnonzero(dominant[g_idx]):
+            for member in group:
+                if solo[index[member], ch_idx] and member not in bottlenecks:
+                    bottlenecks.append(member)
+        result.append({
+            "members": list(group),
+            "stability_score": stability,
+            "vision_score": vision,
+            "action_score": action,
+            "bottlenecks": bottlenecks,
+            "urgent_needs": [hd_constants.PENTA_GATES[col] for col in np.flatnonzero(missing[g_idx])[:3]],
+        })
+    return result
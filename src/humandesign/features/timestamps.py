@@ -0,0 +1,139 @@
+import numpy as np
+from datetime import datetime
+from .tz_offsets import utc_offsets
+
+#numpy datetime64 unit codes of supported time units
+TIME_UNITS = {"years": "Y",
+              "months": "M",
+              "days": "D",
+              "hours": "h",
+              "minutes": "m",
+              "seconds": "s",
+             }
+
+def _to_datetime64(date):
+    ''' convert timestamp tuple (year,month,day[,hour,minute,second,...]) to datetime64[s] '''
+    return np.datetime64(datetime(*date[:6]), "s")
+
+def _check_range(start_date, end_date, time_unit, intervall):
+    ''' sanity check of range parameters, raises before anything is generated '''
+    if time_unit not in TIME_UNITS:
+        raise ValueError("time_unit must be one of {}".format(list(TIME_UNITS)))
+    if int(intervall) < 1:
+        raise ValueError("intervall must be a positive integer")
+    start = _to_datetime64(start_date)
+    end = _to_datetime64(end_date)
+    if end <= start:
+        raise ValueError('check startdate < enddate & (enddate-intervall) >= startdate')
+    return start, end
+
+def _calendar_range(start, end, time_unit, intervall, forward):
+    '''
+    years/months are stepped on the calendar (like relativedelta):
+        day of month is clipped to month length (e.g. 31.01. + 1 month -> 28.02.)
+    '''
+    step = int(intervall) * (12 if time_unit == "years" else 1)
+    anchor = start if forward else end
+    sign = 1 if forward else -1
+    anchor_month = anchor.astype("datetime64[M]")
+    day_offset = anchor.astype("datetime64[D]") - anchor_month.astype("datetime64[D]")
+    time_of_day = anchor - anchor.astype("datetime64[D]")
+
+    span = int((end.astype("datetime64[M]") - start.astype("datetime64[M]")).astype(np.int64))
+    months = anchor_month + sign * step * np.arange(span // step + 1, dtype=np.int64)
+    month_len = (months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")
+    days = np.minimum(day_offset, month_len - np.timedelta64(1, "D"))
+    stamps = months.astype("datetime64[D]") + days + time_of_day
+
+    #half-open range: [start,end) forward, (start,end] backward
+    mask = (stamps < end) if forward else (stamps > start)
+    return stamps[mask].astype("datetime64[s]")
+
+def _fixed_step_plan(start, end, time_unit, intervall, forward):
+    ''' anchor, signed step and number of elements of fixed length unit ranges '''
+    step = np.timedelta64(int(intervall), TIME_UNITS[time_unit]).astype("timedelta64[s]")
+    step_sec = int(step.astype(np.int64))
+    span_sec = int((end - start).astype(np.int64))
+    count = -(-span_sec // step_sec) #ceil, half-open range
+    anchor = start if forward else end
+    return anchor, (step if forward else -step), count
+
+def timestamp_range(start_date, end_date, time_unit="minutes", intervall=1, percentage=1, forward=True):
+    '''
+    vectorized timestamp range based on numpy datetime64[s]
+    Args:
+        start_date(tuple): (year,month,day,hour,minute,second[,timezone_offset])
+        end_date(tuple): (year,month,day,hour,minute,second[,timezone_offset])
+        time_unit(str): years,months,days,hours,minutes,seconds
+        intervall(int): stepwith, every X unit
+        percentage(float): how much % of range is returned (e.g. for trial runs)
+        forward(bool): True -> start, start+intervall, ... (end excluded)
+                       False -> end, end-intervall, ... (start excluded)
+    Return:
+        stamps(np.ndarray): datetime64[s] local timestamps
+    '''
+    start, end = _check_range(start_date, end_date, time_unit, intervall)
+    if time_unit in ("years", "months"):
+        stamps = _calendar_range(start, end, time_unit, intervall, forward)
+        stamps = stamps[:int(len(stamps) * percentage)]
+    else:
+        anchor, step, count = _fixed_step_plan(start, end, time_unit, intervall, forward)
+        stamps = anchor + step * np.arange(int(count * percentage), dtype=np.int64)
+    if not len(stamps):
+        raise ValueError('check startdate < enddate & (enddate-intervall) >= startdate')
+    return stamps
+
+def iter_timestamp_chunks(start_date, end_date, time_unit="minutes", intervall=1,
+                          chunk_size=100_000, percentage=1, forward=True):
+    '''
+    lazy version of timestamp_range, yields datetime64[s] arrays of max. chunk_size
+    fixed length units are generated chunk by chunk, the full range is never materialized
+    Args:
+        see timestamp_range
+        chunk_size(int): max. number of timestamps per chunk
+    Return:
+        generator of np.ndarray (datetime64[s])
+    '''
+    start, end = _check_range(start_date, end_date, time_unit, intervall)
+    if time_unit in ("years", "months"):
+        stamps = timestamp_range(start_date, end_date, time_unit, intervall, percentage, forward)
+        for idx in range(0, len(stamps), chunk_size):
+            yield stamps[idx:idx + chunk_size]
+        return
+
+    anchor, step, count = _fixed_step_plan(start, end, time_unit, intervall, forward)
+    count = int(count * percentage)
+    if not count:
+        raise ValueError('check startdate < enddate & (enddate-intervall) >= startdate')
+    for idx in range(0, count, chunk_size):
+        yield anchor + step * np.arange(idx, min(idx + chunk_size, count), dtype=np.int64)
+
+def datetime64_to_timestamps(stamps, tz_offset=0, zone=None):
+    '''
+    convert datetime64 array to hd timestamp tuples (year,month,day,hour,minute,second,tz_offset)
+    Args:
+        stamps(np.ndarray): datetime64 local timestamps
+        tz_offset(float): fixed utc offset (hours) of all timestamps
+        zone(str): e.g. "Europe/Berlin", if given offset is calculated per timestamp (dst respected)
+    Return:
+        list of tuple: format: year,month,day,hour,minute,second,tz_offset
+    '''
+    stamps = np.asarray(stamps, dtype="datetime64[s]")
+    years = stamps.astype("datetime64[Y]")
+    months = stamps.astype("datetime64[M]")
+    days = stamps.astype("datetime64[D]")
+    secs = (stamps - days).astype(np.int64)
+
+    year_list = (years.astype(np.int64) + 1970).tolist()
+    month_list = ((months - years).astype(np.int64) + 1).tolist()
+    day_list = ((days - months).astype(np.int64) + 1).tolist()
+    hour_list = (secs // 3600).tolist()
+    minute_list = (secs % 3600 // 60).tolist()
+    second_list = (secs % 60).tolist()
+
+    if zone is None:
+        offsets = [tz_offset] * len(year_list)
+    else:
+        offsets = utc_offsets(stamps, zone).tolist()
+
+    return list(zip(year_list, month_list, day_list, hour_list, minute_list, second_list, offsets))
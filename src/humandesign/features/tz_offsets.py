@@ -0,0 +1,87 @@
+import bisect
+import functools
+from datetime import datetime
+import numpy as np
+import pytz
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = datetime(1970, 1, 1, 0, 0, 1) - _EPOCH
+
+class ZoneOffsets:
+    '''
+    UTC offset table of one time zone in local time.
+    the pytz transition table is converted once into sorted arrays of local switch times
+    (seconds since 1970-01-01 local) and the offset valid from each switch time on,
+    so the offset of a local time is one binary search.
+    local times that are ambiguous or do not exist resolve like pytz localize(is_dst=False):
+        nonexistent (clocks forward): the offset before the transition
+        ambiguous (clocks back): the non-DST candidate, if both or none are DST the smaller
+                                 offset (latest UTC time)
+    Args:
+        zone(str): e.g. "Europe/Berlin" (pytz.UnknownTimeZoneError if unknown)
+    '''
+    def __init__(self, zone):
+        tz = pytz.timezone(zone)
+        self.zone = zone
+        transitions = getattr(tz, "_utc_transition_times", None)
+        if not transitions:
+            #fixed offset zones (UTC, Etc/GMT+5, ...)
+            offset = int(tz.utcoffset(_EPOCH).total_seconds())
+            self.switches = np.array([], dtype=np.int64)
+            self.offsets = np.array([offset], dtype=np.int64)
+        else:
+            utc = np.array(transitions, dtype="datetime64[s]").astype(np.int64)
+            infos = tz._transition_info
+            offsets = [int(info[0].total_seconds()) for info in infos]
+            dst = [bool(info[1]) for info in infos]
+            switches = []
+            #transitions[0] is the datetime(1,1,1) sentinel of pytz tables
+            for i in range(1, len(infos)):
+                before, after = offsets[i - 1], offsets[i]
+                #gap and ambiguous hour switch to the new offset at local utc + after, except for an
+                #ambiguous hour leaving a non-DST offset for a DST one: the old offset is kept to its end
+                keep_old = after < before and not dst[i - 1] and dst[i]
+                switches.append(utc[i] + (before if keep_old else after))
+            self.switches = np.array(switches, dtype=np.int64)
+            self.offsets = np.array(offsets, dtype=np.int64)
+        self._switch_list = self.switches.tolist()
+        self._offset_hours = (self.offsets / 3600).tolist()
+
+    def offset_seconds(self, local_seconds):
+        ''' UTC offset (seconds) of local times (seconds since 1970-01-01 local), vectorized '''
+        idx = np.searchsorted(self.switches, np.asarray(local_seconds, dtype=np.int64), side="right")
+        return self.offsets[idx]
+
+    def offset_hours(self, local_seconds):
+        ''' UTC offset in hours of one local time (seconds since 1970-01-01 local) '''
+        return self._offset_hours[bisect.bisect_right(self._switch_list, local_seconds)]
+
+@functools.lru_cache(maxsize=None)
+def get_zone_offsets(zone):
+    ''' cached ZoneOffsets of a time zone name '''
+    return ZoneOffsets(zone)
+
+def utc_offset_hours(timestamp, zone):
+    '''
+    UTC offset of a local time in a time zone, same result as
+    pytz.timezone(zone).localize(datetime(*timestamp)).utcoffset() (is_dst=False)
+    Args:
+        timestamp(tuple): (year,month,day,hour,minute,second) local time
+        zone(str): e.g. "Europe/Berlin"
+    Return:
+        hours(float): offset hours (decimal hours e.g. 0.75 for 45 min)
+    '''
+    local = datetime(*timestamp[:6])
+    return get_zone_offsets(zone).offset_hours((local - _EPOCH) // _SECOND)
+
+def utc_offsets(stamps, zone):
+    '''
+    vectorized UTC offsets of local times in a time zone (see utc_offset_hours)
+    Args:
+        stamps(np.ndarray): datetime64 local timestamps
+        zone(str): e.g. "Europe/Berlin"
+    Return:
+        np.ndarray: offset hours (float64)
+    '''
+    seconds = np.asarray(stamps, dtype="datetime64[s]").astype(np.int64)
+    return get_zone_offsets(zone).offset_seconds(seconds) / 3600
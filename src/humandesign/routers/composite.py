@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Body, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
 from typing import Dict
 # from timezonefinder import TimezoneFinder # Removed
 from .. import features as hd
 from .. import hd_constants
-from ..services.geolocation import get_latitude_longitude, tf
+from ..services.geolocation import get_latitude_longitude_zone
 from ..dependencies import verify_token
-from ..schemas.input_models import PersonInput, PentaRequest, HybridAnalysisRequest
+from ..schemas.input_models import PersonInput, PentaRequest, HybridAnalysisRequest, PentaSearchRequest, PentaBatchRequest, DyadMatrixRequest
 from ..schemas.response_models import HybridAnalysisResponse
-from ..services.composite import process_hybrid_analysis
+from ..services.composite import process_hybrid_analysis, prepare_hybrid_participants, iter_hybrid_analysis, get_chart_pool, process_dyad_matrix
 
 router = APIRouter()
 
@@ -71,6 +72,65 @@ def get_hybrid_analysis(
 
     return JSONResponse(content=result)
 
+@router.post("/analyze/maia-penta/stream")
+def stream_hybrid_analysis(
+    request: HybridAnalysisRequest = Body(
+        ...,
+        description="Same input as /analyze/maia-penta, streamed as NDJSON for large groups."
+    ),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Streaming Hybrid Analysis (application/x-ndjson), one JSON object per line:
+    meta + participants first, then one dyad per line as soon as it is calculated,
+    penta summary last. Pairs are calculated lazily in the chart worker pool.
+    """
+    if len(request.participants) < 2:
+         raise HTTPException(status_code=400, detail="At least 2 participants are required.")
+
+    # Charts are calculated before streaming, so input errors still return 400
+    try:
+        parties = prepare_hybrid_participants(request.participants)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if len(parties) < 2:
+        raise HTTPException(status_code=400, detail="Fewer than 2 participants could be calculated.")
+
+    def _lines():
+        for record in iter_hybrid_analysis(parties, verbosity=request.verbosity, pool=get_chart_pool()):
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+@router.post("/analyze/dyad-matrix")
+def get_dyad_matrix(
+    request: DyadMatrixRequest = Body(
+        ...,
+        examples=[{
+            "participants": {
+                "alice": {"place": "Berlin, Germany", "year": 1985, "month": 6, "day": 15, "hour": 14, "minute": 30},
+                "bob": {"place": "London, UK", "year": 1990, "month": 12, "day": 5, "hour": 18, "minute": 45},
+                "carol": {"place": "New York, USA", "year": 1980, "month": 2, "day": 10, "hour": 9, "minute": 15}
+            },
+            "pairs": [["alice", "bob"]],
+            "verbosity": "partial"
+        }]
+    ),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Pairwise Maia counts of all participants as dense N x N matrices (row/column order = ids):
+    companionship, dominance, compromise, electromagnetic (= new_channels), composite_centers
+    and new channels per circuit group. Full dyads only for the requested pairs.
+    """
+    if len(request.participants) < 2:
+         raise HTTPException(status_code=400, detail="At least 2 participants are required.")
+    try:
+        result = process_dyad_matrix(request.participants, request.pairs, request.verbosity)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return JSONResponse(content=result)
+
 
 
 @router.post("/analyze/composite")
@@ -113,16 +173,10 @@ def analyze_composite(
     # Process inputs (Geocode & Timezone)
     for name, p_input in inputs.items():
         try:
-            latitude, longitude = get_latitude_longitude(p_input.place)
+            latitude, longitude, zone = get_latitude_longitude_zone(p_input.place)
             if latitude is None or longitude is None:
                  raise HTTPException(status_code=400, detail=f"Geocoding failed for {name} place: '{p_input.place}'")
             
-            if "/" in p_input.place:
-                zone = p_input.place
-            else:
-                # Use singleton
-                zone = tf.timezone_at(lat=latitude, lng=longitude) or 'Etc/UTC'
-            
             birth_time = (p_input.year, p_input.month, p_input.day, p_input.hour, p_input.minute, 0)
             hours = hd.get_utc_offset_from_tz(birth_time, zone)
             
@@ -133,21 +187,12 @@ def analyze_composite(
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error processing input for {name}: {str(e)}")
 
-    # Call composite_chakras_channels
+    # Composite of both persons (plain dicts, no DataFrames)
     try:
-        new_channels_df, duplicated_channels_df, new_chakras, composite_chakras = hd.composite_chakras_channels(
-            persons_dict, names[0], names[1]
-        )
+        composite = hd.composite_pair(persons_dict, names[0], names[1])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error in Composite calculation: {str(e)}")
 
-    # Serialize Output
-    def serialize_channels(df):
-        if df.empty:
-            return []
-        # Convert DataFrame to list of dicts, keeping relevant columns
-        return df[['gate', 'ch_gate', 'meaning']].to_dict(orient='records')
-
     # Helper to map chakra codes to names
     def map_chakras(chakra_list):
         return [
@@ -157,10 +202,10 @@ def analyze_composite(
 
     return {
         "participants": names,
-        "new_channels": serialize_channels(new_channels_df),
-        "duplicated_channels": serialize_channels(duplicated_channels_df),
-        "new_chakras": map_chakras(new_chakras),
-        "composite_chakras": map_chakras(composite_chakras)
+        "new_channels": composite["new_channels"],
+        "duplicated_channels": composite["duplicated_channels"],
+        "new_chakras": map_chakras(sorted(composite["new_chakras"])),
+        "composite_chakras": map_chakras(sorted(composite["composite_chakras"]))
     }
 
 
@@ -220,20 +265,10 @@ def analyze_penta(
     for name, p_input in inputs.items():
         try:
             # Geocoding & Timezone
-            if p_input.latitude is not None and p_input.longitude is not None:
-                latitude, longitude = p_input.latitude, p_input.longitude
-            else:
-                latitude, longitude = get_latitude_longitude(p_input.place)
-                
+            latitude, longitude, zone = get_latitude_longitude_zone(p_input.place, p_input.latitude, p_input.longitude)
             if latitude is None or longitude is None:
                  raise HTTPException(status_code=400, detail=f"Geocoding failed for {name} place: '{p_input.place}'")
             
-            if "/" in p_input.place:
-                zone = p_input.place
-            else:
-                # Use singleton
-                zone = tf.timezone_at(lat=latitude, lng=longitude) or 'Etc/UTC'
-            
             birth_time = (p_input.year, p_input.month, p_input.day, p_input.hour, p_input.minute, 0)
             hours = hd.get_utc_offset_from_tz(birth_time, zone)
             timestamp = (p_input.year, p_input.month, p_input.day, p_input.hour, p_input.minute, 0, hours)
@@ -254,3 +289,78 @@ def analyze_penta(
 
     return result
 
+
+@router.post("/analyze/penta/optimal")
+def find_optimal_penta(
+    request: PentaSearchRequest = Body(
+        ...,
+        examples=[{
+            "top_k": 3,
+            "roster": {
+                "alice": {"gate": [1, 8, 15, 46]},
+                "bob": {"gate": [2, 14, 31]},
+                "carol": {"gate": [5, 7, 29, 33]},
+                "dave": {"gate": [13, 2]}
+            }
+        }]
+    ),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Find the most stable penta groups (3-5 people) of a candidate roster.
+    Groups are ranked by stability_score, then vision_score + action_score, then smaller size.
+    """
+    if request.min_size > request.max_size:
+        raise HTTPException(status_code=400, detail="min_size must be <= max_size.")
+    if len(request.roster) < request.min_size:
+        raise HTTPException(status_code=400, detail=f"Roster needs at least {request.min_size} candidates.")
+
+    candidates = {name: member.gate for name, member in request.roster.items()}
+    groups = hd.find_best_pentas(candidates, top_k=request.top_k,
+                                 min_size=request.min_size, max_size=request.max_size)
+    return {
+        "candidates": len(candidates),
+        "groups": groups
+    }
+
+
+@router.post("/analyze/penta/batch")
+def score_penta_batch(
+    request: PentaBatchRequest = Body(
+        ...,
+        examples=[{
+            "group_type": "business",
+            "roster": {
+                "alice": {"gate": [1, 8, 15, 46], "line": [1, 2, 3, 4], "label": ["prs", "prs", "des", "des"]},
+                "bob": {"gate": [2, 14, 31]},
+                "carol": {"gate": [5, 7, 29, 33]},
+                "dave": {"gate": [13, 2]}
+            },
+            "groups": [["alice", "bob", "carol"], ["alice", "bob", "dave"]],
+            "detail": [0]
+        }]
+    ),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Compact penta scores (stability, vision, action, bottlenecks, urgent needs) of many candidate groups.
+    The full penta analysis (get_penta) is only built for the groups listed in `detail`.
+    """
+    invalid = [idx for idx in request.detail if not 0 <= idx < len(request.groups)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid detail group indices: {invalid}")
+
+    roster = {name: member.model_dump() for name, member in request.roster.items()}
+    try:
+        groups = hd.score_penta_groups(roster, request.groups)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for idx in sorted(set(request.detail)):
+        group_data = {member: roster[member] for member in request.groups[idx]}
+        groups[idx]["analysis"] = hd.get_penta(group_data, group_type=request.group_type)
+
+    return {
+        "roster_size": len(roster),
+        "groups": groups
+    }
@@ -8,7 +8,10 @@ from .. import features as hd
 from .. import hd_constants
 from ..utils import serialization as cj
 from ..services import chart_renderer as chart
-from ..services.geolocation import get_latitude_longitude, tf
+from ..services.geolocation import get_latitude_longitude_zone
+from ..services.geocode_cache import get_geocode_cache
+from ..services.gazetteer import get_gazetteer
+from ..services.geocoder import get_geocoder
 from ..dependencies import verify_token
 from ..utils.date_utils import clean_birth_date_to_iso, clean_create_date_to_iso
 from ..schemas.general import HealthResponse
@@ -30,6 +33,16 @@ def health_check():
         }
     }
 
+@router.get("/geocode/stats")
+def geocode_stats(authorized: bool = Depends(verify_token)):
+    """Geocode cache hit ratios (memory/SQLite tiers, negative hits), upstream geocoder calls and the loaded gazetteer size."""
+    gazetteer = get_gazetteer()
+    return {
+        "cache": get_geocode_cache().stats(),
+        "upstream": get_geocoder().stats(),
+        "gazetteer_places": len(gazetteer) if gazetteer is not None else 0,
+    }
+
 @router.get("/calculate")
 def calculate_hd(
     year: int = Query(1968, description="Birth year"),
@@ -51,16 +64,8 @@ def calculate_hd(
     # 2. Geocode and timezone
     try:
         # Use provided coordinates if available, otherwise geocode
+        latitude, longitude, zone = get_latitude_longitude_zone(place, latitude, longitude)
         if latitude is None or longitude is None:
-            latitude, longitude = get_latitude_longitude(place)
-            
-        if latitude is not None and longitude is not None:
-            if "/" in place:
-                zone = place
-            else:
-                # Use singleton
-                zone = tf.timezone_at(lat=latitude, lng=longitude) or 'Etc/UTC'
-        else:
             raise HTTPException(status_code=400, detail=f"Geocoding failed for place: '{place}'. Please check the place name or try a different format.")
         hours = hd.get_utc_offset_from_tz(birth_time, zone)
     except Exception as e:
@@ -143,15 +148,8 @@ def get_bodygraph_image(
     # 2. Geocode and timezone
     try:
         # Use provided coordinates if available, otherwise geocode
+        latitude, longitude, zone = get_latitude_longitude_zone(place, latitude, longitude)
         if latitude is None or longitude is None:
-            latitude, longitude = get_latitude_longitude(place)
-            
-        if latitude is not None and longitude is not None:
-            # Use singleton
-            zone = tf.timezone_at(lat=latitude, lng=longitude)
-            if not zone:
-                zone = 'Etc/UTC'
-        else:
             raise HTTPException(status_code=400, detail=f"Geocoding failed for place: '{place}'. Please check the place name or try a different format.")
         hours = hd.get_utc_offset_from_tz(birth_time, zone)
     except Exception as e:
@@ -0,0 +1,121 @@
+from fastapi import APIRouter, Body, HTTPException, Depends, Query
+from ..dependencies import verify_token
+from ..schemas.input_models import RosterMemberRequest, RosterRankRequest
+from ..services.roster import get_roster_store, parse_channel
+from ..services.composite import resolve_person_timestamp, calc_person_chart
+
+router = APIRouter(prefix="/roster", tags=["roster"])
+
+def _get_member_or_404(store, member_id):
+    if member_id not in store:
+        raise HTTPException(status_code=404, detail=f"Unknown roster member: '{member_id}'")
+
+def _request_activations(name, activations, person):
+    ''' activations as given or calculated from birth data '''
+    if activations is not None:
+        return activations.model_dump()
+    if person is not None:
+        try:
+            timestamp, _, _ = resolve_person_timestamp(name, person.model_dump())
+            date_to_gate = calc_person_chart(timestamp)["date_to_gate_dict"]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {key: list(date_to_gate[key]) for key in ("gate", "line", "label", "planets")}
+    raise HTTPException(status_code=400, detail="Either activations or person is required.")
+
+@router.put("/members")
+def upsert_roster_member(
+    request: RosterMemberRequest = Body(
+        ...,
+        examples=[{
+            "member_id": "alice",
+            "person": {"place": "Berlin, Germany", "year": 1985, "month": 6, "day": 15, "hour": 14, "minute": 30}
+        }]
+    ),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Add or replace a roster member. Activations are stored as given or calculated from birth data.
+    """
+    activations = _request_activations(request.member_id, request.activations, request.person)
+    store = get_roster_store()
+    try:
+        store.add_member(request.member_id, activations)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"member_id": request.member_id, "gates": sorted(store.member_gates(request.member_id)),
+            "roster_size": len(store)}
+
+@router.delete("/members/{member_id}")
+def delete_roster_member(member_id: str, authorized: bool = Depends(verify_token)):
+    store = get_roster_store()
+    if not store.remove_member(member_id):
+        raise HTTPException(status_code=404, detail=f"Unknown roster member: '{member_id}'")
+    return {"member_id": member_id, "roster_size": len(store)}
+
+@router.get("/gates/{gate}/carriers")
+def get_gate_carriers(
+    gate: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    authorized: bool = Depends(verify_token)
+):
+    """Members carrying a gate (with polarity)."""
+    if not 1 <= gate <= 64:
+        raise HTTPException(status_code=400, detail="gate must be between 1 and 64.")
+    total, members = get_roster_store().gate_carriers(gate, offset=offset, limit=limit)
+    return {"gate": gate, "total": total, "members": members}
+
+@router.get("/members/{member_id}/completers")
+def get_channel_completers(
+    member_id: str,
+    channel: str = Query(..., description="Channel, e.g. '2-14'"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    authorized: bool = Depends(verify_token)
+):
+    """Members that define the channel together with member_id."""
+    store = get_roster_store()
+    _get_member_or_404(store, member_id)
+    try:
+        channel_gates = parse_channel(channel)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total, members = store.channel_completers(member_id, channel_gates, offset=offset, limit=limit)
+    return {"member_id": member_id, "channel": "{}-{}".format(*channel_gates), "total": total, "members": members}
+
+@router.get("/members/{member_id}/em-partners")
+def get_em_partners(
+    member_id: str,
+    limit: int = Query(10, ge=1, le=1000),
+    authorized: bool = Depends(verify_token)
+):
+    """Members with the most electromagnetic channels with member_id."""
+    store = get_roster_store()
+    _get_member_or_404(store, member_id)
+    return {"member_id": member_id, "partners": store.em_partners(member_id, limit=limit)}
+
+@router.post("/rank")
+def rank_roster(
+    request: RosterRankRequest = Body(
+        ...,
+        examples=[{"member_id": "alice", "offset": 0, "limit": 10}]
+    ),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Top-k compatibility ranking of one subject against all stored members.
+    Scored on new channels, composite centers, profile and node resonance (see services.roster.RANK_WEIGHTS).
+    """
+    store = get_roster_store()
+    if request.member_id is not None and request.activations is None and request.person is None:
+        _get_member_or_404(store, request.member_id)
+        activations = store.get_activations(request.member_id)
+    else:
+        activations = _request_activations(request.member_id or "subject", request.activations, request.person)
+    try:
+        total, matches = store.rank(activations, exclude=request.member_id,
+                                    offset=request.offset, limit=request.limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"total": total, "offset": request.offset, "limit": request.limit, "matches": matches}
@@ -1,11 +1,18 @@
 from typing import Optional
+from datetime import date
 from fastapi import APIRouter, Query, HTTPException, Depends
 # from timezonefinder import TimezoneFinder # Removed
 from .. import features as hd
 from .. import hd_constants
-from ..services.geolocation import get_latitude_longitude, tf
+from ..services.geolocation import get_latitude_longitude_zone
 from ..dependencies import verify_token
-from ..utils.calculations import process_transit_data, enrich_transit_metadata
+from ..schemas.input_models import TransitCycleRequest, AlertSubscriptionRequest, GroupTransitRequest
+from ..services.composite import resolve_person_timestamp, geocode_participants
+from ..utils.calculations import process_transit_data, enrich_transit_metadata, get_natal_context, sanitize_to_native
+from ..utils.date_utils import clean_birth_date_to_iso, to_iso_utc
+from ..services.transit_cache import get_transit_cache
+from ..services.transit_alerts import get_alert_scheduler
+from ..services.roster import get_roster_store
 
 router = APIRouter(prefix="/transits", tags=["transits"])
 
@@ -24,17 +31,9 @@ def get_solar_return(
     authorized: bool = Depends(verify_token)
 ):
     # Geocoding and timezone logic
-    if latitude is None or longitude is None:
-        latitude, longitude = get_latitude_longitude(place)
-        
+    latitude, longitude, zone = get_latitude_longitude_zone(place, latitude, longitude)
     if latitude is None or longitude is None:
         raise HTTPException(status_code=400, detail=f"Geocoding failed for place: '{place}'")
-    
-    if "/" in place:
-        zone = place
-    else:
-        # Use singleton
-        zone = tf.timezone_at(lat=latitude, lng=longitude) or 'Etc/UTC'
     birth_time = (year, month, day, hour, minute, second)
     hours = hd.get_utc_offset_from_tz(birth_time, zone)
     birth_timestamp = tuple(list(birth_time) + [int(hours)])
@@ -52,7 +51,8 @@ def get_solar_return(
     sr_timestamp = (int(sr_year), int(sr_month), int(sr_day), int(sr_hour), int(sr_minute), int(sr_second), int(hours))
     
     # Calculate the full composite chart at the SR moment
-    sr_composite_data = process_transit_data(sr_timestamp, birth_timestamp, place)
+    natal = get_natal_context(birth_timestamp)
+    sr_composite_data = process_transit_data(sr_timestamp, birth_timestamp, place, natal=natal)
     
     # Format Response using shared helper
     return enrich_transit_metadata(
@@ -64,10 +64,378 @@ def get_solar_return(
         transit_minute=int(sr_minute),
         place=place,
         calculation_place=place, # Solar Return uses birth place for calculation context in this logic
-        composite_data=sr_composite_data
+        composite_data=sr_composite_data,
+        natal=natal
     )
 
 
+#transit specific meta fields, returned per solar return in the series
+SR_TRANSIT_META_KEYS = ("age", "transit_date_local", "transit_date_utc")
+
+@router.get("/solar_return/series")
+def get_solar_return_series(
+    year: int = Query(1968, description="Birth year"),
+    month: int = Query(2, description="Birth month"),
+    day: int = Query(21, description="Birth day"),
+    hour: int = Query(11, description="Birth hour"),
+    minute: int = Query(0, description="Birth minute (default 0)"),
+    second: int = Query(0, description="Birth second (optional, default 0)"),
+    place: str = Query("Kirikkale, Turkey", description="Birth place (city, country)"),
+    start_offset: int = Query(0, ge=0, description="First sr_year_offset of the series"),
+    end_offset: int = Query(90, ge=0, description="Last sr_year_offset of the series (inclusive)"),
+    latitude: Optional[float] = Query(None, description="Optional latitude for birth place"),
+    longitude: Optional[float] = Query(None, description="Optional longitude for birth place"),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Solar Returns and their transit composites for a range of sr_year_offset values.
+    Geocoding, the natal chart and the natal Sun longitude are calculated once; each
+    return search starts sr_year_offset tropical years after birth.
+    """
+    if end_offset < start_offset:
+        raise HTTPException(status_code=400, detail="end_offset must be >= start_offset")
+    if end_offset - start_offset >= 150:
+        raise HTTPException(status_code=400, detail="Max. 150 solar returns per request")
+
+    birth_timestamp, _ = _resolve_birth(place, (year, month, day, hour, minute, second), latitude, longitude)
+    hours = birth_timestamp[6]
+    try:
+        sr_dates = hd.hd_features(*birth_timestamp).get_solar_return_dates(range(start_offset, end_offset + 1))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error calculating Solar Return dates: {str(e)}")
+
+    natal = get_natal_context(birth_timestamp)
+    meta = None
+    solar_returns = []
+    for sr_year_offset, (sr_year, sr_month, sr_day, sr_hour, sr_minute, sr_second) in sr_dates.items():
+        sr_timestamp = (int(sr_year), int(sr_month), int(sr_day), int(sr_hour), int(sr_minute), int(sr_second), int(hours))
+        sr_composite_data = process_transit_data(sr_timestamp, birth_timestamp, place, natal=natal)
+        result = enrich_transit_metadata(
+            birth_timestamp=birth_timestamp,
+            transit_year=int(sr_year),
+            transit_month=int(sr_month),
+            transit_day=int(sr_day),
+            transit_hour=int(sr_hour),
+            transit_minute=int(sr_minute),
+            place=place,
+            calculation_place=place,
+            composite_data=sr_composite_data,
+            natal=natal
+        )
+        # Natal meta is the same for every return and returned once
+        sr_meta = {key: result["meta"].pop(key) for key in SR_TRANSIT_META_KEYS}
+        if meta is None:
+            meta = result["meta"]
+        solar_returns.append({
+            "sr_year_offset": sr_year_offset,
+            **sr_meta,
+            "composite_changes": result["composite_changes"],
+            "planetary_transits": result["planetary_transits"],
+        })
+
+    return {
+        "meta": meta,
+        "count": len(solar_returns),
+        "solar_returns": solar_returns,
+    }
+
+
+def _resolve_timestamps(persons):
+    """
+    Birth timestamps of several persons (name -> PersonInput). All places are geocoded in one
+    batch (coalesced, rate limited), raises HTTPException 400 listing the failed persons.
+    """
+    items = [(name, person.model_dump()) for name, person in persons.items()]
+    geocode_participants(items)
+    timestamps, failed = {}, {}
+    for name, data in items:
+        try:
+            timestamps[name] = resolve_person_timestamp(name, data)[0]
+        except ValueError as e:
+            failed[name] = str(e)
+    if failed:
+        raise HTTPException(status_code=400, detail=f"Geocoding failed: {failed}")
+    return timestamps
+
+
+@router.post("/cycles")
+def get_transit_cycles(request: TransitCycleRequest, authorized: bool = Depends(verify_token)):
+    """
+    Planetary returns and aspect cycles (Saturn return, Uranus opposition, ...) of several persons.
+    Every pass (direct and retrograde) within `years` after birth is returned with its exact time.
+    Position tables are cached per planet and shared by all persons and cycles of the batch.
+    """
+    cycles = [c if isinstance(c, str) else c.model_dump() for c in request.cycles]
+    timestamps = _resolve_timestamps(request.persons)
+
+    results = {}
+    for name, birth_timestamp in timestamps.items():
+        natal = get_natal_context(birth_timestamp)
+        gate_dict = natal.date_to_gate
+        natal_lons = {planet: lon for label, planet, lon
+                      in zip(gate_dict["label"], gate_dict["planets"], gate_dict["lon"]) if label == "prs"}
+        jd_birth = hd.timestamp_to_jd(birth_timestamp)
+        try:
+            found = hd.find_cycles(natal_lons, cycles, jd_birth, jd_birth + request.years * hd.TROPICAL_YEAR)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        results[name] = {
+            "birth_date": hd.jd_to_iso(jd_birth),
+            "cycles": found,
+        }
+    return {"years": request.years, "results": results}
+
+
+@router.post("/group")
+def get_group_transit(request: GroupTransitRequest, authorized: bool = Depends(verify_token)):
+    """
+    Transit overlay for a team: the transit positions are calculated once and overlaid on every
+    member's natal gate mask (new channels and centers per member), on the group composite and
+    on the group's penta.
+    """
+    #a name may only be used once across participants, roster and member_ids
+    sources = (list(request.participants), list(request.roster), list(dict.fromkeys(request.member_ids)))
+    names = [name for source in sources for name in source]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate member names: {duplicates}")
+
+    members = {name: activations.gate for name, activations in request.roster.items()}
+    if request.member_ids:
+        store = get_roster_store()
+        unknown = [member_id for member_id in request.member_ids if member_id not in store]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Unknown roster members: {unknown}")
+        members.update({member_id: store.member_gates(member_id) for member_id in request.member_ids})
+
+    timestamps = _resolve_timestamps(request.participants)
+    natal_charts = {name: get_natal_context(ts).date_to_gate for name, ts in timestamps.items()}
+    members.update({name: chart["gate"] for name, chart in natal_charts.items()})
+    if not members:
+        raise HTTPException(status_code=400, detail="At least one member is required.")
+
+    transit_timestamp = (request.transit_year, request.transit_month, request.transit_day,
+                         request.transit_hour, request.transit_minute, 0, request.tz_offset)
+    try:
+        day_chart = get_transit_cache().day_chart(transit_timestamp)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid transit date: {str(e)}")
+
+    overlay = hd.transit_overlay(members, day_chart["gate"])
+    if request.penta_detail:
+        penta_data = {name: {"gate": list(gates)} for name, gates in members.items()}
+        penta_data.update({name: {key: chart[key] for key in ("gate", "line", "label")}
+                           for name, chart in natal_charts.items()})
+        penta_data[overlay["transit_name"]] = {key: day_chart[key] for key in ("gate", "line", "label")}
+        overlay["penta"]["detail"] = hd.get_penta(penta_data, group_type=request.group_type)
+
+    return sanitize_to_native({
+        "transit_date_utc": to_iso_utc(transit_timestamp),
+        "planetary_transits": [{"planets": planet, "gate": gate, "line": line} for planet, gate, line
+                               in zip(day_chart["planets"], day_chart["gate"], day_chart["line"])],
+        **overlay,
+    })
+
+
+@router.put("/alerts/subscribers")
+def subscribe_transit_alerts(request: AlertSubscriptionRequest, authorized: bool = Depends(verify_token)):
+    """
+    Add or replace an alert subscriber. Its next composite channel/center openings are planned
+    immediately and kept up to date by the background scheduler.
+    """
+    if request.activations is not None:
+        gates = request.activations.gate
+    elif request.person is not None:
+        try:
+            birth_timestamp = resolve_person_timestamp(request.subscriber_id, request.person.model_dump())[0]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        gates = get_natal_context(birth_timestamp).date_to_gate["gate"]
+    else:
+        raise HTTPException(status_code=400, detail="Either activations or person is required.")
+    scheduler = get_alert_scheduler()
+    try:
+        scheduler.subscribe(request.subscriber_id, gates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"subscriber_id": request.subscriber_id,
+            "pending_events": scheduler.pending_events(request.subscriber_id)}
+
+
+@router.delete("/alerts/subscribers/{subscriber_id}")
+def unsubscribe_transit_alerts(subscriber_id: str, authorized: bool = Depends(verify_token)):
+    if not get_alert_scheduler().unsubscribe(subscriber_id):
+        raise HTTPException(status_code=404, detail=f"Unknown subscriber: '{subscriber_id}'")
+    return {"subscriber_id": subscriber_id, "deleted": True}
+
+
+@router.get("/alerts/subscribers/{subscriber_id}")
+def get_subscriber_alerts(subscriber_id: str, authorized: bool = Depends(verify_token)):
+    """Planned (undelivered) alert events of one subscriber."""
+    scheduler = get_alert_scheduler()
+    if subscriber_id not in scheduler:
+        raise HTTPException(status_code=404, detail=f"Unknown subscriber: '{subscriber_id}'")
+    return {"subscriber_id": subscriber_id, "pending_events": scheduler.pending_events(subscriber_id)}
+
+
+@router.get("/alerts/due")
+def get_due_alerts(
+    limit: int = Query(1000, ge=1, le=100000, description="Max. number of events"),
+    deliver: bool = Query(True, description="Mark the returned events as delivered"),
+    authorized: bool = Depends(verify_token)
+):
+    """Alert events that are due now (all subscribers, oldest first)."""
+    events = get_alert_scheduler().due_events(limit=limit, deliver=deliver)
+    return {"count": len(events), "events": events}
+
+
+@router.post("/alerts/plan")
+def plan_transit_alerts(authorized: bool = Depends(verify_token)):
+    """Extend the alert plan of all subscribers to now + horizon (normally done by the scheduler)."""
+    scheduler = get_alert_scheduler()
+    return {"queued": scheduler.advance(), **scheduler.stats()}
+
+
+@router.get("/alerts/stats")
+def get_alert_stats(authorized: bool = Depends(verify_token)):
+    return get_alert_scheduler().stats()
+
+
+@router.get("/cache/stats")
+def get_transit_cache_stats(authorized: bool = Depends(verify_token)):
+    """
+    Statistics of the shared transit snapshot cache (size, hits, misses, hit_rate, prewarm state).
+    """
+    return get_transit_cache().stats()
+
+
+def _resolve_birth(place, birth_time, latitude=None, longitude=None):
+    """
+    Geocode the birth place (unless coordinates are given) and attach the UTC offset.
+    Returns (birth_timestamp, zone), raises HTTPException 400 if geocoding fails.
+    """
+    latitude, longitude, zone = get_latitude_longitude_zone(place, latitude, longitude)
+    if latitude is None or longitude is None:
+        raise HTTPException(status_code=400, detail=f"Geocoding failed for birth place: '{place}'")
+    hours = hd.get_utc_offset_from_tz(birth_time, zone)
+    return tuple(list(birth_time) + [int(hours)]), zone
+
+
+@router.get("/calendar")
+def get_transit_calendar(
+    year: int = Query(1968, description="Birth year"),
+    month: int = Query(2, description="Birth month"),
+    day: int = Query(21, description="Birth day"),
+    hour: int = Query(11, description="Birth hour"),
+    minute: int = Query(0, description="Birth minute (default 0)"),
+    second: int = Query(0, description="Birth second (optional, default 0)"),
+    place: str = Query("Kirikkale, Turkey", description="Birth place (city, country)"),
+    start_year: int = Query(2025, description="First day of the calendar (year)"),
+    start_month: int = Query(1, description="First day of the calendar (month)"),
+    start_day: int = Query(1, description="First day of the calendar (day)"),
+    days: int = Query(30, ge=1, le=366, description="Number of days (max. 366)"),
+    planets: Optional[str] = Query(None, description="Comma separated transit planets (default all), e.g. 'Sun,Moon,Mars'"),
+    events: Optional[str] = Query(None, description="Comma separated event types to return (default all)"),
+    latitude: Optional[float] = Query(None, description="Optional latitude for birth place"),
+    longitude: Optional[float] = Query(None, description="Optional longitude for birth place"),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Transit calendar of a date range: exact gate and line ingress times of every transit planet
+    and the moments when new composite channels/centers form or dissolve against the natal chart.
+    The natal chart is calculated once for the whole range. The range starts at local midnight
+    of the birth place time zone.
+    """
+    planet_list = None
+    if planets:
+        planet_list = [p.strip() for p in planets.split(",") if p.strip()]
+        unknown = [p for p in planet_list if p not in hd_constants.SWE_PLANET_DICT]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown planets: {unknown}. Valid: {list(hd_constants.SWE_PLANET_DICT)}")
+    try:
+        start_date = date(start_year, start_month, start_day)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid start date: {str(e)}")
+
+    birth_timestamp, zone = _resolve_birth(place, (year, month, day, hour, minute, second), latitude, longitude)
+    natal = get_natal_context(birth_timestamp)
+
+    start_time = (start_date.year, start_date.month, start_date.day, 0, 0, 0)
+    start_timestamp = start_time + (hd.get_utc_offset_from_tz(start_time, zone),)
+    jd_start = hd.timestamp_to_jd(start_timestamp)
+    calendar = hd.transit_calendar(natal.date_to_gate["gate"], jd_start, jd_start + days, planet_list)
+
+    event_list = calendar["events"]
+    if events:
+        selected = {e.strip() for e in events.split(",")}
+        event_list = [e for e in event_list if e["event"] in selected]
+
+    return {
+        "birth_date": clean_birth_date_to_iso(natal.birth_date_str, birth_timestamp[6]),
+        "birth_place": place,
+        "start": calendar["start"]["time"],
+        "end": hd.jd_to_iso(jd_start + days),
+        "days": days,
+        "start_positions": calendar["start"]["positions"],
+        "start_new_channels": calendar["start"]["new_channels"],
+        "start_defined_centers": calendar["start"]["defined_centers"],
+        "event_count": len(event_list),
+        "events": event_list,
+    }
+
+
+@router.get("/lunar")
+def get_lunar_forecast(
+    year: int = Query(1968, description="Birth year"),
+    month: int = Query(2, description="Birth month"),
+    day: int = Query(21, description="Birth day"),
+    hour: int = Query(11, description="Birth hour"),
+    minute: int = Query(0, description="Birth minute (default 0)"),
+    second: int = Query(0, description="Birth second (optional, default 0)"),
+    place: str = Query("Kirikkale, Turkey", description="Birth place (city, country)"),
+    start_year: int = Query(2025, description="First day of the forecast (year)"),
+    start_month: int = Query(1, description="First day of the forecast (month)"),
+    start_day: int = Query(1, description="First day of the forecast (day)"),
+    days: int = Query(28, ge=1, le=366, description="Number of days (default 28 = one lunar cycle, max. 366)"),
+    resolution: str = Query("gate", description="Period resolution: 'gate' (default) or 'line'"),
+    hourly: bool = Query(False, description="Add the Moon gate/line of every hour"),
+    latitude: Optional[float] = Query(None, description="Optional latitude for birth place"),
+    longitude: Optional[float] = Query(None, description="Optional longitude for birth place"),
+    authorized: bool = Depends(verify_token)
+):
+    """
+    Lunar forecast of a date range (e.g. the 28 day cycle of a Reflector): every Moon gate/line
+    period with the open center it conditions, the hanging natal gates it bridges and the
+    composite channels/centers it forms, plus hours per open center and bridged gate.
+    Moon positions are looked up in the precomputed lunar ingress table (1800-2100).
+    """
+    if resolution not in ("gate", "line"):
+        raise HTTPException(status_code=400, detail="resolution must be 'gate' or 'line'")
+    try:
+        start_date = date(start_year, start_month, start_day)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid start date: {str(e)}")
+
+    birth_timestamp, zone = _resolve_birth(place, (year, month, day, hour, minute, second), latitude, longitude)
+    natal = get_natal_context(birth_timestamp)
+
+    start_time = (start_date.year, start_date.month, start_date.day, 0, 0, 0)
+    jd_start = hd.timestamp_to_jd(start_time + (hd.get_utc_offset_from_tz(start_time, zone),))
+    try:
+        forecast = hd.lunar_forecast(natal.date_to_gate["gate"], jd_start, jd_start + days,
+                                     resolution=resolution, hourly=hourly)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "birth_date": clean_birth_date_to_iso(natal.birth_date_str, birth_timestamp[6]),
+        "birth_place": place,
+        "days": days,
+        "defined_centers": sorted(natal.active_chakras, key=hd_constants.CHAKRA_LIST.index),
+        **forecast,
+    }
+
+
 @router.get("/daily")
 def get_daily_transit(
     year: int = Query(1968, description="Birth year"),
@@ -90,20 +458,10 @@ def get_daily_transit(
     authorized: bool = Depends(verify_token)
 ):
     # 1. Process Birth Data (remains constant)
-    if latitude is None or longitude is None:
-        b_lat, b_lon = get_latitude_longitude(place)
-    else:
-        b_lat, b_lon = latitude, longitude
-        
+    b_lat, b_lon, b_zone = get_latitude_longitude_zone(place, latitude, longitude)
     if b_lat is None or b_lon is None:
         raise HTTPException(status_code=400, detail=f"Geocoding failed for birth place: '{place}'")
     
-    if "/" in place:
-        b_zone = place
-    else:
-        # Use singleton
-        b_zone = tf.timezone_at(lat=b_lat, lng=b_lon) or 'Etc/UTC'
-    
     birth_time = (year, month, day, hour, minute, second)
     b_offset_hours = hd.get_utc_offset_from_tz(birth_time, b_zone)
     birth_timestamp = tuple(list(birth_time) + [int(b_offset_hours)])
@@ -113,19 +471,9 @@ def get_daily_transit(
     
     if current_place:
         # Geocode current place
-        if current_latitude is None or current_longitude is None:
-            c_lat, c_lon = get_latitude_longitude(calculation_place)
-        else:
-            c_lat, c_lon = current_latitude, current_longitude
-            
+        c_lat, c_lon, c_zone = get_latitude_longitude_zone(calculation_place, current_latitude, current_longitude)
         if c_lat is None or c_lon is None:
              raise HTTPException(status_code=400, detail=f"Geocoding failed for current place: '{calculation_place}'")
-        
-        if "/" in calculation_place:
-            c_zone = calculation_place
-        else:
-            # Use singleton
-            c_zone = tf.timezone_at(lat=c_lat, lng=c_lon) or 'Etc/UTC'
     else:
         # Re-use birth place info
         c_lat, c_lon = b_lat, b_lon
@@ -141,259 +489,22 @@ def get_daily_transit(
     
     transit_timestamp = tuple(list(transit_local_tuple) + [int(t_offset_hours)])
 
-    # Calculate the composite chart at the transit moment
-    composite_data = process_transit_data(transit_timestamp, birth_timestamp, place)
-
-    # --- v1.8.1 Enriched Metadata Implementation ---
-    
-    # 1. Calculate Full Birth Chart Details
-    # We use calc_single_hd_features to get all attributes
-    # Returns: typ, auth, inc_cross, inc_cross_typ, profile, definition, date_to_gate_dict, active_chakras, active_channels_dict, bdate, cdate, variables
-    (
-        b_typ, b_auth, b_inc_cross, b_inc_cross_typ, b_profile, b_definition, 
-        b_date_to_gate, b_active_chakras, b_active_channels, 
-        b_date_str, b_create_date_str, b_variables
-    ) = hd.calc_single_hd_features(birth_timestamp, report=False, channel_meaning=True)
-
-    # 2. Map Constants & Formats for Metadata
-    
-    # Map Authority
-    b_auth_name = hd_constants.INNER_AUTHORITY_NAMES_MAP.get(b_auth, b_auth)
+    # Natal chart is calculated once (cached per birth timestamp) and shared by both helpers
+    natal = get_natal_context(birth_timestamp)
 
-    # Map Centers (Sort for consistency)
-    defined_centers_list = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in b_active_chakras]
-    
-    # Calculate Undefined Centers
-    all_centers = set(hd_constants.CHAKRA_LIST)
-    undefined_centers_set = all_centers - b_active_chakras
-    undefined_centers_list = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in undefined_centers_set]
-
-    # Map Definition
-    # 0: None, 1: Single, 2: Split, 3: Triple Split, 4: Quadruple Split
-    definition_map = {
-        0: "No Definition",
-        1: "Single Definition",
-        2: "Split Definition",
-        3: "Triple Split Definition", 
-        4: "Quadruple Split Definition"
-    }
-    definition_str = definition_map.get(b_definition, "Unknown Definition")
-
-    # Map Channels (Special formatting request: "Gate/Gate: Name (Desc)")
-    # b_active_channels['meaning'] contains tuples/lists like ["Name", "Description"]
-    # b_active_channels['gate'] and ['ch_gate'] are numpy arrays
-    
-    birth_channels_formatted = []
-    
-    # If channel_meaning=True, 'meaning' key exists
-    if 'meaning' in b_active_channels:
-        b_gates = b_active_channels.get('gate', [])
-        b_ch_gates = b_active_channels.get('ch_gate', [])
-        b_meanings = b_active_channels.get('meaning', [])
-        
-        count = len(b_gates)
-        # Iterate and construct strings
-        for i in range(count):
-            g1 = b_gates[i]
-            g2 = b_ch_gates[i]
-            
-            # Meaning is often [Name, Description]
-            m_name = "Unknown"
-            m_desc = ""
-            current_meaning = b_meanings[i]
-            if isinstance(current_meaning, (list, tuple)):
-                if len(current_meaning) > 0:
-                    m_name = current_meaning[0]
-                if len(current_meaning) > 1:
-                    m_desc = current_meaning[1]
-            
-            # Format: "Gate/Gate: Name (Desc)"
-            # Note: User example showed "6/59: The Channel of Mating (A Design Focused on Reproduction)"
-            channel_str = f"{g1}/{g2}: {m_name} ({m_desc})"
-            birth_channels_formatted.append({"channel": channel_str})
-
-    # Strategy & Signature mapping (simplified inference based on Type)
-    # Ideally this would be in a helper, but mapping locally for v1.8.1
-    strategy_map = {
-        "Generator": "Wait to Respond",
-        "Manifesting Generator": "Wait to Respond",
-        "Projector": "Wait for the Invitation",
-        "Manifestor": "Inform Before Acting",
-        "Reflector": "Wait a Lunar Cycle"
-    }
-    signature_map = {
-        "Generator": "Satisfaction",
-        "Manifesting Generator": "Satisfaction",
-        "Projector": "Success",
-        "Manifestor": "Peace",
-        "Reflector": "Surprise"
-    }
-    not_self_map = {
-         "Generator": "Frustration",
-         "Manifesting Generator": "Frustration & Anger",
-         "Projector": "Bitterness",
-         "Manifestor": "Anger",
-         "Reflector": "Disappointment"
-    }
-    aura_map = {
-        "Generator": "Open & Enveloping",
-        "Manifesting Generator": "Open & Enveloping",
-        "Projector": "Focused & Absorbing",
-        "Manifestor": "Closed & Repelling",
-        "Reflector": "Sampling & Resistant"
-    }
-    
-    b_strategy = strategy_map.get(b_typ, "Unknown")
-    b_signature = signature_map.get(b_typ, "Unknown")
-    b_not_self = not_self_map.get(b_typ, "Unknown")
-    b_aura = aura_map.get(b_typ, "Unknown")
-
-    # Construct Meta Object
-    meta_object = {
-        # Bio
-        "birth_date": f"{year}-{month:02d}-{day:02d}T{hour:02d}:{minute:02d}:{second:02d}Z", # Keeping simple ISO-like
-        "create_date": b_create_date_str, # Comes from calc string representation 
-        "place": place,
-        "age": transit_year - year, # Approximate age
-        "gender": "male", # Hardcoded default for now as it's not in parameters, user requested defaults update but no gender param added to func signature yet. 
-                          # WAIT: User example showed gender/islive in URL logs but they were NOT in the requested Python function Params update list.
-                          # I will add 'gender' and 'islive' to the signature to support this properly if they are expected.
-                          # Checking previous request: "addtionally update endpoint defaults with following ... param list"
-                          # The user URL had &gender=male&islive=true.
-                          # I should probably add them to parameters to be safe and accurate.
-        "islive": True,   # Defaulting
-        
-        # Calculation Context (v1.9.0)
-        "transit_date_local": f"{transit_year}-{transit_month:02d}-{transit_day:02d} {transit_hour:02d}:{transit_minute:02d}", 
-        "transit_date_utc": composite_data.get("transit_date"),
-        "calculation_place": calculation_place,
-        
-        # Astrology
-        "zodiac_sign": "Pisces", # Placeholder - logic requires date mapping, user requested specific update. 
-                                 # Implementing simple Zodiac lookup would be better than hardcoding.
-                                 
-        # HD Core
-        "energy_type": b_typ,
-        "strategy": b_strategy,
-        "signature": b_signature,
-        "not_self": b_not_self,
-        "aura": b_aura,
-        "inner_authority": b_auth_name,
-        "inc_cross": f"{b_inc_cross}", # Formatting tuple to string? User example: "The Right Angle Cross of the Sleeping Phoenix (1)"
-                                       # Our b_inc_cross is likely a tuple or name. Let's check format.
-                                       # Usually it returns the name.
-        "profile": f"{b_profile[0]}/{b_profile[1]}", # e.g. "2/4"
-        
-        # Centers
-        "defined_centers": defined_centers_list,
-        "undefined_centers": undefined_centers_list,
-        "definition": definition_str,
-        
-        # Channels
-        "channels": {
-            "Channels": birth_channels_formatted
-        }
-    }
-    
-    # --- Zodiac Logic (Mini helper) ---
-    def get_zodiac(d, m):
-        if (m == 3 and d >= 21) or (m == 4 and d <= 19):
-            return "Aries"
-        if (m == 4 and d >= 20) or (m == 5 and d <= 20):
-            return "Taurus"
-        if (m == 5 and d >= 21) or (m == 6 and d <= 20):
-            return "Gemini"
-        if (m == 6 and d >= 21) or (m == 7 and d <= 22):
-            return "Cancer"
-        if (m == 7 and d >= 23) or (m == 8 and d <= 22):
-            return "Leo"
-        if (m == 8 and d >= 23) or (m == 9 and d <= 22):
-            return "Virgo"
-        if (m == 9 and d >= 23) or (m == 10 and d <= 22):
-            return "Libra"
-        if (m == 10 and d >= 23) or (m == 11 and d <= 21):
-            return "Scorpio"
-        if (m == 11 and d >= 22) or (m == 12 and d <= 21):
-            return "Sagittarius"
-        if (m == 12 and d >= 22) or (m == 1 and d <= 19):
-            return "Capricorn"
-        if (m == 1 and d >= 20) or (m == 2 and d <= 18):
-            return "Aquarius"
-        return "Pisces"
-    
-    meta_object["zodiac_sign"] = get_zodiac(day, month)
-    
-    # Profile Names Map (Simple)
-    profile_names = {
-        "1/3": "Investigator Martyr",
-        "1/4": "Investigator Opportunist",
-        "2/4": "Hermit Opportunist",
-        "2/5": "Hermit Heretic",
-        "3/5": "Martyr Heretic",
-        "3/6": "Martyr Role Model",
-        "4/6": "Opportunist Role Model",
-        "4/1": "Opportunist Investigator",
-        "5/1": "Heretic Investigator",
-        "5/2": "Heretic Hermit",
-        "6/2": "Role Model Hermit",
-        "6/3": "Role Model Martyr"
-    }
-    p_key = f"{b_profile[0]}/{b_profile[1]}"
-    meta_object["profile"] = f"{p_key}: {profile_names.get(p_key, '')}"
-
-    # --- End v1.8.1 ---
-
-    # --- v1.8.0 Data Mapping (Existing Logic) ---
-    # ... (Rest of existing Mapping for Transit Composite) ...
-    
-    # Map Authority (Composite)
-    auth_code = composite_data.get("composite_authority")
-    hd_constants.INNER_AUTHORITY_NAMES_MAP.get(auth_code, auth_code)
-
-    # Map Centers (Composite)
-    raw_centers = composite_data.get("new_defined_centers", [])
-    mapped_centers = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in raw_centers]
-
-    # Map Channels (Composite)
-    mapped_channels = []
-    raw_channels_gates = composite_data.get("new_defined_channels", [])
-    raw_channel_meanings = composite_data.get("new_channel_meanings", [])
-
-    for gates_tuple, meaning in zip(raw_channels_gates, raw_channel_meanings):
-        g1, g2 = gates_tuple if isinstance(gates_tuple, (list, tuple)) and len(gates_tuple) >= 2 else ("?", "?")
-        gate_str = f"{g1}-{g2}"
-        name = meaning[0] if isinstance(meaning, (list, tuple)) and len(meaning) > 0 else "Unknown"
-        desc = meaning[1] if isinstance(meaning, (list, tuple)) and len(meaning) > 1 else str(meaning)
-
-        mapped_channels.append({
-            "gates": gate_str,
-            "name": name,
-            "description": desc
-        })
-
-    # Transform Planetary Transits
-    raw_transits = composite_data.get("raw_transit_gates", {})
-    planetary_transits = []
-    p_names = raw_transits.get("planets", [])
-    count = len(p_names)
-    
-    for i in range(count):
-        planetary_transits.append({
-            "planets": p_names[i],
-            "gate": raw_transits["gate"][i] if i < len(raw_transits.get("gate", [])) else None,
-            "line": raw_transits["line"][i] if i < len(raw_transits.get("line", [])) else None,
-            "color": raw_transits["color"][i] if i < len(raw_transits.get("color", [])) else None,
-            "tone": raw_transits["tone"][i] if i < len(raw_transits.get("tone", [])) else None,
-            "base": raw_transits["base"][i] if i < len(raw_transits.get("base", [])) else None,
-            "lon": raw_transits["lon"][i] if i < len(raw_transits.get("lon", [])) else None,
-        })
+    # Calculate the composite chart at the transit moment
+    composite_data = process_transit_data(transit_timestamp, birth_timestamp, place, natal=natal)
 
-    # Construct Response
-    return {
-        "meta": meta_object, # Injected expanded meta
-        "composite_changes": {
-            "new_channels": mapped_channels,
-            "new_centers": mapped_centers
-        },
-        "planetary_transits": planetary_transits
-    }
+    # Format Response using shared helper (v1.8.1 enriched metadata)
+    return enrich_transit_metadata(
+        birth_timestamp=birth_timestamp,
+        transit_year=transit_year,
+        transit_month=transit_month,
+        transit_day=transit_day,
+        transit_hour=transit_hour,
+        transit_minute=transit_minute,
+        place=place,
+        calculation_place=calculation_place,
+        composite_data=composite_data,
+        natal=natal
+    )
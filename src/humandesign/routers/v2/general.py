@@ -4,7 +4,7 @@ import json
 from ... import features as hd
 from ... import hd_constants
 from ...utils import serialization as cj
-from ...services.geolocation import get_latitude_longitude, tf
+from ...services.geolocation import get_latitude_longitude_zone
 from ...dependencies import verify_token
 from ...utils.date_utils import clean_birth_date_to_iso, clean_create_date_to_iso
 from ...schemas.v2.calculate import CalculateRequestV2, CalculateResponseV2, GeneralSectionV2, GateV2, CentersV2, GatesV2
@@ -24,15 +24,10 @@ def calculate_hd_v2(
     try:
         latitude, longitude = request.latitude, request.longitude
         # If coordinates are None or default (0,0), and we have a place name, trigger geocoding
-        if (latitude is None or longitude is None) or (latitude == 0.0 and longitude == 0.0):
-            latitude, longitude = get_latitude_longitude(request.place)
-            
-        if latitude is not None and longitude is not None:
-            if "/" in request.place:
-                zone = request.place
-            else:
-                zone = tf.timezone_at(lat=latitude, lng=longitude) or 'Etc/UTC'
-        else:
+        if latitude == 0.0 and longitude == 0.0:
+            latitude, longitude = None, None
+        latitude, longitude, zone = get_latitude_longitude_zone(request.place, latitude, longitude)
+        if latitude is None or longitude is None:
             raise HTTPException(status_code=400, detail=f"Geocoding failed for place: '{request.place}'")
             
         hours = hd.get_utc_offset_from_tz(birth_time, zone)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator, field_validator
-from typing import Union, Dict, Optional
+from typing import Union, Dict, Optional, List
 
 # Input Model
 class PersonInput(BaseModel):
@@ -116,3 +116,97 @@ class HybridAnalysisRequest(BaseModel):
         if v.lower() not in allowed:
             raise ValueError(f"verbosity must be one of {allowed}")
         return v.lower()
+
+class DyadMatrixRequest(BaseModel):
+    participants: Dict[str, PersonInput] = Field(..., description="Dictionary of participants (2+ people)")
+    pairs: List[List[str]] = Field([], description="Pairs rendered as full dyads, e.g. [['alice','bob']]")
+    verbosity: str = Field("partial", description="Detail level of rendered dyads: 'all' or 'partial' (default)")
+
+    @validator('verbosity')
+    def validate_verbosity(cls, v):
+        allowed = ['all', 'partial']
+        if v.lower() not in allowed:
+            raise ValueError(f"verbosity must be one of {allowed}")
+        return v.lower()
+
+class ParticipantActivations(BaseModel):
+    gate: List[int] = Field(..., description="Activated gates (e.g. date_to_gate_dict['gate'])")
+    line: List[int] = Field([], description="Optional: lines of the activations (same order as gate)")
+    label: List[str] = Field([], description="Optional: 'prs' or 'des' per activation (same order as gate)")
+    planets: List[str] = Field([], description="Optional: planet per activation (same order as gate)")
+
+    @validator('gate')
+    def validate_gate_range(cls, v):
+        invalid = [gate for gate in v if not (1 <= gate <= 64)]
+        if invalid:
+            raise ValueError(f"Gates {invalid} must be between 1 and 64")
+        return v
+
+class PentaSearchRequest(BaseModel):
+    roster: Dict[str, ParticipantActivations] = Field(..., description="Candidate roster with precomputed activations")
+    top_k: int = Field(10, ge=1, le=100, description="Number of returned groups")
+    min_size: int = Field(3, ge=1, le=5, description="Minimum group size")
+    max_size: int = Field(5, ge=1, le=5, description="Maximum group size")
+
+class PentaBatchRequest(BaseModel):
+    roster: Dict[str, ParticipantActivations] = Field(..., description="Roster with precomputed activations")
+    groups: List[List[str]] = Field(..., min_length=1, description="Candidate groups as lists of roster ids")
+    group_type: str = Field("family", description="Type of group analysis: 'family' (default) or 'business'")
+    detail: List[int] = Field([], description="Optional: indices of groups that get the full penta analysis")
+
+    @validator('group_type')
+    def validate_group_type(cls, v):
+        allowed = ['family', 'business']
+        if v.lower() not in allowed:
+            raise ValueError(f"group_type must be one of {allowed}")
+        return v.lower()
+
+class RosterMemberRequest(BaseModel):
+    member_id: str = Field(..., min_length=1, description="Unique member id")
+    activations: Optional[ParticipantActivations] = Field(None, description="Precomputed activations")
+    person: Optional[PersonInput] = Field(None, description="Birth data, chart is calculated if no activations are given")
+
+class RosterRankRequest(BaseModel):
+    member_id: Optional[str] = Field(None, description="Subject from the roster")
+    activations: Optional[ParticipantActivations] = Field(None, description="Subject activations (not stored)")
+    person: Optional[PersonInput] = Field(None, description="Subject birth data (not stored)")
+    offset: int = Field(0, ge=0, description="Pagination offset")
+    limit: int = Field(10, ge=1, le=1000, description="Number of returned matches")
+
+class CycleSpec(BaseModel):
+    planet: str = Field(..., description="Transit planet (key of SWE_PLANET_DICT), e.g. 'Saturn'")
+    aspect: float = Field(0, description="Offset in degrees to the natal longitude (0 = return, 180 = opposition)")
+    natal_planet: Optional[str] = Field(None, description="Natal planet of the target longitude (default: planet)")
+    cycle: Optional[str] = Field(None, description="Optional label of the cycle in the response")
+
+class TransitCycleRequest(BaseModel):
+    persons: Dict[str, PersonInput] = Field(..., min_length=1, description="Persons by id")
+    cycles: List[Union[str, CycleSpec]] = Field(
+        ["saturn_return", "uranus_opposition"],
+        description="Named cycles (e.g. 'saturn_return', 'pluto_square') or custom cycle specs")
+    years: int = Field(90, ge=1, le=150, description="Years after birth that are searched")
+
+class AlertSubscriptionRequest(BaseModel):
+    subscriber_id: str = Field(..., min_length=1, description="Unique subscriber id")
+    activations: Optional[ParticipantActivations] = Field(None, description="Precomputed natal activations")
+    person: Optional[PersonInput] = Field(None, description="Birth data, natal chart is calculated if no activations are given")
+
+class GroupTransitRequest(BaseModel):
+    participants: Dict[str, PersonInput] = Field({}, description="Members with birth data (natal charts are cached)")
+    roster: Dict[str, ParticipantActivations] = Field({}, description="Members with precomputed activations")
+    member_ids: List[str] = Field([], description="Members of the stored team roster")
+    transit_year: int = Field(..., description="Transit year")
+    transit_month: int = Field(..., ge=1, le=12, description="Transit month")
+    transit_day: int = Field(..., ge=1, le=31, description="Transit day")
+    transit_hour: int = Field(12, ge=0, le=23, description="Transit hour")
+    transit_minute: int = Field(0, ge=0, le=59, description="Transit minute")
+    tz_offset: float = Field(0, description="UTC offset of the transit time in hours (default UTC)")
+    group_type: str = Field("family", description="Group type of the penta detail: 'family' (default) or 'business'")
+    penta_detail: bool = Field(False, description="Add the full penta analysis (get_penta) incl. the transit")
+
+    @validator('group_type')
+    def validate_group_type(cls, v):
+        allowed = ['family', 'business']
+        if v.lower() not in allowed:
+            raise ValueError(f"group_type must be one of {allowed}")
+        return v.lower()
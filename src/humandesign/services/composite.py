@@ -1,11 +1,17 @@
+import os
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import humandesign.features as hd
 from .. import hd_constants
 import numpy as np
-from datetime import datetime
-from .geolocation import get_latitude_longitude, tf
+from datetime import datetime, timedelta
+from .geolocation import get_latitude_longitude_zone, geocode_places
 import swisseph as swe
-import pytz
 from ..schemas.response_models import EnvironmentalResonanceDetail, VariableSynergyDetail
+from ..features.dyad_matrix import CIRCUIT_GROUPS
 
 def sanitize_for_json(data):
     """
@@ -299,9 +305,8 @@ def get_penta_dynamics(person_gates_dict):
     Maps to BUSINESS_SHADOW_MAP and BUSINESS_SKILLS_MAP in constants.
     """
     penta_gates = hd_constants.PENTA_GATES
-    combined_gates = set()
-    for gs in person_gates_dict.values():
-        combined_gates.update(gs)
+    group = hd.GroupComposite(person_gates_dict)
+    combined_gates = group.gates
     
     skills = []
     shadows = []
@@ -312,20 +317,8 @@ def get_penta_dynamics(person_gates_dict):
             shadows.append(hd_constants.BUSINESS_SHADOW_MAP.get(g, f"Gate {g}"))
             
     # --- Total Centers (Energy Density) ---
-    # Construct a robust pseudo-gate-dict for the group
-    gates_list = list(combined_gates)
-    group_gate_dict = {
-        "gate": gates_list,
-        "label": ["grp"] * len(gates_list),
-        "planets": ["Group"] * len(gates_list)
-    }
-    try:
-        # Use a secondary dict to avoid in-place issues if necessary
-        _, active_chakras = hd.get_channels_and_active_chakras(group_gate_dict)
-        total_centers = len(active_chakras)
-    except Exception as e:
-        print(f"Error calculating group centers: {e}")
-        total_centers = 0
+    # Centers of the N-person composite chart
+    total_centers = len(group.chakras)
 
     return {
         "active_skills": skills,
@@ -360,387 +353,572 @@ def get_lunar_phase_flag(jd):
         pass
     return "Neutral Lunar Cycle"
 
-def process_person_data(name, data):
+#shared process pool for chart calculations (created on first use)
+_chart_pool = None
+_chart_pool_lock = threading.Lock()
+
+def get_chart_pool():
     """
-    Process a single person's data: geocode, timezone, HD features.
-    Returns (timestamp, person_details_dict).
+    Lazily created ProcessPoolExecutor for CPU bound ephemeris work.
+    Worker count via HD_CHART_WORKERS (default: cpu count), 0 disables the pool.
+    """
+    global _chart_pool
+    workers = int(os.getenv("HD_CHART_WORKERS", os.cpu_count() or 1))
+    if workers <= 0:
+        return None
+    with _chart_pool_lock:
+        if _chart_pool is None:
+            _chart_pool = ProcessPoolExecutor(max_workers=workers)
+        return _chart_pool
+
+def calc_person_chart(timestamp):
     """
+    Chart of one person (runs in worker processes).
+    Returns unpacked calc_single_hd_features result incl. channel meanings.
+    """
+    hd_rawData = hd.calc_single_hd_features(timestamp, report=False, channel_meaning=True)
+    return hd.unpack_single_features(hd_rawData)
+
+def resolve_person_timestamp(name, data):
+    """
+    Geocode place and resolve timezone of a single person (IO bound).
+    Returns (timestamp, zone, birth_time).
+    """
+    place = data["place"]
+    # We expect data to be a dict from the API model
+    year = data["year"]
+    month = data["month"]
+    day = data["day"]
+    hour = data["hour"]
+    minute = data["minute"]
+    
+    # Geocode Bypass
+    # Check if lat/long are provided in input data
+    # Time zone from the geocode cache, TimezoneFinder only for given coordinates
+    latitude, longitude, zone = get_latitude_longitude_zone(place, data.get("latitude"), data.get("longitude"))
+    if latitude is None or longitude is None:
+        raise ValueError(f"Could not geocode place: {place}")
+    
+    # Calculate UTC offset
+    birth_time = (year, month, day, hour, minute, 0) # seconds default 0
+    hours_offset = hd.get_utc_offset_from_tz(birth_time, zone)
+    
+    # HD Timestamp
+    timestamp = (year, month, day, hour, minute, 0, int(hours_offset))
+    return timestamp, zone, birth_time
+
+def build_person_details(name, place, zone, birth_time, timestamp, hd_data):
+    """
+    Person details dict (API format) of an already calculated chart.
+    """
+    # Format Dates
+    # Standardize birth_date to ISO UTC
     try:
-        place = data["place"]
-        # Extract inputs (assuming standard keys or tuple-like access if needed, but dict is better)
-        # We expect data to be a dict from the API model
-        year = data["year"]
-        month = data["month"]
-        day = data["day"]
-        hour = data["hour"]
-        minute = data["minute"]
-        
-        # Geocode Bypass
-        # Check if lat/long are provided in input data
-        latitude = data.get("latitude")
-        longitude = data.get("longitude")
-        
-        if latitude is None or longitude is None:
-             latitude, longitude = get_latitude_longitude(place)
-             
-        if latitude is None or longitude is None:
-            raise ValueError(f"Could not geocode place: {place}")
-
-        # Timezone
-        if "/" in place:
-            zone = place
+         # Cached zone offset table instead of a pytz object per person
+        utc_dt = datetime(*birth_time) - timedelta(hours=hd.get_utc_offset_from_tz(birth_time, zone))
+        formatted_birth_date = utc_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    except Exception:
+         # Fallback
+         formatted_birth_date = str(timestamp)
+
+
+    formatted_create_date = "Unknown"
+    try:
+        c_date_str = hd_data["create_date"]
+        c_date_parts = [int(p) for p in c_date_str.strip("()").split(",")]
+        c_dt = datetime(*c_date_parts)
+        formatted_create_date = c_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    except Exception:
+         formatted_create_date = hd_data["create_date"]
+
+    # Map HD Attributes
+    energy_type = hd_constants.TYPE_DETAILS_MAP.get(hd_data["typ"], {}).get("type", hd_data["typ"])
+    type_details = hd_constants.TYPE_DETAILS_MAP.get(hd_data["typ"], {})
+    
+    auth_code = hd_data["auth"]
+    inner_authority = hd_constants.INNER_AUTHORITY_NAMES_MAP.get(auth_code, auth_code)
+    
+    # Centers
+    defined_centers_names = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in hd_data["active_chakra"]]
+    undefined_centers_names = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in (set(hd_constants.CHAKRA_LIST) - set(hd_data["active_chakra"]))]
+    
+    # Cross
+    descriptive_inc_cross = str(hd_data["inc_cross"])
+    try:
+        date_to_gate = hd_data["date_to_gate_dict"]
+        p_sun_gate = date_to_gate["gate"][0]
+        inc_typ = hd_data["inc_cross_typ"]
+        cross_info = hd_constants.CROSS_DB.get(p_sun_gate)
+        if cross_info and inc_typ in cross_info:
+             descriptive_inc_cross = cross_info[inc_typ]
         else:
-            # Use singleton tf from geolocation
-            zone = tf.timezone_at(lat=latitude, lng=longitude) or 'Etc/UTC'
-        
-        # Calculate UTC offset
-        birth_time = (year, month, day, hour, minute, 0) # seconds default 0
-        hours_offset = hd.get_utc_offset_from_tz(birth_time, zone)
+             descriptive_inc_cross = f"{hd_data['inc_cross']}-{inc_typ}"
+    except Exception:
+         pass
+
+    # Channels
+    channels_list = []
+    if "active_channel" in hd_data:
+         ac = hd_data["active_channel"]
+         gates = ac.get("ch_gate", [])
+         meanings = ac.get("meaning", [])
+         for i in range(len(gates) // 2): # Iterate by pairs? No, ch_gate is list of gates. 
+             # Wait, run_composite_combinations loop was: range(len(gates)) where gates is list of [g1, g2]
+             # Let's check format. 'active_channels' from unpack is dict.
+             # Actually calc_single_hd_features returns dict with keys 'ch_gate' which is list of [g1, g2] lists.
+             # Let's verify... yes.
+             pass
+         
+         # Re-structure properly
+         gates_a = ac.get("gate", [])
+         gates_b = ac.get("ch_gate", [])
+         meanings = ac.get("meaning", [])
+         
+         for i in range(len(gates_a)):
+             ch_data = {"gates": [int(gates_a[i]), int(gates_b[i])]}
+             if i < len(meanings):
+                 ch_data["meaning"] = meanings[i]
+             channels_list.append(ch_data)
+
+
+    # Profile
+    profile_code = tuple(hd_data["profile"]) if isinstance(hd_data["profile"], list) else hd_data["profile"]
+    profile_desc = hd_constants.PROFILE_DB.get(profile_code, f"{profile_code[0]}/{profile_code[1]}")
+
+    # Activation Matrix (High-Fidelity)
+    # 10x Enhancement: Added 'position' for explicit degrees
+    activations_matrix = {}
+    target_dict = hd_data["date_to_gate_dict"]
+    for i in range(len(target_dict["gate"])):
+        p_name = target_dict["planets"][i]
+        # Handle longitude: might be float or already formatted?
+        # Core.py `date_to_gate` returns `result_dict["lon"]` which are floats.
+        # We format it to string "DDD.ddd" or similar for API clarity.
+        lon_val = target_dict["lon"][i]
+        pos_str = f"{lon_val:.4f}"
         
-        # HD Timestamp
-        timestamp = (year, month, day, hour, minute, 0, int(hours_offset))
+        activations_matrix[p_name] = {
+            "gate": int(target_dict["gate"][i]),
+            "line": int(target_dict["line"][i]),
+            "color": int(target_dict["color"][i]),
+            "tone": int(target_dict["tone"][i]),
+            "base": int(target_dict["base"][i]),
+            "planet": p_name,
+            "position": pos_str
+        }
 
-        # Core Calculations
-        hd_rawData = hd.calc_single_hd_features(timestamp, report=False, channel_meaning=True)
-        hd_data = hd.unpack_single_features(hd_rawData)
-        
-        # Format Dates
-        # Standardize birth_date to ISO UTC
-        try:
-             # Create timezone object
-            local_tz = pytz.timezone(zone)
-            local_dt = local_tz.localize(datetime(*birth_time))
-            utc_dt = local_dt.astimezone(pytz.utc)
-            formatted_birth_date = utc_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-        except Exception:
-             # Fallback
-             formatted_birth_date = str(timestamp)
+    person_details = {
+        "name": name, # Echo name back
+        "place": place,
+        "tz": zone,
+        "birth_date": formatted_birth_date,
+        "create_date": formatted_create_date,
+        "energy_type": energy_type,
+        "strategy": type_details.get("strategy"),
+        "signature": type_details.get("signature"),
+        "not_self": type_details.get("not_self"),
+        "aura": type_details.get("aura"),
+        "inner_authority": inner_authority,
+        "inc_cross": descriptive_inc_cross,
+        "profile": profile_desc,
+        "defined_centers": defined_centers_names,
+        "undefined_centers": undefined_centers_names,
+        "definition": hd_constants.DEFINITION_DB.get(str(hd_data["definition"]), str(hd_data["definition"])),
+        "activations": activations_matrix,
+        "channels": channels_list,
+        # 10x Enhancements (Tier 2)
+        "variables": hd_data.get("variables"),
+        "lunar_context": hd.get_lunar_phase(hd_data["date_to_gate_dict"])
+    }
 
+    return person_details
 
-        formatted_create_date = "Unknown"
+def geocode_participants(items):
+    """
+    Batch geocode the places of (name, data) items without coordinates (see geocode_places),
+    so resolving their timestamps afterwards only hits the geocode cache.
+    """
+    geocode_places([data["place"] for _, data in items
+                    if (data.get("latitude") is None or data.get("longitude") is None) and "/" not in data["place"]])
+
+def submit_person_chart(name, data, pool=None):
+    """
+    Resolve a person's timestamp and start the chart calculation in pool.
+    Returns (timestamp, zone, birth_time, future), future is None without pool
+    (or if the pool is broken), raises ValueError if the place cannot be geocoded.
+    """
+    timestamp, zone, birth_time = resolve_person_timestamp(name, data)
+    future = None
+    if pool is not None:
         try:
-            c_date_str = hd_data["create_date"]
-            c_date_parts = [int(p) for p in c_date_str.strip("()").split(",")]
-            c_dt = datetime(*c_date_parts)
-            formatted_create_date = c_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-        except Exception:
-             formatted_create_date = hd_data["create_date"]
-
-        # Map HD Attributes
-        energy_type = hd_constants.TYPE_DETAILS_MAP.get(hd_data["typ"], {}).get("type", hd_data["typ"])
-        type_details = hd_constants.TYPE_DETAILS_MAP.get(hd_data["typ"], {})
-        
-        auth_code = hd_data["auth"]
-        inner_authority = hd_constants.INNER_AUTHORITY_NAMES_MAP.get(auth_code, auth_code)
-        
-        # Centers
-        defined_centers_names = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in hd_data["active_chakra"]]
-        undefined_centers_names = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in (set(hd_constants.CHAKRA_LIST) - set(hd_data["active_chakra"]))]
-        
-        # Cross
-        descriptive_inc_cross = str(hd_data["inc_cross"])
+            future = pool.submit(calc_person_chart, timestamp)
+        except BrokenProcessPool:
+            future = None
+    return timestamp, zone, birth_time, future
+
+def person_chart_result(timestamp, future=None):
+    """
+    Chart of a submitted calculation (see submit_person_chart),
+    calculated in process without future or if the pool broke.
+    """
+    if future is not None:
         try:
-            date_to_gate = hd_data["date_to_gate_dict"]
-            p_sun_gate = date_to_gate["gate"][0]
-            inc_typ = hd_data["inc_cross_typ"]
-            cross_info = hd_constants.CROSS_DB.get(p_sun_gate)
-            if cross_info and inc_typ in cross_info:
-                 descriptive_inc_cross = cross_info[inc_typ]
-            else:
-                 descriptive_inc_cross = f"{hd_data['inc_cross']}-{inc_typ}"
-        except Exception:
-             pass
+            return future.result()
+        except BrokenProcessPool:
+            pass
+    return calc_person_chart(timestamp)
 
-        # Channels
-        channels_list = []
-        if "active_channel" in hd_data:
-             ac = hd_data["active_channel"]
-             gates = ac.get("ch_gate", [])
-             meanings = ac.get("meaning", [])
-             for i in range(len(gates) // 2): # Iterate by pairs? No, ch_gate is list of gates. 
-                 # Wait, run_composite_combinations loop was: range(len(gates)) where gates is list of [g1, g2]
-                 # Let's check format. 'active_channels' from unpack is dict.
-                 # Actually calc_single_hd_features returns dict with keys 'ch_gate' which is list of [g1, g2] lists.
-                 # Let's verify... yes.
-                 pass
-             
-             # Re-structure properly
-             gates_a = ac.get("gate", [])
-             gates_b = ac.get("ch_gate", [])
-             meanings = ac.get("meaning", [])
-             
-             for i in range(len(gates_a)):
-                 ch_data = {"gates": [int(gates_a[i]), int(gates_b[i])]}
-                 if i < len(meanings):
-                     ch_data["meaning"] = meanings[i]
-                 channels_list.append(ch_data)
-
-
-        # Profile
-        profile_code = tuple(hd_data["profile"]) if isinstance(hd_data["profile"], list) else hd_data["profile"]
-        profile_desc = hd_constants.PROFILE_DB.get(profile_code, f"{profile_code[0]}/{profile_code[1]}")
-
-        # Activation Matrix (High-Fidelity)
-        # 10x Enhancement: Added 'position' for explicit degrees
-        activations_matrix = {}
-        target_dict = hd_data["date_to_gate_dict"]
-        for i in range(len(target_dict["gate"])):
-            p_name = target_dict["planets"][i]
-            # Handle longitude: might be float or already formatted?
-            # Core.py `date_to_gate` returns `result_dict["lon"]` which are floats.
-            # We format it to string "DDD.ddd" or similar for API clarity.
-            lon_val = target_dict["lon"][i]
-            pos_str = f"{lon_val:.4f}"
-            
-            activations_matrix[p_name] = {
-                "gate": int(target_dict["gate"][i]),
-                "line": int(target_dict["line"][i]),
-                "color": int(target_dict["color"][i]),
-                "tone": int(target_dict["tone"][i]),
-                "base": int(target_dict["base"][i]),
-                "planet": p_name,
-                "position": pos_str
-            }
-
-        person_details = {
-            "name": name, # Echo name back
-            "place": place,
-            "tz": zone,
-            "birth_date": formatted_birth_date,
-            "create_date": formatted_create_date,
-            "energy_type": energy_type,
-            "strategy": type_details.get("strategy"),
-            "signature": type_details.get("signature"),
-            "not_self": type_details.get("not_self"),
-            "aura": type_details.get("aura"),
-            "inner_authority": inner_authority,
-            "inc_cross": descriptive_inc_cross,
-            "profile": profile_desc,
-            "defined_centers": defined_centers_names,
-            "undefined_centers": undefined_centers_names,
-            "definition": hd_constants.DEFINITION_DB.get(str(hd_data["definition"]), str(hd_data["definition"])),
-            "activations": activations_matrix,
-            "channels": channels_list,
-            # 10x Enhancements (Tier 2)
-            "variables": hd_data.get("variables"),
-            "lunar_context": hd.get_lunar_phase(hd_data["date_to_gate_dict"])
-        }
+def process_person_chart(name, data, pool=None):
+    """
+    Process a single person's data: geocode, timezone, HD features.
+    The chart is calculated exactly once (in pool if given, else in process).
+    Returns (timestamp, person_details_dict, hd_data) or (None, None, None) on error.
+    """
+    try:
+        timestamp, zone, birth_time, future = submit_person_chart(name, data, pool)
+
+        # Core Calculations
+        hd_data = person_chart_result(timestamp, future)
 
-        return timestamp, person_details
+        person_details = build_person_details(name, data["place"], zone, birth_time, timestamp, hd_data)
+        return timestamp, person_details, hd_data
 
     except Exception as e:
         # Log error or re-raise
         print(f"Error processing person {name}: {e}")
-        return None, None
+        return None, None, None
 
+def process_person_data(name, data):
+    """
+    Process a single person's data: geocode, timezone, HD features.
+    Returns (timestamp, person_details_dict).
+    """
+    timestamp, person_details, _ = process_person_chart(name, data)
+    return timestamp, person_details
 
-def process_hybrid_analysis(participants, group_type="family", verbosity="all"):
+
+#synergy fields that are only calculated for verbosity "all"
+HEAVY_SYNERGY_FIELDS = ["penta_details", "variable_synergy", "environmental_resonance_detail"]
+
+def build_dyad_party(name, timestamp, details, hd_data):
     """
-    Orchestrates Maia Matrix (Dyads) and Penta (Group) analysis.
-    Returns a dictionary suitable for HybridAnalysisResponse.
+    Per person data of the dyad calculation (picklable, sent to worker processes).
+    Holds the chart masks, gate -> planets map, node gates, definition and details.
     """
-    if len(participants) < 2:
-        raise ValueError("At least 2 participants are required for hybrid analysis.")
+    gate_to_planet = {}
+    nodes = set()
+    raw_gates = hd_data["date_to_gate_dict"]["gate"]
+    raw_planets = hd_data["date_to_gate_dict"]["planets"]
+    for i in range(len(raw_gates)):
+        g = int(raw_gates[i])
+        p_name = raw_planets[i]
+        if g not in gate_to_planet:
+            gate_to_planet[g] = []
+        gate_to_planet[g].append(p_name)
+        if p_name in ["North_Node", "South_Node"]:
+            nodes.add(g)
+
+    chart = hd.PersonChart(name, timestamp, hd_data)
+    return {
+        "name": name,
+        "chart": chart,
+        "gates": chart.gates,
+        "gate_planets": gate_to_planet,
+        "nodes": nodes,
+        "definition": hd_data["definition"],
+        "details": details,
+    }
 
-    processed_persons_dict = {}
-    utc_birthdata_dict = {}
-    person_gates_map = {}
-    person_gate_planet_map = {}
-    person_nodes_map = {}
-    person_definition_map = {}
-    full_activations = {}
+def build_dyad(combo, p1, p2, group_size, penta_dynamics=None, verbosity="all"):
+    """
+    Maia dyad of one composite record (see hd.get_composite_records).
+    verbosity "partial" skips sub-line activations and the heavy synergy fields
+    (HEAVY_SYNERGY_FIELDS) instead of calculating and filtering them.
+    """
+    full = verbosity == "all"
+    combo = dict(combo)
+    if "new_chakra" in combo and isinstance(combo["new_chakra"], list):
+        combo["new_chakra"] = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in combo["new_chakra"]]
+
+    p1_gates = p1["gates"]
+    p2_gates = p2["gates"]
+    combined_gates = p1_gates.union(p2_gates)
+
+    chakra_count = combo.get("chakra_count", 0)
+    connection_label = get_connection_classification(chakra_count)
+    combo["connection_code"] = connection_label
+
+    new_channels = combo.get("new_channels", [])
+    ch_meanings = combo.get("new_ch_meaning", [])
+
+    maia_details = []
+    circuitry_counts = {"Individual": 0, "Tribal": 0, "Collective": 0, "Integration": 0}
+    flavors = []
+
+    for i, channel in enumerate(new_channels):
+        g1, g2 = channel
+        c_key = tuple(sorted((g1, g2)))
+        c_type_short = hd_constants.circuit_typ_dict.get(c_key, "Unknown")
+        c_group = hd_constants.circuit_group_typ_dict.get(c_type_short, "Unknown")
+        if c_group in circuitry_counts:
+            circuitry_counts[c_group] += 1
+
+        p1_triggers = p1["gate_planets"].get(g1, ["None"]) + p1["gate_planets"].get(g2, ["None"])
+        p2_triggers = p2["gate_planets"].get(g1, ["None"]) + p2["gate_planets"].get(g2, ["None"])
+
+        p1_flavor = [t for t in p1_triggers if t != "None"]
+        p2_flavor = [t for t in p2_triggers if t != "None"]
+        flavors.append(f"{'/'.join(p1_flavor)}-{'/'.join(p2_flavor)}")
+
+        # Active sub-line details
+        maia_activations = []
+        if full:
+            for party in (p1, p2):
+                for act in party["details"].get("activations", {}).values():
+                    if act["gate"] in channel:
+                        maia_activations.append(act)
 
-    full_activations = {}
+        maia_details.append({
+            "channel": channel,
+            "meaning": ch_meanings[i] if i < len(ch_meanings) else "Unknown",
+            "type": classify_maia_connection(p1_gates, p2_gates, channel),
+            "circuitry": get_sub_circuit_detail(channel),
+            "planetary_trigger": f"P1:{'/'.join(p1_flavor)} | P2:{'/'.join(p2_flavor)}",
+            "activations": maia_activations
+        })
 
-    # 1. Concurrent Batch Process Person Data
-    # Using ThreadPoolExecutor to handle IO-bound operations (geocoding) in parallel
-    from concurrent.futures import ThreadPoolExecutor
-    
-    def _process_single_person(item):
-        name, data = item
-        if hasattr(data, "dict"):
-            data = data.dict()
-        try:
-             # Process
-             ts, details = process_person_data(name, data)
-             return name, ts, details
-        except Exception as e:
-             # Log and return None to be filtered out
-             print(f"Error processing {name}: {e}")
-             return name, None, None
+    combo["maia_details"] = maia_details
 
-    with ThreadPoolExecutor() as executor:
-        results = list(executor.map(_process_single_person, participants.items()))
+    # Synergy
+    p1_details = p1["details"]
+    p2_details = p2["details"]
 
-    for name, ts, details in results:
-        if ts:
-            processed_persons_dict[name] = ts
-            utc_birthdata_dict[name] = details
-            
-            # Recalculate raw features for parity with process_maia_matrix maps
-            # This part is CPU bound, could be kept out of thread pool or moved in if preferred for full parallelism.
-            # Keeping it here for simplicity of shared state logic update.
-            hd_rawData = hd.calc_single_hd_features(ts, report=False, channel_meaning=True)
-            hd_unpacked = hd.unpack_single_features(hd_rawData)
-            
-            gates = set(hd_unpacked["date_to_gate_dict"]["gate"])
-            person_gates_map[name] = gates
-            person_definition_map[name] = hd_unpacked["definition"]
-             
-            # Maps
-            gate_to_planet = {}
-            nodes = set()
-            raw_gates = hd_unpacked["date_to_gate_dict"]["gate"]
-            raw_planets = hd_unpacked["date_to_gate_dict"]["planets"]
-            for i in range(len(raw_gates)):
-                g = int(raw_gates[i])
-                p_name = raw_planets[i]
-                if g not in gate_to_planet:
-                    gate_to_planet[g] = []
-                gate_to_planet[g].append(p_name)
-                if p_name in ["North_Node", "South_Node"]:
-                    nodes.add(g)
-            
-            person_gate_planet_map[name] = gate_to_planet
-            full_activations[name] = details.get("activations", {})
-            person_nodes_map[name] = nodes
+    is_bridged = (p1["definition"] != "1" or p2["definition"] != "1") and chakra_count >= 8
 
-    # 2. Penta Dynamics (Group >= 3)
-    penta_dynamics = None
-    if len(processed_persons_dict) >= 3:
-        penta_dynamics = get_penta_dynamics(person_gates_map)
-    
-    # 3. Dyad Matrix (All Pairs)
-    dyad_matrix = []
-    if len(processed_persons_dict) >= 2:
-        result_df = hd.get_composite_combinations(processed_persons_dict)
-        raw_combinations = result_df.to_dict(orient="records")
-        
-        for combo in raw_combinations:
-            # Basic fixes
-            if "new_chakra" in combo and isinstance(combo["new_chakra"], list):
-                combo["new_chakra"] = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in combo["new_chakra"]]
-            
-            p1_name, p2_name = combo["id"], combo["other_person"]
-            
-            # Use 'partial' logic if verbosity is low? 
-            # Spec says: "all": Returns full details. "partial": Returns only high-level.
-            # However, for now request model demands generic structure. We will compute full and let endpoint filter?
-            # Or better, compute only what's needed.
-            # Schema requires 'dyad_matrix' to be List[CombinationItem]. CombinationItem requires all fields.
-            # So we must compute ALL fields to satisfy the schema, UNLESS schema has Optionals.
-            # Looking at response_models.py, CombinationItem fields are mostly required.
-            # So we MUST compute everything. The 'verbosity' flag might just be for the HTTP response model filtering 
-            # (response_model_exclude) or we might need to adjust the schema to allow partials.
-            # For now, we compute full.
-            
-            p1_gates = person_gates_map.get(p1_name, set())
-            p2_gates = person_gates_map.get(p2_name, set())
-            combined_gates = p1_gates.union(p2_gates)
-            
-            chakra_count = combo.get("chakra_count", 0)
-            connection_label = get_connection_classification(chakra_count)
-            combo["connection_code"] = connection_label
-            
-            new_channels = combo.get("new_channels", [])
-            ch_meanings = combo.get("new_ch_meaning", [])
-            
-            maia_details = []
-            circuitry_counts = {"Individual": 0, "Tribal": 0, "Collective": 0, "Integration": 0}
-            flavors = []
-            
-            for i, channel in enumerate(new_channels):
-                g1, g2 = channel
-                c_key = tuple(sorted((g1, g2)))
-                c_type_short = hd_constants.circuit_typ_dict.get(c_key, "Unknown")
-                c_group = hd_constants.circuit_group_typ_dict.get(c_type_short, "Unknown")
-                if c_group in circuitry_counts:
-                    circuitry_counts[c_group] += 1
-                
-                p1_triggers = person_gate_planet_map.get(p1_name, {}).get(g1, ["None"]) + \
-                              person_gate_planet_map.get(p1_name, {}).get(g2, ["None"])
-                p2_triggers = person_gate_planet_map.get(p2_name, {}).get(g1, ["None"]) + \
-                              person_gate_planet_map.get(p2_name, {}).get(g2, ["None"])
-                
-                p1_flavor = [t for t in p1_triggers if t != "None"]
-                p2_flavor = [t for t in p2_triggers if t != "None"]
-                flavors.append(f"{'/'.join(p1_flavor)}-{'/'.join(p2_flavor)}")
-                
-                # Active sub-line details
-                maia_activations = []
-                for p_name_act, act in full_activations.get(p1_name, {}).items():
-                    if act["gate"] in channel:
-                        maia_activations.append(act)
-                for p_name_act, act in full_activations.get(p2_name, {}).items():
-                    if act["gate"] in channel:
-                        maia_activations.append(act)
+    love_gates_list = [10, 15, 25, 46, 5, 2, 29]
+    active_love_gates = [g for g in love_gates_list if g in combined_gates]
 
-                maia_details.append({
-                    "channel": channel,
-                    "meaning": ch_meanings[i] if i < len(ch_meanings) else "Unknown",
-                    "type": classify_maia_connection(p1_gates, p2_gates, channel),
-                    "circuitry": get_sub_circuit_detail(channel),
-                    "planetary_trigger": f"P1:{'/'.join(p1_flavor)} | P2:{'/'.join(p2_flavor)}",
-                    "activations": maia_activations
-                })
-            
-            combo["maia_details"] = maia_details
-            
-            # Synergy
-            p1_details = utc_birthdata_dict.get(p1_name, {})
-            p2_details = utc_birthdata_dict.get(p2_name, {})
-            
-            is_bridged = (person_definition_map.get(p1_name, "1") != "1" or person_definition_map.get(p2_name, "1") != "1") and chakra_count >= 8
-            
-            love_gates_list = [10, 15, 25, 46, 5, 2, 29]
-            active_love_gates = [g for g in love_gates_list if g in combined_gates]
-            
-            dynamics = calculate_center_dynamics(
-                p1_details.get("defined_centers", []),
-                p2_details.get("defined_centers", [])
-            )
-            space_count = list(dynamics.values()).count("open_window")
-            
-            combo["synergy"] = {
-                "thematic_label": connection_label,
-                "bridge_active": is_bridged,
-                "center_dynamics": dynamics,
-                "aura_dynamic": get_aura_dynamic(p1_details.get("energy_type"), p2_details.get("energy_type")),
-                "love_gate_highlights": active_love_gates,
-                "space_count": space_count,
-                "circuitry_dominant": max(circuitry_counts, key=circuitry_counts.get) if any(circuitry_counts.values()) else "None",
-                "profile_resonance": get_profile_resonance(p1_details.get("profile"), p2_details.get("profile")),
-                "node_resonance": get_node_resonance(person_nodes_map.get(p1_name, set()), person_nodes_map.get(p2_name, set())),
-                "dominant_sub_circuit": get_sub_circuit_detail(new_channels[0]) if new_channels else "Multiple/Neutral",
-                "planetary_flavor_summary": flavors[0] if flavors else "Neutral",
-                "group_dynamic_summary": f"Penta Structure ({len(processed_persons_dict)})" if penta_dynamics else f"Pairwise ({len(processed_persons_dict)})",
-                "penta_details": penta_dynamics, # Include penta context in pair if relevant, though redundant
-                # v3.1.0 Relational Intelligence
-                "variable_synergy": calculate_variable_synergy(p1_details.get("variables"), p2_details.get("variables")).model_dump(),
-                "environmental_resonance_detail": get_detailed_node_resonance(person_nodes_map.get(p1_name, set()), person_nodes_map.get(p2_name, set())).model_dump()
-            }
-            
-            dyad_matrix.append(combo)
+    dynamics = calculate_center_dynamics(
+        p1_details.get("defined_centers", []),
+        p2_details.get("defined_centers", [])
+    )
+    space_count = list(dynamics.values()).count("open_window")
+
+    combo["synergy"] = {
+        "thematic_label": connection_label,
+        "bridge_active": is_bridged,
+        "center_dynamics": dynamics,
+        "aura_dynamic": get_aura_dynamic(p1_details.get("energy_type"), p2_details.get("energy_type")),
+        "love_gate_highlights": active_love_gates,
+        "space_count": space_count,
+        "circuitry_dominant": max(circuitry_counts, key=circuitry_counts.get) if any(circuitry_counts.values()) else "None",
+        "profile_resonance": get_profile_resonance(p1_details.get("profile"), p2_details.get("profile")),
+        "node_resonance": get_node_resonance(p1["nodes"], p2["nodes"]),
+        "dominant_sub_circuit": get_sub_circuit_detail(new_channels[0]) if new_channels else "Multiple/Neutral",
+        "planetary_flavor_summary": flavors[0] if flavors else "Neutral",
+        "group_dynamic_summary": f"Penta Structure ({group_size})" if group_size >= 3 else f"Pairwise ({group_size})",
+    }
+    if full:
+        combo["synergy"].update({
+            "penta_details": penta_dynamics, # Include penta context in pair if relevant, though redundant
+            # v3.1.0 Relational Intelligence
+            "variable_synergy": calculate_variable_synergy(p1_details.get("variables"), p2_details.get("variables")).model_dump(),
+            "environmental_resonance_detail": get_detailed_node_resonance(p1["nodes"], p2["nodes"]).model_dump()
+        })
+    return combo
+
+def prepare_hybrid_participants(participants):
+    """
+    Geocode and calculate all participants.
+    All places without coordinates are geocoded in one batch first (upstream lookups run
+    concurrently on the async geocoder, coalesced per place and rate limited), so resolving
+    the timestamps only hits the geocode cache. Then the charts of all persons are submitted
+    to the shared process pool at once and collected in input order, every chart is
+    calculated exactly once.
+    Returns dict name -> dyad party (see build_dyad_party), input order, failed persons skipped.
+    """
+    if len(participants) < 2:
+        raise ValueError("At least 2 participants are required for hybrid analysis.")
 
-    # 4. Meta & Final Response (10x Enhancement)
-    from datetime import datetime
-    
+    chart_pool = get_chart_pool()
+    items = [(name, data.dict() if hasattr(data, "dict") else data) for name, data in participants.items()]
+    geocode_participants(items)
+
+    submitted = {}
+    for name, data in items:
+        try:
+            submitted[name] = submit_person_chart(name, data, chart_pool)
+        except Exception as e:
+            # Log and skip the person
+            print(f"Error processing {name}: {e}")
+
+    parties = {}
+    for name, data in items:
+        if name not in submitted:
+            continue
+        timestamp, zone, birth_time, future = submitted[name]
+        try:
+            hd_data = person_chart_result(timestamp, future)
+            details = build_person_details(name, data["place"], zone, birth_time, timestamp, hd_data)
+        except Exception as e:
+            print(f"Error processing {name}: {e}")
+            continue
+        parties[name] = build_dyad_party(name, timestamp, details, hd_data)
+    return parties
+
+def hybrid_meta():
+    """ engine provenance of hybrid analysis responses """
     # Get pyswisseph version if possible, or swisseph lib version
     # swe.swe_version() might require path/args. swe.version() isn't standard function name in pyswisseph 2.x?
     # Actually `swe` module from pyswisseph doesn't always expose version string easy.
     # But `swe.swe_calc_ut` relies on underlying dll.
     # We'll hardcode "pyswisseph" and dynamic timestamp for now or try-catch version.
-    ephemeris_ver = "SwissEph (pyswisseph)" 
-    
-    meta = {
+    ephemeris_ver = "SwissEph (pyswisseph)"
+
+    return {
         "engine": "Maia-Penta v2.0",
         "ephemeris": ephemeris_ver,
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
+def participant_details(parties, verbosity="all"):
+    """ person details of all parties, without activation matrix for verbosity "partial" """
+    if verbosity == "all":
+        return {name: party["details"] for name, party in parties.items()}
+    return {name: {k: v for k, v in party["details"].items() if k != "activations"}
+            for name, party in parties.items()}
+
+def process_hybrid_analysis(participants, group_type="family", verbosity="all"):
+    """
+    Orchestrates Maia Matrix (Dyads) and Penta (Group) analysis.
+    Returns a dictionary suitable for HybridAnalysisResponse.
+    """
+    parties = prepare_hybrid_participants(participants)
+
+    # 1. Penta Dynamics (Group >= 3)
+    penta_dynamics = None
+    if len(parties) >= 3:
+        penta_dynamics = get_penta_dynamics({name: party["gates"] for name, party in parties.items()})
+
+    # 2. Dyad Matrix (All Pairs)
+    dyad_matrix = []
+    if len(parties) >= 2:
+        # Reuse charts of prepare_hybrid_participants
+        raw_combinations = hd.get_composite_records(
+            {name: party["chart"].timestamp for name, party in parties.items()},
+            charts={name: party["chart"] for name, party in parties.items()}
+        )
+        for combo in raw_combinations:
+            dyad_matrix.append(build_dyad(combo, parties[combo["id"]], parties[combo["other_person"]],
+                                          len(parties), penta_dynamics, verbosity))
+
     return sanitize_for_json({
-        "meta": meta,
-        "participants": utc_birthdata_dict,
+        "meta": hybrid_meta(),
+        "participants": participant_details(parties, verbosity),
         "penta_dynamics": penta_dynamics,
         "dyad_matrix": dyad_matrix
     })
+
+def _dyad_chunk(pairs, parties, group_size, verbosity):
+    """ dyads of a chunk of pairs (runs in worker processes) """
+    engine = hd.GroupCompositeEngine({}, charts={name: party["chart"] for name, party in parties.items()})
+    dyads = []
+    for p1, p2 in pairs:
+        dyad = build_dyad(hd.composite_record(p1, p2, engine.pair(p1, p2)),
+                          parties[p1], parties[p2], group_size, verbosity=verbosity)
+        # penta summary is streamed once at the end
+        dyad["synergy"].pop("penta_details", None)
+        dyads.append(sanitize_for_json(dyad))
+    return dyads
+
+def _pair_chunks(names, chunk_size):
+    """ pair combinations of names in chunks (generator, pairs are never materialized at once) """
+    chunk = []
+    for i, p1 in enumerate(names):
+        for p2 in names[i + 1:]:
+            chunk.append((p1, p2))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+def iter_hybrid_analysis(parties, verbosity="all", pool=None, chunk_size=64, max_pending=None):
+    """
+    Hybrid analysis as stream of records (for NDJSON responses):
+        {"type": "meta", "meta": ..., "participants": ...}
+        {"type": "dyad", "dyad": ...} for every pair, emitted as soon as its chunk is done
+        {"type": "penta", "penta_dynamics": ...} last (None for groups < 3)
+    Pairs are generated lazily in chunks and calculated in pool (if given), at most
+    max_pending chunks (default: 2 per worker) are in flight, so memory does not grow
+    with the number of pairs. Dyads do not repeat penta_details, it follows at the end.
+    Args:
+        parties(dict): see prepare_hybrid_participants
+    """
+    yield {"type": "meta", "meta": hybrid_meta(), "participants": sanitize_for_json(participant_details(parties, verbosity))}
+
+    names = list(parties)
+    group_size = len(names)
+
+    def _submit(chunk):
+        needed = {name for pair in chunk for name in pair}
+        return pool.submit(_dyad_chunk, chunk, {n: parties[n] for n in needed}, group_size, verbosity)
+
+    chunks = _pair_chunks(names, chunk_size)
+    pending = deque()
+    if pool is not None:
+        max_pending = max_pending or 2 * getattr(pool, "_max_workers", 1)
+        try:
+            for chunk in chunks:
+                # queued before submit, a broken pool can not lose the chunk
+                pending.append((chunk, None))
+                pending[-1] = (chunk, _submit(chunk))
+                while len(pending) >= max_pending:
+                    for dyad in pending[0][1].result():
+                        yield {"type": "dyad", "dyad": dyad}
+                    pending.popleft()
+            while pending:
+                for dyad in pending[0][1].result():
+                    yield {"type": "dyad", "dyad": dyad}
+                pending.popleft()
+        except BrokenProcessPool:
+            # Pool died: unfinished and remaining chunks are calculated in process
+            pass
+    for chunk in itertools.chain([chunk for chunk, _ in pending], chunks):
+        for dyad in _dyad_chunk(chunk, parties, group_size, verbosity):
+            yield {"type": "dyad", "dyad": dyad}
+
+    penta_dynamics = None
+    if group_size >= 3:
+        penta_dynamics = get_penta_dynamics({name: party["gates"] for name, party in parties.items()})
+    yield {"type": "penta", "penta_dynamics": sanitize_for_json(penta_dynamics)}
+
+def process_dyad_matrix(participants, pairs=None, verbosity="partial"):
+    """
+    Dense pairwise Maia metrics of all participants (see hd.dyad_matrices).
+    Narrative dyads (build_dyad) are only rendered for the requested pairs.
+    Returns a dictionary with ids, N x N count matrices, circuitry per group and dyads.
+    """
+    pairs = pairs or []
+    parties = prepare_hybrid_participants(participants)
+    for pair in pairs:
+        if len(pair) != 2 or pair[0] == pair[1]:
+            raise ValueError(f"A pair needs two different participants: {pair}")
+        unknown = [name for name in pair if name not in parties]
+        if unknown:
+            raise ValueError(f"Unknown or failed participants in pair: {unknown}")
+
+    matrices = hd.dyad_matrices({name: party["gates"] for name, party in parties.items()})
+    engine = hd.GroupCompositeEngine({}, charts={name: party["chart"] for name, party in parties.items()})
+    dyads = [
+        build_dyad(hd.composite_record(p1, p2, engine.pair(p1, p2)), parties[p1], parties[p2],
+                   len(parties), verbosity=verbosity)
+        for p1, p2 in pairs
+    ]
+    result = {key: value.tolist() for key, value in matrices.items()
+              if key not in ("ids", "circuitry")}
+    result["circuitry"] = {group: matrices["circuitry"][..., g].tolist()
+                           for g, group in enumerate(CIRCUIT_GROUPS)}
+    result["ids"] = matrices["ids"]
+    result["dyads"] = dyads
+    return sanitize_for_json(result)
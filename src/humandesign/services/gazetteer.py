@@ -0,0 +1,222 @@
+import bisect
+import difflib
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional, List
+import numpy as np
+
+#GeoNames "cities" dump (e.g. cities15000.txt from https://download.geonames.org/export/dump/)
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "gazetteer.txt")
+#GeoNames countryInfo.txt, optional (country names as qualifiers, e.g. "Istanbul, Turkey")
+COUNTRIES_FILE = "countryInfo.txt"
+#GeoNames admin1CodesASCII.txt, optional (state/province names as qualifiers, e.g. "Paris, Texas")
+ADMIN1_FILE = "admin1CodesASCII.txt"
+
+#column indices of the GeoNames geoname table
+COL_NAME, COL_ASCIINAME, COL_ALTERNATENAMES = 1, 2, 3
+COL_LATITUDE, COL_LONGITUDE = 4, 5
+COL_COUNTRY, COL_ADMIN1 = 8, 10
+COL_POPULATION, COL_TIMEZONE = 14, 17
+
+#common country spellings that are not in countryInfo.txt
+COUNTRY_ALIASES = {
+    "usa": "US", "us": "US", "u s a": "US", "america": "US", "united states of america": "US",
+    "uk": "GB", "england": "GB", "scotland": "GB", "wales": "GB", "great britain": "GB",
+    "turkiye": "TR", "holland": "NL", "czech republic": "CZ", "russia": "RU", "south korea": "KR",
+}
+
+#min. similarity of a fuzzy name match (difflib ratio)
+FUZZY_CUTOFF = 0.8
+
+def normalize_name(name: str) -> str:
+    """
+    Normalized index key of a place name: accents removed, case folded,
+    punctuation replaced by single spaces ("Zürich" -> "zurich", "St. Louis" -> "st louis").
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", stripped.casefold()).split())
+
+@dataclass
+class Place:
+    name: str
+    latitude: float
+    longitude: float
+    country_code: str
+    admin1: str
+    population: int
+    timezone: str
+    match: str = "exact"
+
+class Gazetteer:
+    """
+    Offline geocoder on a GeoNames style gazetteer file.
+
+    The places are loaded once into column arrays (coordinates, population, country/admin1 codes,
+    time zone); the name index is a sorted list of normalized names (name, ascii name and
+    alternate names) with the matching row numbers, so exact and prefix lookups are binary
+    searches. Fuzzy matching only scans the names with the same first letter. Candidates are
+    filtered by the qualifiers after the first comma (country name/code, admin1 name/code) and
+    ranked by population. A known country or admin1 qualifier that no candidate matches means
+    the place is not in the gazetteer (no result), unknown qualifiers are ignored.
+
+    Args:
+        path (str): GeoNames geoname table (tab separated, 19 columns)
+        countries_path (str): optional GeoNames countryInfo.txt, default next to path
+        admin1_path (str): optional GeoNames admin1CodesASCII.txt, default next to path
+    """
+    def __init__(self, path: str, countries_path: Optional[str] = None, admin1_path: Optional[str] = None):
+        self.path = path
+        names, latitudes, longitudes, countries, admin1, populations, zones = [], [], [], [], [], [], []
+        index = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                cols = line.rstrip("\n").split("\t")
+                row = len(names)
+                names.append(cols[COL_NAME])
+                latitudes.append(float(cols[COL_LATITUDE]))
+                longitudes.append(float(cols[COL_LONGITUDE]))
+                countries.append(cols[COL_COUNTRY])
+                admin1.append(cols[COL_ADMIN1])
+                populations.append(int(cols[COL_POPULATION] or 0))
+                zones.append(cols[COL_TIMEZONE] if len(cols) > COL_TIMEZONE else "")
+                keys = {normalize_name(cols[COL_NAME]), normalize_name(cols[COL_ASCIINAME])}
+                keys.update(normalize_name(alt) for alt in cols[COL_ALTERNATENAMES].split(",") if alt)
+                index.extend((key, row) for key in keys if key)
+
+        self.names = names
+        self.latitudes = np.array(latitudes, dtype=np.float64)
+        self.longitudes = np.array(longitudes, dtype=np.float64)
+        self.countries = np.array(countries)
+        self.admin1 = np.array(admin1)
+        self.populations = np.array(populations, dtype=np.int64)
+        self.timezones = zones
+
+        index.sort()
+        self.keys = [key for key, _ in index]
+        self.key_rows = np.array([row for _, row in index], dtype=np.int32)
+
+        self.country_names = {normalize_name(alias): code for alias, code in COUNTRY_ALIASES.items()}
+        countries_path = countries_path or os.path.join(os.path.dirname(path), COUNTRIES_FILE)
+        if os.path.exists(countries_path):
+            with open(countries_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("#") or not line.strip():
+                        continue
+                    cols = line.rstrip("\n").split("\t")
+                    self.country_names[normalize_name(cols[4])] = cols[0]
+                    self.country_names[normalize_name(cols[1])] = cols[0]
+        self.country_codes = set(self.country_names.values())
+
+        #normalized admin1 name or code -> {(country code, admin1 code)}
+        self.admin1_names = {}
+        admin1_path = admin1_path or os.path.join(os.path.dirname(path), ADMIN1_FILE)
+        if os.path.exists(admin1_path):
+            with open(admin1_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("#") or not line.strip():
+                        continue
+                    cols = line.rstrip("\n").split("\t")
+                    country, _, code = cols[0].partition(".")
+                    for key in {normalize_name(cols[1]), normalize_name(cols[2]), normalize_name(code)}:
+                        if key:
+                            self.admin1_names.setdefault(key, set()).add((country, code))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _rows(self, lo: int, hi: int) -> np.ndarray:
+        return np.unique(self.key_rows[lo:hi])
+
+    def _candidates(self, key: str):
+        """ rows of the exact, prefix or fuzzy matches of a normalized name and the match kind """
+        lo = bisect.bisect_left(self.keys, key)
+        hi = bisect.bisect_right(self.keys, key, lo)
+        if hi > lo:
+            return self._rows(lo, hi), "exact"
+        #all keys starting with key are between key and key + max. code point
+        hi = bisect.bisect_left(self.keys, key + "\U0010ffff", lo)
+        if hi > lo:
+            return self._rows(lo, hi), "prefix"
+        first_lo = bisect.bisect_left(self.keys, key[0])
+        first_hi = bisect.bisect_left(self.keys, key[0] + "\U0010ffff", first_lo)
+        #distinct keys of the same first letter, ordered
+        same_letter = list(dict.fromkeys(self.keys[first_lo:first_hi]))
+        close = difflib.get_close_matches(key, same_letter, n=5, cutoff=FUZZY_CUTOFF)
+        if close:
+            rows = [self._rows(bisect.bisect_left(self.keys, c), bisect.bisect_right(self.keys, c))
+                    for c in close]
+            return np.unique(np.concatenate(rows)), "fuzzy"
+        return np.array([], dtype=np.int32), None
+
+    def _qualify(self, rows: np.ndarray, qualifiers: List[str]) -> np.ndarray:
+        """
+        keep the rows matching all qualifiers (country name/code or admin1 name/code),
+        no rows if a known country or admin1 is not among the candidates
+        """
+        for qualifier in qualifiers:
+            code = self.country_names.get(qualifier, qualifier.upper())
+            by_country = rows[self.countries[rows] == code]
+            admin1_codes = self.admin1_names.get(qualifier, set())
+            by_admin1 = rows[np.array([(country, admin1) in admin1_codes or admin1.lower() == qualifier
+                                       for country, admin1 in zip(self.countries[rows], self.admin1[rows])],
+                                      dtype=bool)]
+            selected = by_country if len(by_country) else by_admin1
+            if len(selected):
+                rows = selected
+            elif code in self.country_codes or admin1_codes:
+                #e.g. "Sydney, Nova Scotia": a different place than the candidates
+                return rows[:0]
+            #unknown qualifiers (e.g. a district name) are ignored
+        return rows
+
+    def search(self, place: str, limit: int = 5) -> List[Place]:
+        """
+        Places matching a query like "City", "City, Country" or "City, State, Country",
+        most populated first.
+        """
+        parts = [normalize_name(part) for part in place.split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return []
+        rows, match = self._candidates(parts[0])
+        if not len(rows):
+            return []
+        rows = self._qualify(rows, parts[1:])
+        rows = rows[np.argsort(-self.populations[rows], kind="stable")][:limit]
+        return [Place(name=self.names[row],
+                      latitude=float(self.latitudes[row]),
+                      longitude=float(self.longitudes[row]),
+                      country_code=str(self.countries[row]),
+                      admin1=str(self.admin1[row]),
+                      population=int(self.populations[row]),
+                      timezone=self.timezones[row],
+                      match=match)
+                for row in rows]
+
+    def lookup(self, place: str) -> Optional[Place]:
+        """ best (most populated) match of a query or None """
+        matches = self.search(place, limit=1)
+        return matches[0] if matches else None
+
+_gazetteer = None
+_gazetteer_loaded = False
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """
+    Shared gazetteer loaded from HD_GAZETTEER_PATH (default data/gazetteer.txt),
+    None if no gazetteer file is installed.
+    """
+    global _gazetteer, _gazetteer_loaded
+    with _gazetteer_lock:
+        if not _gazetteer_loaded:
+            path = os.getenv("HD_GAZETTEER_PATH", DEFAULT_GAZETTEER_PATH)
+            _gazetteer = Gazetteer(path) if os.path.exists(path) else None
+            _gazetteer_loaded = True
+        return _gazetteer
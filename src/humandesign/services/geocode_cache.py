@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from .gazetteer import normalize_name
+
+DEFAULT_GEOCODE_DB = "hd_geocode.sqlite"
+DEFAULT_CACHE_SIZE = 10000
+#found places are kept 90 days, "not found" results one day
+DEFAULT_TTL = 90 * 86400
+DEFAULT_NEGATIVE_TTL = 86400
+
+@dataclass
+class GeocodeEntry:
+    latitude: Optional[float]
+    longitude: Optional[float]
+    timezone: Optional[str] = None
+    address: Optional[str] = None
+    expires: float = 0.0
+
+    @property
+    def found(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+def place_key(place: str) -> str:
+    """ cache key of a place query (normalized text, e.g. "Berlin, Germany" -> "berlin germany") """
+    return normalize_name(place)
+
+def coordinate_key(latitude: float, longitude: float) -> str:
+    """ cache key of a reverse lookup (coordinates rounded to ~1 m) """
+    return "@{:.5f},{:.5f}".format(latitude, longitude)
+
+class GeocodeCache:
+    """
+    Two-tier geocode cache: an in-memory LRU in front of a persistent SQLite table.
+    Entries are keyed by normalized place text (or rounded coordinates for reverse lookups) and hold
+    coordinates, time zone and address. "Not found" results are cached as negative entries with a
+    shorter TTL; expired entries are treated as misses and overwritten by the next lookup.
+
+    Args:
+        db_path (str): SQLite database path
+        maxsize (int): max. number of entries in memory (LRU eviction)
+        ttl (float): lifetime of found places in seconds
+        negative_ttl (float): lifetime of "not found" results in seconds
+    """
+    def __init__(self, db_path=DEFAULT_GEOCODE_DB, maxsize=DEFAULT_CACHE_SIZE, ttl=DEFAULT_TTL,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL):
+        self.db_path = db_path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS geocode_cache ("
+            "key TEXT PRIMARY KEY, latitude REAL, longitude REAL, timezone TEXT, address TEXT, "
+            "expires REAL NOT NULL)")
+        self.connection.commit()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[GeocodeEntry]:
+        """
+        cached entry of a key (memory first, then SQLite), None on a miss or an expired entry
+        a negative entry (found False) means the place is known to be unresolvable
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > now:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                self.negative_hits += not entry.found
+                return entry
+            row = self.connection.execute(
+                "SELECT latitude, longitude, timezone, address, expires FROM geocode_cache WHERE key = ?",
+                (key,)).fetchone()
+            if row is not None and row[4] > now:
+                entry = GeocodeEntry(*row)
+                self._remember(key, entry)
+                self.db_hits += 1
+                self.negative_hits += not entry.found
+                return entry
+            self.expired += row is not None or entry is not None
+            self.misses += 1
+            return None
+
+    def put(self, key: str, latitude=None, longitude=None, timezone=None, address=None) -> GeocodeEntry:
+        """ store a lookup result, latitude/longitude None stores a negative entry """
+        found = latitude is not None and longitude is not None
+        entry = GeocodeEntry(latitude, longitude, timezone, address,
+                             time.time() + (self.ttl if found else self.negative_ttl))
+        with self._lock:
+            self._remember(key, entry)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO geocode_cache (key, latitude, longitude, timezone, address, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, entry.latitude, entry.longitude, entry.timezone, entry.address, entry.expires))
+            self.connection.commit()
+        return entry
+
+    def purge_expired(self) -> int:
+        """ delete expired entries from the database, returns the number of deleted rows """
+        now = time.time()
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.expires <= now]:
+                del self._entries[key]
+            deleted = self.connection.execute("DELETE FROM geocode_cache WHERE expires <= ?", (now,)).rowcount
+            self.connection.commit()
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.connection.execute("DELETE FROM geocode_cache")
+            self.connection.commit()
+
+    def stats(self):
+        """ cache statistics: sizes, hits per tier, negative hits, misses, hit ratios """
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            stored = self.connection.execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+            return {
+                "memory_size": len(self._entries),
+                "maxsize": self.maxsize,
+                "db_size": stored,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "memory_hit_rate": round(self.memory_hits / lookups, 4) if lookups else None,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+            }
+
+_geocode_cache = None
+_geocode_cache_lock = threading.Lock()
+
+def get_geocode_cache():
+    '''
+    shared GeocodeCache (HD_GEOCODE_DB, HD_GEOCODE_CACHE_SIZE, HD_GEOCODE_TTL and
+    HD_GEOCODE_NEGATIVE_TTL in seconds)
+    '''
+    global _geocode_cache
+    with _geocode_cache_lock:
+        if _geocode_cache is None:
+            _geocode_cache = GeocodeCache(os.getenv("HD_GEOCODE_DB", DEFAULT_GEOCODE_DB),
+                                          int(os.getenv("HD_GEOCODE_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+                                          float(os.getenv("HD_GEOCODE_TTL", DEFAULT_TTL)),
+                                          float(os.getenv("HD_GEOCODE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)))
+        return _geocode_cache
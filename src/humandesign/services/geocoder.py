@@ -0,0 +1,129 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+#Nominatim usage policy: at most 1 request per second
+DEFAULT_RATE = 1.0
+DEFAULT_CONCURRENCY = 4
+
+class RateLimiter:
+    """
+    Async rate limiter handing out evenly spaced start slots (rate calls per second).
+    Callers wait for their slot, so bursts are spread out instead of rejected.
+    """
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class AsyncGeocoder:
+    """
+    Single-flight, rate limited executor for upstream geocoding calls.
+
+    All lookups run on one background event loop, so concurrent requests from any worker thread
+    for the same key share one in-flight upstream call and await its result. Upstream calls are
+    limited by a semaphore (concurrency) and a rate limiter (rate calls per second) and run in a
+    small thread pool, the event loop itself never blocks.
+
+    Args:
+        concurrency (int): max. upstream calls in flight
+        rate (float): max. upstream calls per second (0 = unlimited)
+    """
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE):
+        self.concurrency = concurrency
+        self.rate = rate
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="geocode")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="geocoder", daemon=True)
+        self._thread.start()
+        self._inflight = {}
+        self._stats_lock = threading.Lock()
+        self.upstream_calls = 0
+        self.coalesced = 0
+        #loop bound primitives are created on the loop
+        asyncio.run_coroutine_threadsafe(self._init_limits(), self._loop).result()
+
+    async def _init_limits(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._limiter = RateLimiter(self.rate)
+
+    async def _call(self, fn, args):
+        async with self._semaphore:
+            await self._limiter.wait()
+            with self._stats_lock:
+                self.upstream_calls += 1
+            return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def resolve(self, key, fn, *args):
+        """
+        result of fn(*args), coalesced per key: while a call for key is in flight,
+        further lookups of key await the same result (coroutine on the geocoder loop)
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            with self._stats_lock:
+                self.coalesced += 1
+            return await asyncio.shield(future)
+        future = self._loop.create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._call(fn, args)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            #mark retrieved, followers (if any) get the exception
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        return result
+
+    def resolve_sync(self, key, fn, *args):
+        """ blocking resolve for worker threads """
+        return asyncio.run_coroutine_threadsafe(self.resolve(key, fn, *args), self._loop).result()
+
+    def resolve_many(self, calls):
+        """
+        blocking resolve of several lookups at once
+        Args:
+            calls(list): (key, fn, args) tuples
+        Return:
+            list of results (exceptions are returned in place of results)
+        """
+        async def _gather():
+            return await asyncio.gather(*(self.resolve(key, fn, *args) for key, fn, args in calls),
+                                        return_exceptions=True)
+        return asyncio.run_coroutine_threadsafe(_gather(), self._loop).result()
+
+    def stats(self):
+        """ upstream calls, coalesced lookups, calls in flight and limits """
+        with self._stats_lock:
+            return {
+                "upstream_calls": self.upstream_calls,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+                "concurrency": self.concurrency,
+                "rate": self.rate,
+            }
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+def get_geocoder():
+    ''' shared AsyncGeocoder (HD_GEOCODE_CONCURRENCY, HD_GEOCODE_RATE in calls per second) '''
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = AsyncGeocoder(int(os.getenv("HD_GEOCODE_CONCURRENCY", DEFAULT_CONCURRENCY)),
+                                      float(os.getenv("HD_GEOCODE_RATE", DEFAULT_RATE)))
+        return _geocoder
@@ -1,20 +1,118 @@
+import os
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
 from dataclasses import dataclass
 from timezonefinder import TimezoneFinder
+from .gazetteer import get_gazetteer
+from .geocode_cache import get_geocode_cache, place_key, coordinate_key
+from .geocoder import get_geocoder
 
 # Singleton instance
 # in_memory=True ensures the binary file is loaded once into RAM (20-30MB) 
 # and not re-read from disk on every lookup.
 tf = TimezoneFinder(in_memory=True)
 
+# Nominatim client shared by all requests (only used when the gazetteer has no match),
+# called through the single-flight, rate limited geocoder (services/geocoder.py)
+geolocator = Nominatim(user_agent="geocoding_api")
+
 @dataclass
 class Location:
     place: str
     latitude: Optional[float]
     longitude: Optional[float]
     address: Optional[str] = None
+    timezone: Optional[str] = None
+
+def _location(place: str, entry) -> Location:
+    if entry is None:
+        return Location(place=place, latitude=None, longitude=None)
+    return Location(place=place, latitude=entry.latitude, longitude=entry.longitude,
+                    address=entry.address, timezone=entry.timezone)
+
+def _local_entry(key: str, place: str):
+    """
+    Cached or offline result of a place: geocode cache, then gazetteer (HD_GAZETTEER_PATH).
+    Returns None if the upstream geocoder is needed.
+    """
+    cache = get_geocode_cache()
+    entry = cache.get(key)
+    if entry is not None:
+        return entry
+    gazetteer = get_gazetteer()
+    match = gazetteer.lookup(place) if gazetteer is not None else None
+    if match:
+        return cache.put(key, match.latitude, match.longitude, match.timezone or None,
+                         f"{match.name}, {match.admin1}, {match.country_code}")
+    if os.getenv("HD_GEOCODER_FALLBACK", "1") == "0":
+        return cache.put(key)
+    return None
+
+def _upstream_geocode(key: str, place: str):
+    """
+    Nominatim lookup, stored in the geocode cache ("not found" as negative entry).
+    Runs in the geocoder pool; returns None on a transient error (timeout, network), which is not cached.
+    """
+    try:
+        location = geolocator.geocode(place, timeout=2) # Shorter timeout
+    except Exception:
+        return None
+    cache = get_geocode_cache()
+    if not location:
+        return cache.put(key)
+    zone = tf.timezone_at(lat=location.latitude, lng=location.longitude)
+    return cache.put(key, location.latitude, location.longitude, zone, location.address)
+
+def _upstream_reverse(key: str, latitude: float, longitude: float):
+    """ Nominatim reverse lookup, stored in the geocode cache (runs in the geocoder pool) """
+    try:
+        location = geolocator.reverse((latitude, longitude))
+    except Exception:
+        return None
+    cache = get_geocode_cache()
+    if not location:
+        return cache.put(key)
+    return cache.put(key, latitude, longitude, tf.timezone_at(lat=latitude, lng=longitude), location.address)
+
+def geocode_place(place: str) -> Location:
+    """
+    Geocode a place name: geocode cache, offline gazetteer, then Nominatim. Concurrent upstream
+    lookups of the same normalized place share one call (single-flight, rate limited).
+
+    Args:
+        place (str): Name of the place (e.g., "City, Country")
+
+    Returns:
+        Location: coordinates, time zone and address; latitude/longitude None if not found.
+    """
+    key = place_key(place)
+    entry = _local_entry(key, place)
+    if entry is None:
+        entry = get_geocoder().resolve_sync(key, _upstream_geocode, key, place)
+    return _location(place, entry)
+
+def geocode_places(places: List[str]) -> Dict[str, Location]:
+    """
+    Geocode several places at once, the upstream lookups of all places not in the cache or gazetteer
+    run concurrently (coalesced per normalized place, rate limited).
+
+    Returns:
+        Dict[str, Location]: place -> Location
+    """
+    entries = {}
+    pending = []
+    for place in dict.fromkeys(places):
+        entry = _local_entry(place_key(place), place)
+        if entry is None:
+            pending.append(place)
+        else:
+            entries[place] = entry
+    results = get_geocoder().resolve_many([(place_key(place), _upstream_geocode, (place_key(place), place))
+                                           for place in pending])
+    for place, result in zip(pending, results):
+        entries[place] = None if isinstance(result, Exception) else result
+    return {place: _location(place, entries[place]) for place in places}
 
 def get_latitude_longitude(place: str) -> Tuple[Optional[float], Optional[float]]:
     """
@@ -29,47 +127,49 @@ def get_latitude_longitude(place: str) -> Tuple[Optional[float], Optional[float]
     # Bypass for timezone names to avoid network calls in tests or when TZ is known
     if "/" in place:
         return 0.0, 0.0 # Return placeholder coordinates
-        
-    geolocator = Nominatim(user_agent="geocoding_api")
-    try:
-        location = geolocator.geocode(place, timeout=2) # Shorter timeout
-        if location:
-            return location.latitude, location.longitude
-    except Exception:
-        pass
-    return None, None
+
+    location = geocode_place(place)
+    return location.latitude, location.longitude
+
+def get_latitude_longitude_zone(place: str, latitude: Optional[float] = None,
+                                longitude: Optional[float] = None) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    """
+    Coordinates and time zone of a birth place. The time zone comes from the geocode cache
+    (gazetteer or cached lookup), TimezoneFinder is only used for coordinates given by the
+    caller or cached entries without a time zone.
+
+    Args:
+        place (str): Name of the place (e.g., "City, Country") or TZ name (e.g., "Europe/London")
+        latitude, longitude (float): optional coordinates given by the caller (no geocoding)
+
+    Returns:
+        Tuple[float, float, str]: Latitude, Longitude and time zone, or (None, None, None) if not found.
+    """
+    if "/" in place:
+        if latitude is None or longitude is None:
+            latitude, longitude = 0.0, 0.0
+        return latitude, longitude, place
+    if latitude is not None and longitude is not None:
+        return latitude, longitude, tf.timezone_at(lat=latitude, lng=longitude) or 'Etc/UTC'
+
+    location = geocode_place(place)
+    if location.latitude is None or location.longitude is None:
+        return None, None, None
+    zone = location.timezone or tf.timezone_at(lat=location.latitude, lng=location.longitude) or 'Etc/UTC'
+    return location.latitude, location.longitude, zone
 
 def get_address(latitude: float, longitude: float) -> Optional[str]:
-    """Reverse geocode coordinates to get an address."""
-    geolocator = Nominatim(user_agent="geocoding_api")
-    try:
-        location = geolocator.reverse((latitude, longitude))
-        return location.address if location else None
-    except Exception:
-        return None
+    """Reverse geocode coordinates to get an address (cached, incl. "no address" results)."""
+    key = coordinate_key(latitude, longitude)
+    entry = get_geocode_cache().get(key)
+    if entry is None:
+        entry = get_geocoder().resolve_sync(key, _upstream_reverse, key, latitude, longitude)
+    return entry.address if entry is not None else None
 
 def batch_geocode(places: List[str]) -> List[Location]:
-    """Geocode multiple places at once."""
-    geolocator = Nominatim(user_agent="geocoding_api")
-    results = []
-    
-    for place in places:
-        location = geolocator.geocode(place)
-        if location:
-            results.append(Location(
-                place=place,
-                latitude=location.latitude,
-                longitude=location.longitude,
-                address=location.address
-            ))
-        else:
-            results.append(Location(
-                place=place,
-                latitude=None,
-                longitude=None,
-                address=None
-            ))
-    return results
+    """Geocode multiple places at once (cached per place, upstream lookups run concurrently)."""
+    locations = geocode_places(places)
+    return [locations[place] for place in places]
 
 def calculate_distance(place1: str, place2: str) -> Optional[float]:
     """Calculate distance between two places in kilometers."""
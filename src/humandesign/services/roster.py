@@ -0,0 +1,374 @@
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+from datetime import datetime
+from .. import hd_constants
+from ..features.mechanics import CHANNEL_LIST, CHANNEL_CHAKRAS
+from .composite import (
+    classify_maia_connection,
+    get_connection_classification,
+    get_profile_resonance,
+    get_node_resonance
+)
+
+DEFAULT_ROSTER_DB = os.getenv("HD_ROSTER_DB", "hd_roster.sqlite")
+
+#polarity bits per gate and member
+PERSONALITY = 1
+DESIGN = 2
+POLARITY_NAMES = {PERSONALITY: "Personality", DESIGN: "Design", PERSONALITY | DESIGN: "Both"}
+
+#compatibility ranking: points per new channel / composite center, profile and node resonance labels
+RANK_WEIGHTS = {
+    "new_channel": 10,
+    "center": 3,
+    "profile": {"Profile Resonance (Identity)": 6, "Deeply Harmonic (Profile Glue)": 8,
+                "Harmonic Resonance": 4, "Neutral Partnership": 0},
+    "node": {"Shared Frequency": 5, "Harmonic Pull": 3, "Individual Path": 0},
+}
+
+#channel ids per center (CHAKRA_LIST order)
+CENTER_CHANNELS = [[ch_id for ch_id, chakras in enumerate(CHANNEL_CHAKRAS) if center in chakras]
+                   for center in hd_constants.CHAKRA_LIST]
+
+def parse_channel(channel):
+    '''
+    channel of GATES_CHAKRA_DICT from "2-14", (14,2) etc.
+    Raises ValueError for unknown channels
+    '''
+    if isinstance(channel, str):
+        channel = tuple(int(g) for g in channel.split("-"))
+    channel = tuple(int(g) for g in channel)
+    if channel in CHANNEL_LIST:
+        return channel
+    if channel[::-1] in CHANNEL_LIST:
+        return channel[::-1]
+    raise ValueError(f"Unknown channel: {channel}")
+
+class RosterStore:
+    """
+    Persisted roster of member activations (SQLite) with an in-memory inverted index.
+    The index is a gate-major (65 x N) uint8 polarity matrix (bit 1 = Personality, bit 2 = Design)
+    plus its boolean carrier view, so "who carries gate X" is one contiguous row scan and
+    channel queries are boolean row operations. Node gates (65 x N bool) and profile lines (2 x N)
+    are kept for compatibility ranking.
+    """
+    def __init__(self, db_path=DEFAULT_ROSTER_DB):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS roster_members ("
+            "member_id TEXT PRIMARY KEY, activations TEXT NOT NULL, updated TEXT NOT NULL)")
+        self.connection.commit()
+        self._ids = []
+        self._index = {}
+        self._allocate(16)
+        self._load()
+
+    def _allocate(self, capacity):
+        self._polarity = np.zeros((65, capacity), dtype=np.uint8)
+        self._carry = np.zeros((65, capacity), dtype=bool)
+        self._nodes = np.zeros((65, capacity), dtype=bool)
+        self._profile = np.zeros((2, capacity), dtype=np.int8)
+
+    def _member_arrays(self):
+        return ["_polarity", "_carry", "_nodes", "_profile"]
+
+    def _load(self):
+        rows = self.connection.execute("SELECT member_id, activations FROM roster_members").fetchall()
+        self._allocate(max(len(rows), 16))
+        for member_id, activations in rows:
+            try:
+                self._set_row(member_id, self._member_columns(json.loads(activations)))
+            except ValueError as e:
+                #rows stored before gates were validated are skipped instead of failing every request
+                print(f"Skipping roster member {member_id}: {e}")
+
+    @staticmethod
+    def _member_columns(activations):
+        '''
+        polarity, node and profile column of one member (planets/lines are optional)
+        Raises ValueError for gates outside 1..64
+        '''
+        polarity = np.zeros(65, dtype=np.uint8)
+        nodes = np.zeros(65, dtype=bool)
+        profile = np.zeros(2, dtype=np.int8)
+        gates = activations.get("gate", [])
+        labels = activations.get("label", [])
+        lines = activations.get("line", [])
+        planets = activations.get("planets", [])
+        for i, gate in enumerate(gates):
+            gate = int(gate)
+            if not 1 <= gate <= 64:
+                raise ValueError(f"Gate {gate} must be between 1 and 64")
+            label = labels[i] if i < len(labels) else "prs"
+            polarity[gate] |= DESIGN if label == "des" else PERSONALITY
+            planet = planets[i] if i < len(planets) else None
+            if planet in ("North_Node", "South_Node"):
+                nodes[gate] = True
+            elif planet == "Sun" and i < len(lines):
+                profile[1 if label == "des" else 0] = lines[i]
+        return polarity, nodes, profile
+
+    def _set_row(self, member_id, columns):
+        idx = self._index.get(member_id)
+        if idx is None:
+            idx = len(self._ids)
+            if idx == self._polarity.shape[1]:
+                capacity = max(16, 2 * idx)
+                for name in self._member_arrays():
+                    setattr(self, name, np.pad(getattr(self, name), ((0, 0), (0, capacity - idx))))
+            self._ids.append(member_id)
+            self._index[member_id] = idx
+        polarity, nodes, profile = columns
+        self._polarity[:, idx] = polarity
+        self._carry[:, idx] = polarity != 0
+        self._nodes[:, idx] = nodes
+        self._profile[:, idx] = profile
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, member_id):
+        return member_id in self._index
+
+    def add_members(self, members):
+        '''
+        insert or replace members, nothing is stored if one member is invalid
+        Args:
+            members(dict): member_id -> activations dict with "gate" and optional "line", "label", "planets"
+        Raises:
+            ValueError for gates outside 1..64
+        '''
+        updated = datetime.utcnow().isoformat() + "Z"
+        rows, columns = [], []
+        for member_id, activations in members.items():
+            activations = {key: [v if isinstance(v, str) else int(v) for v in activations[key]]
+                           for key in ("gate", "line", "label", "planets") if key in activations}
+            columns.append(self._member_columns(activations))
+            rows.append((member_id, json.dumps(activations), updated))
+        with self._lock:
+            try:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO roster_members (member_id, activations, updated) VALUES (?, ?, ?)", rows)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            for (member_id, _, _), member_columns in zip(rows, columns):
+                self._set_row(member_id, member_columns)
+
+    def add_member(self, member_id, activations):
+        self.add_members({member_id: activations})
+
+    def remove_member(self, member_id):
+        ''' remove member, last member is moved into the free column. Returns False if unknown '''
+        with self._lock:
+            idx = self._index.pop(member_id, None)
+            if idx is None:
+                return False
+            self.connection.execute("DELETE FROM roster_members WHERE member_id = ?", (member_id,))
+            self.connection.commit()
+            last = len(self._ids) - 1
+            if idx != last:
+                moved_id = self._ids[last]
+                self._ids[idx] = moved_id
+                self._index[moved_id] = idx
+                for name in self._member_arrays():
+                    getattr(self, name)[:, idx] = getattr(self, name)[:, last]
+            for name in self._member_arrays():
+                getattr(self, name)[:, last] = 0
+            self._ids.pop()
+            return True
+
+    def get_activations(self, member_id):
+        ''' stored activations of member (None if unknown) '''
+        row = self.connection.execute(
+            "SELECT activations FROM roster_members WHERE member_id = ?", (member_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def member_gates(self, member_id):
+        ''' set of gates of member, KeyError if unknown '''
+        with self._lock:
+            return set(np.flatnonzero(self._polarity[:, self._index[member_id]]).tolist())
+
+    def _carriers(self, gate):
+        return self._carry[gate, :len(self._ids)]
+
+    def gate_carriers(self, gate, offset=0, limit=None):
+        '''
+        members carrying a gate
+        Return:
+            total(int), list of dict: member_id, polarity ("Personality", "Design", "Both")
+        '''
+        with self._lock:
+            polarity = self._polarity[gate, :len(self._ids)]
+            rows = np.flatnonzero(polarity)
+            page = rows[offset:None if limit is None else offset + limit]
+            return len(rows), [{"member_id": self._ids[idx], "polarity": POLARITY_NAMES[int(polarity[idx])]}
+                               for idx in page.tolist()]
+
+    def channel_completers(self, member_id, channel, offset=0, limit=None):
+        '''
+        members that define channel together with member_id
+        (they carry every channel gate member_id is missing)
+        Return:
+            total(int), list of dict: member_id, connection (classify_maia_connection), gates
+        '''
+        with self._lock:
+            g1, g2 = parse_channel(channel)
+            own_gates = self.member_gates(member_id) & {g1, g2}
+            missing = [g for g in (g1, g2) if g not in own_gates]
+            if not missing:
+                return 0, []
+            mask = self._carriers(missing[0]).copy()
+            if len(missing) > 1:
+                mask &= self._carriers(missing[1])
+            mask[self._index[member_id]] = False
+            rows = np.flatnonzero(mask)
+            page = rows[offset:None if limit is None else offset + limit]
+            result = []
+            for idx in page.tolist():
+                other_gates = {g for g in (g1, g2) if self._polarity[g, idx]}
+                result.append({
+                    "member_id": self._ids[idx],
+                    "connection": classify_maia_connection(own_gates, other_gates, (g1, g2)),
+                    "gates": sorted(other_gates),
+                })
+            return len(rows), result
+
+    def em_partners(self, member_id, limit=10):
+        '''
+        members with the most electromagnetic channels with member_id
+        (member_id carries one gate of the channel, the partner only the other one)
+        Return:
+            list of dict: member_id, channels (list of "g1-g2"), best partner first
+        '''
+        with self._lock:
+            own_gates = self.member_gates(member_id)
+            #(channel, own gate, partner gate) of channels where member_id carries exactly one gate
+            em_channels = [((g1, g2),) + ((g1, g2) if g1 in own_gates else (g2, g1))
+                           for g1, g2 in CHANNEL_LIST if len(own_gates & {g1, g2}) == 1]
+            n = len(self._ids)
+            counts = np.zeros(n, dtype=np.uint8)
+            for _, own, other in em_channels:
+                #partner carries the other gate and not the own gate
+                counts += np.greater(self._carriers(other), self._carriers(own))
+            counts[self._index[member_id]] = 0
+
+            #counts are small ints -> threshold of the top `limit` via histogram instead of sorting N values
+            histogram = np.bincount(counts)
+            threshold = 1
+            if limit is not None:
+                cumulative = np.cumsum(histogram[::-1])[::-1] #members with count >= value
+                reached = np.flatnonzero(cumulative[1:] >= limit)
+                threshold = int(reached[-1]) + 1 if len(reached) else 1
+            candidates = np.flatnonzero(counts >= threshold).tolist()
+            candidates.sort(key=lambda idx: (-int(counts[idx]), self._ids[idx]))
+            if limit is not None:
+                candidates = candidates[:limit]
+            return [{
+                "member_id": self._ids[idx],
+                "channels": ["{}-{}".format(*channel) for channel, own, other in em_channels
+                             if self._carry[other, idx] and not self._carry[own, idx]],
+            } for idx in candidates]
+
+    def rank(self, activations, exclude=None, offset=0, limit=10):
+        '''
+        compatibility ranking of a subject against all members (vectorized over the roster)
+        score = new channels, composite centers (get_connection_classification), profile and
+                node resonance, weights see RANK_WEIGHTS
+        Args:
+            activations(dict): subject activations ("gate", optional "label", "line", "planets")
+            exclude(str): member_id to skip (e.g. the subject itself)
+            offset(int), limit(int): page of the ranking
+        Return:
+            total(int), list of dict: member_id, score, new_channels, connection_code,
+                                      profile_resonance, node_resonance; best match first
+        '''
+        with self._lock:
+            polarity, nodes, profile = self._member_columns(activations)
+            subject = polarity != 0
+            n = len(self._ids)
+            carry = self._carry[:, :n]
+
+            #composite channel definition per channel (36 x N), new = neither person defines it alone
+            composite = np.empty((len(CHANNEL_LIST), n), dtype=bool)
+            new_channels = np.zeros(n, dtype=np.int32)
+            for ch_id, (g1, g2) in enumerate(CHANNEL_LIST):
+                if subject[g1] and subject[g2]:
+                    composite[ch_id] = True
+                elif subject[g1] or subject[g2]:
+                    composite[ch_id] = carry[g2 if subject[g1] else g1]
+                    new_channels += composite[ch_id] & ~(carry[g1] & carry[g2])
+                else:
+                    np.logical_and(carry[g1], carry[g2], out=composite[ch_id])
+            centers = np.zeros(n, dtype=np.int32)
+            for channel_ids in CENTER_CHANNELS:
+                centers += composite[channel_ids].any(axis=0)
+
+            #profile: identity, harmonic line pairs (1-4, 2-5, 3-6)
+            member_profile = self._profile[:, :n]
+            known = (member_profile > 0).all(axis=0) & (profile > 0).all()
+            harmonic = sum(np.abs(member_profile[j] - profile[i]) == 3 for i in range(2) for j in range(2))
+            identity = known & (member_profile[0] == profile[0]) & (member_profile[1] == profile[1])
+            profile_weights = RANK_WEIGHTS["profile"]
+            profile_points = np.where(identity, profile_weights["Profile Resonance (Identity)"],
+                             np.where(known & (harmonic >= 2), profile_weights["Deeply Harmonic (Profile Glue)"],
+                             np.where(known & (harmonic == 1), profile_weights["Harmonic Resonance"], 0)))
+
+            #nodes: same node gate, else node gates forming a channel
+            subject_nodes = np.flatnonzero(nodes)
+            member_nodes = self._nodes[:, :n]
+            shared = member_nodes[subject_nodes].any(axis=0)
+            pull_gates = [g2 if g1 == gate else g1 for gate in subject_nodes
+                          for g1, g2 in CHANNEL_LIST if gate in (g1, g2)]
+            pull = member_nodes[pull_gates].any(axis=0) & ~shared
+            node_points = np.where(shared, RANK_WEIGHTS["node"]["Shared Frequency"],
+                          np.where(pull, RANK_WEIGHTS["node"]["Harmonic Pull"], 0))
+
+            scores = (RANK_WEIGHTS["new_channel"] * new_channels + RANK_WEIGHTS["center"] * centers
+                      + profile_points + node_points)
+            valid = np.ones(n, dtype=bool)
+            if exclude in self._index:
+                valid[self._index[exclude]] = False
+            rows = np.flatnonzero(valid)
+            end = min(len(rows), offset + limit)
+            if offset >= end:
+                return len(rows), []
+            #only entries up to the (offset + limit)-th score are sorted (ties ordered by insertion)
+            keys = -scores[rows]
+            threshold = np.partition(keys, end - 1)[end - 1]
+            part = np.flatnonzero(keys <= threshold)
+            part = part[np.lexsort((part, keys[part]))][offset:end]
+
+            profile_str = "{}/{}".format(*profile.tolist())
+            result = []
+            for idx in rows[part].tolist():
+                member_profile_str = "{}/{}".format(*self._profile[:, idx].tolist())
+                profile_resonance = (get_profile_resonance(profile_str, member_profile_str)
+                                     if known[idx] else "Neutral Partnership")
+                result.append({
+                    "member_id": self._ids[idx],
+                    "score": int(scores[idx]),
+                    "new_channels": int(new_channels[idx]),
+                    "connection_code": get_connection_classification(int(centers[idx])),
+                    "profile_resonance": profile_resonance,
+                    "node_resonance": get_node_resonance(set(subject_nodes.tolist()),
+                                                         set(np.flatnonzero(self._nodes[:, idx]).tolist())),
+                })
+            return len(rows), result
+
+_roster_store = None
+_roster_store_lock = threading.Lock()
+
+def get_roster_store():
+    ''' shared RosterStore (database path via HD_ROSTER_DB) '''
+    global _roster_store
+    with _roster_store_lock:
+        if _roster_store is None:
+            _roster_store = RosterStore(os.getenv("HD_ROSTER_DB", DEFAULT_ROSTER_DB))
+        return _roster_store
@@ -0,0 +1,385 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+import numpy as np
+from datetime import datetime
+from .. import hd_constants
+from .. import features as hd
+from ..features.crossings import planet_longitude, wheel_line, gate_line, jd_to_iso
+from ..features.mechanics import CHANNEL_LIST, GATE_CHANNEL_IDS
+
+DEFAULT_ALERTS_DB = "hd_alerts.sqlite"
+#planning horizon (days ahead of now) and max. pending events per subscriber
+DEFAULT_HORIZON_DAYS = 7
+DEFAULT_MAX_EVENTS = 10
+#seconds between two planning runs of the background scheduler
+PLAN_INTERVAL = 3600
+
+CHANNEL_GATE_1 = np.array([g1 for g1, _ in CHANNEL_LIST])
+CHANNEL_GATE_2 = np.array([g2 for _, g2 in CHANNEL_LIST])
+#centers of each channel (CHAKRA_LIST indices) and channel ids of each center
+CHANNEL_CENTER_IDS = [[hd_constants.CHAKRA_LIST.index(c) for c in hd_constants.GATES_CHAKRA_DICT[channel]]
+                      for channel in CHANNEL_LIST]
+CENTER_CHANNEL_IDS = [[ch_id for ch_id, centers in enumerate(CHANNEL_CENTER_IDS) if center in centers]
+                      for center in range(len(hd_constants.CHAKRA_LIST))]
+
+def now_jd():
+    ''' julian day (UT) of the current moment '''
+    now = datetime.utcnow()
+    return hd.timestamp_to_jd((now.year, now.month, now.day, now.hour, now.minute, now.second, 0))
+
+class TransitAlertScheduler:
+    """
+    Precomputed transit alerts of subscribed natal charts, persisted in SQLite.
+    Transit gate ingresses are calculated once per time window and shared by all subscribers
+    (table transit_ingresses). Planning replays the ingresses over a gate-major (65 x N) natal
+    carrier matrix: an ingress only touches the channels of the two gates involved, so every
+    ingress costs a few vectorized column updates regardless of the number of subscribers.
+    Events that open a new composite channel or define a new composite center are queued in
+    alert_events, indexed by (delivered, jd), so due events are an indexed range read.
+    Every subscriber holds at most max_events undelivered events; planning continues from
+    its planned_until once events are delivered.
+    """
+    def __init__(self, db_path=DEFAULT_ALERTS_DB, horizon_days=DEFAULT_HORIZON_DAYS, max_events=DEFAULT_MAX_EVENTS):
+        self.db_path = db_path
+        self.horizon_days = horizon_days
+        self.max_events = max_events
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS alert_subscribers ("
+            "subscriber_id TEXT PRIMARY KEY, gates TEXT NOT NULL, planned_until REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS alert_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, subscriber_id TEXT NOT NULL, jd REAL NOT NULL, "
+            "time TEXT NOT NULL, event TEXT NOT NULL, planet TEXT NOT NULL, gate INTEGER NOT NULL, "
+            "detail TEXT NOT NULL, delivered INTEGER NOT NULL DEFAULT 0);"
+            "CREATE INDEX IF NOT EXISTS idx_alert_events_due ON alert_events (delivered, jd);"
+            "CREATE INDEX IF NOT EXISTS idx_alert_events_subscriber ON alert_events (subscriber_id, delivered);"
+            "CREATE TABLE IF NOT EXISTS transit_ingresses ("
+            "jd REAL NOT NULL, planet TEXT NOT NULL, from_gate INTEGER NOT NULL, gate INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_transit_ingresses_jd ON transit_ingresses (jd);"
+            "CREATE TABLE IF NOT EXISTS alert_state (key TEXT PRIMARY KEY, value REAL NOT NULL);")
+        self.connection.commit()
+        self._load()
+
+    def _load(self):
+        ''' (re)build the in-memory subscriber matrix from the database '''
+        rows = self.connection.execute("SELECT subscriber_id, gates, planned_until FROM alert_subscribers").fetchall()
+        self._ids = []
+        self._index = {}
+        self._carry = np.zeros((65, max(len(rows), 16)), dtype=bool)
+        self._planned_until = np.zeros(self._carry.shape[1])
+        for subscriber_id, gates, planned_until in rows:
+            try:
+                self._set_row(subscriber_id, self._valid_gates(json.loads(gates)), planned_until)
+            except ValueError as e:
+                #rows stored before gates were validated are skipped instead of failing the startup
+                print(f"Skipping alert subscriber {subscriber_id}: {e}")
+
+    @staticmethod
+    def _valid_gates(gates):
+        ''' sorted distinct gates, ValueError for gates outside 1..64 '''
+        gates = sorted({int(g) for g in gates})
+        invalid = [g for g in gates if not 1 <= g <= 64]
+        if invalid:
+            raise ValueError(f"Gates {invalid} must be between 1 and 64")
+        return gates
+
+    def _set_row(self, subscriber_id, gates, planned_until):
+        idx = self._index.get(subscriber_id)
+        if idx is None:
+            idx = len(self._ids)
+            if idx == self._carry.shape[1]:
+                capacity = max(16, 2 * idx)
+                self._carry = np.pad(self._carry, ((0, 0), (0, capacity - idx)))
+                self._planned_until = np.pad(self._planned_until, (0, capacity - idx))
+            self._ids.append(subscriber_id)
+            self._index[subscriber_id] = idx
+        self._carry[:, idx] = False
+        self._carry[[int(g) for g in gates], idx] = True
+        self._planned_until[idx] = planned_until
+        return idx
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, subscriber_id):
+        return subscriber_id in self._index
+
+    # --- transit ingress timeline (shared by all subscribers) ---
+
+    def _state(self, key):
+        row = self.connection.execute("SELECT value FROM alert_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        self.connection.execute("INSERT OR REPLACE INTO alert_state (key, value) VALUES (?, ?)", (key, value))
+
+    def _ingresses(self, jd_start, jd_end):
+        '''
+        gate ingresses (jd, planet, from_gate, gate) in (jd_start, jd_end], the stored timeline
+        is extended forward on demand (and rebuilt if jd_start lies before it)
+        '''
+        covered_start, covered_end = self._state("timeline_start"), self._state("timeline_end")
+        if covered_start is None or not covered_start <= jd_start <= covered_end:
+            self.connection.execute("DELETE FROM transit_ingresses")
+            covered_start = covered_end = jd_start
+            self._set_state("timeline_start", covered_start)
+        if jd_end > covered_end:
+            self.connection.executemany(
+                "INSERT INTO transit_ingresses (jd, planet, from_gate, gate) VALUES (?, ?, ?, ?)",
+                hd.gate_ingresses(covered_end, jd_end))
+            self._set_state("timeline_end", jd_end)
+        self.connection.commit()
+        return self.connection.execute(
+            "SELECT jd, planet, from_gate, gate FROM transit_ingresses WHERE jd > ? AND jd <= ? ORDER BY jd",
+            (jd_start, jd_end)).fetchall()
+
+    # --- planning ---
+
+    def _pending_counts(self, rows):
+        ''' undelivered events per subscriber row '''
+        if len(rows) == 1:
+            return np.array(self.connection.execute(
+                "SELECT COUNT(*) FROM alert_events WHERE subscriber_id = ? AND delivered = 0",
+                (self._ids[rows[0]],)).fetchone())
+        counts = np.zeros(len(self._ids), dtype=np.int64)
+        for subscriber_id, count in self.connection.execute(
+                "SELECT subscriber_id, COUNT(*) FROM alert_events WHERE delivered = 0 GROUP BY subscriber_id"):
+            idx = self._index.get(subscriber_id)
+            if idx is not None:
+                counts[idx] = count
+        return counts[rows]
+
+    def _plan(self, rows, jd_end):
+        '''
+        replay the gate ingresses up to jd_end for subscriber rows and queue their events
+        Return:
+            number of queued events
+        '''
+        planned_until = self._planned_until[rows].copy()
+        rows = rows[planned_until < jd_end]
+        planned_until = planned_until[planned_until < jd_end]
+        capacity = self.max_events - self._pending_counts(rows)
+        active = capacity > 0
+        rows, planned_until, capacity = rows[active], planned_until[active], capacity[active]
+        if not len(rows):
+            return 0
+
+        #composite state at the window start: natal carriers | transit gates
+        jd_start = float(planned_until.min())
+        transit_count = np.zeros(65, dtype=np.int64)
+        for planet in hd_constants.SWE_PLANET_DICT:
+            transit_count[gate_line(wheel_line(planet_longitude(jd_start, planet)))[0]] += 1
+        natal = self._carry[:, rows]
+        channels = ((natal[CHANNEL_GATE_1] | (transit_count[CHANNEL_GATE_1] > 0)[:, None])
+                    & (natal[CHANNEL_GATE_2] | (transit_count[CHANNEL_GATE_2] > 0)[:, None]))
+        centers = np.array([channels[ids].any(axis=0) for ids in CENTER_CHANNEL_IDS])
+
+        queued = np.zeros(len(rows), dtype=np.int64)
+        open_rows = np.ones(len(rows), dtype=bool)
+        events = []
+        for jd, planet, from_gate, gate in self._ingresses(jd_start, jd_end):
+            transit_count[from_gate] -= 1
+            transit_count[gate] += 1
+            ch_ids = sorted(set(GATE_CHANNEL_IDS[from_gate] + GATE_CHANNEL_IDS[gate]))
+            g1, g2 = CHANNEL_GATE_1[ch_ids], CHANNEL_GATE_2[ch_ids]
+            new_channels = ((natal[g1] | (transit_count[g1] > 0)[:, None])
+                            & (natal[g2] | (transit_count[g2] > 0)[:, None]))
+            formed = new_channels & ~channels[ch_ids]
+            channels[ch_ids] = new_channels
+            center_ids = sorted({c for ch_id in ch_ids for c in CHANNEL_CENTER_IDS[ch_id]})
+            new_centers = np.array([channels[CENTER_CHANNEL_IDS[c]].any(axis=0) for c in center_ids])
+            defined = new_centers & ~centers[center_ids]
+            centers[center_ids] = new_centers
+
+            eligible = open_rows & (planned_until < jd)
+            formed &= eligible
+            defined &= eligible
+            if not (formed.any() or defined.any()):
+                continue
+            time_iso = jd_to_iso(jd)
+            for k, col in zip(*np.nonzero(formed)):
+                channel = "{}-{}".format(*CHANNEL_LIST[ch_ids[k]])
+                events.append((self._ids[rows[col]], jd, time_iso, "channel_formed", planet, gate, channel))
+            for k, col in zip(*np.nonzero(defined)):
+                center = hd_constants.CHAKRA_NAMES_MAP.get(hd_constants.CHAKRA_LIST[center_ids[k]])
+                events.append((self._ids[rows[col]], jd, time_iso, "center_defined", planet, gate, center))
+            queued += formed.sum(axis=0) + defined.sum(axis=0)
+            #full subscribers stop after this ingress and continue from here later
+            full = open_rows & (queued >= capacity)
+            planned_until[full] = jd
+            open_rows &= ~full
+        planned_until[open_rows] = jd_end
+
+        self._planned_until[rows] = planned_until
+        self.connection.executemany(
+            "INSERT INTO alert_events (subscriber_id, jd, time, event, planet, gate, detail) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", events)
+        self.connection.executemany(
+            "UPDATE alert_subscribers SET planned_until = ? WHERE subscriber_id = ?",
+            [(float(until), self._ids[idx]) for idx, until in zip(rows.tolist(), planned_until)])
+        self.connection.commit()
+        return len(events)
+
+    def advance(self, jd=None):
+        '''
+        extend the plan of all subscribers to jd + horizon_days (incremental: every subscriber
+        continues from its planned_until, subscribers with max_events pending are skipped)
+        Args:
+            jd(float): julian day (UT) of "now" (default current time)
+        Return:
+            number of queued events
+        '''
+        jd = now_jd() if jd is None else jd
+        with self._lock:
+            queued = self._plan(np.arange(len(self._ids)), jd + self.horizon_days)
+            #ingresses before now and before the earliest planned_until are not needed anymore,
+            #the timeline from now on is kept for new subscribers
+            if self._ids:
+                oldest = min(jd, float(self._planned_until[:len(self._ids)].min()))
+                self.connection.execute("DELETE FROM transit_ingresses WHERE jd <= ?", (oldest,))
+                self._set_state("timeline_start", max(oldest, self._state("timeline_start") or oldest))
+                self.connection.commit()
+            return queued
+
+    def subscribe(self, subscriber_id, gates, jd=None):
+        '''
+        add or replace a subscriber (natal gates of personality and design) and plan its events
+        Return:
+            number of queued events
+        Raises:
+            ValueError for gates outside 1..64 (nothing is stored)
+        '''
+        jd = now_jd() if jd is None else jd
+        gates = self._valid_gates(gates)
+        with self._lock:
+            try:
+                self.connection.execute("DELETE FROM alert_events WHERE subscriber_id = ? AND delivered = 0",
+                                        (subscriber_id,))
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO alert_subscribers (subscriber_id, gates, planned_until) VALUES (?, ?, ?)",
+                    (subscriber_id, json.dumps(gates), jd))
+                idx = self._set_row(subscriber_id, gates, jd)
+                queued = self._plan(np.array([idx]), jd + self.horizon_days)
+                self.connection.commit()
+                return queued
+            except Exception:
+                #drop the uncommitted changes and the in-memory row of the failed subscriber
+                self.connection.rollback()
+                self._load()
+                raise
+
+    def unsubscribe(self, subscriber_id):
+        ''' remove subscriber and its pending events, returns False if unknown '''
+        with self._lock:
+            idx = self._index.pop(subscriber_id, None)
+            if idx is None:
+                return False
+            self.connection.execute("DELETE FROM alert_subscribers WHERE subscriber_id = ?", (subscriber_id,))
+            self.connection.execute("DELETE FROM alert_events WHERE subscriber_id = ?", (subscriber_id,))
+            self.connection.commit()
+            last = len(self._ids) - 1
+            if idx != last:
+                moved_id = self._ids[last]
+                self._ids[idx] = moved_id
+                self._index[moved_id] = idx
+                self._carry[:, idx] = self._carry[:, last]
+                self._planned_until[idx] = self._planned_until[last]
+            self._carry[:, last] = False
+            self._ids.pop()
+            return True
+
+    # --- queries ---
+
+    @staticmethod
+    def _event_dict(row):
+        event_id, subscriber_id, jd, time_iso, event, planet, gate, detail = row
+        return {"id": event_id, "subscriber_id": subscriber_id, "time": time_iso, "jd": jd, "event": event,
+                "planet": planet, "gate": gate, ("channel" if event == "channel_formed" else "center"): detail}
+
+    def due_events(self, until_jd=None, limit=1000, deliver=True):
+        '''
+        undelivered events due until until_jd (indexed read), oldest first
+        Args:
+            until_jd(float): julian day (UT), default now
+            limit(int): max. number of events
+            deliver(bool): mark the returned events as delivered
+        Return:
+            list of event dicts
+        '''
+        until_jd = now_jd() if until_jd is None else until_jd
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT id, subscriber_id, jd, time, event, planet, gate, detail FROM alert_events "
+                "WHERE delivered = 0 AND jd <= ? ORDER BY jd LIMIT ?", (until_jd, limit)).fetchall()
+            if deliver and rows:
+                self.connection.executemany("UPDATE alert_events SET delivered = 1 WHERE id = ?",
+                                            [(row[0],) for row in rows])
+                self.connection.commit()
+        return [self._event_dict(row) for row in rows]
+
+    def pending_events(self, subscriber_id):
+        ''' undelivered events of one subscriber in time order '''
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT id, subscriber_id, jd, time, event, planet, gate, detail FROM alert_events "
+                "WHERE subscriber_id = ? AND delivered = 0 ORDER BY jd", (subscriber_id,)).fetchall()
+        return [self._event_dict(row) for row in rows]
+
+    def stats(self):
+        ''' subscribers, pending events and planned timeline range '''
+        with self._lock:
+            pending = self.connection.execute("SELECT COUNT(*) FROM alert_events WHERE delivered = 0").fetchone()[0]
+            timeline_end = self._state("timeline_end")
+        return {
+            "subscribers": len(self._ids),
+            "pending_events": pending,
+            "horizon_days": self.horizon_days,
+            "max_events": self.max_events,
+            "timeline_end": jd_to_iso(timeline_end) if timeline_end else None,
+        }
+
+_alert_scheduler = None
+_alert_scheduler_lock = threading.Lock()
+_plan_thread = None
+_plan_lock = threading.Lock()
+
+def get_alert_scheduler():
+    ''' shared TransitAlertScheduler (HD_ALERTS_DB, HD_ALERT_HORIZON_DAYS, HD_ALERT_MAX_EVENTS) '''
+    global _alert_scheduler
+    with _alert_scheduler_lock:
+        if _alert_scheduler is None:
+            _alert_scheduler = TransitAlertScheduler(
+                os.getenv("HD_ALERTS_DB", DEFAULT_ALERTS_DB),
+                float(os.getenv("HD_ALERT_HORIZON_DAYS", DEFAULT_HORIZON_DAYS)),
+                int(os.getenv("HD_ALERT_MAX_EVENTS", DEFAULT_MAX_EVENTS)))
+        return _alert_scheduler
+
+def _plan_loop(scheduler):
+    ''' re-plan every PLAN_INTERVAL seconds as time advances '''
+    while True:
+        try:
+            scheduler.advance()
+        except Exception as e:
+            print(f"Transit alert planning failed: {e}")
+        time.sleep(PLAN_INTERVAL)
+
+def start_alert_scheduler():
+    '''
+    start the background planning thread once (daemon), disabled with HD_ALERT_SCHEDULER=0
+    Return:
+        bool: True if the thread is running
+    '''
+    global _plan_thread
+    if os.getenv("HD_ALERT_SCHEDULER", "1") == "0":
+        return False
+    scheduler = get_alert_scheduler()
+    with _plan_lock:
+        if _plan_thread is None or not _plan_thread.is_alive():
+            _plan_thread = threading.Thread(target=_plan_loop, args=(scheduler,),
+                                            name="transit-alerts", daemon=True)
+            _plan_thread.start()
+    return True
@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from .. import features as hd
+
+#2 prewarmed days of minute snapshots fit into the default size
+DEFAULT_CACHE_SIZE = 4096
+
+def utc_bucket(timestamp):
+    '''
+    UTC bucket (datetime, second precision) of a timestamp (year,month,day,hour,minute,second,tz_offset)
+    all timestamps of the same UTC moment share one bucket, independent of their zone
+    '''
+    year, month, day, hour, minute, second, tz_offset = timestamp
+    local = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    return local - timedelta(hours=tz_offset)
+
+class TransitSnapshotCache:
+    '''
+    LRU cache of day charts (transit positions) per UTC moment
+    the day chart of a UTC minute is the same for every user, so bursts of /transits/daily
+    requests for the same few minutes share one calculation
+    Args:
+        maxsize(int): max. number of cached snapshots (LRU eviction)
+    '''
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.prewarmed = 0
+        self.last_prewarm = None
+
+    @staticmethod
+    def _calc(bucket):
+        ''' day chart of a UTC bucket '''
+        return hd.calc_single_hd_features(
+            (bucket.year, bucket.month, bucket.day, bucket.hour, bucket.minute, bucket.second, 0),
+            day_chart_only=True)
+
+    def _store(self, bucket, snapshot):
+        with self._lock:
+            self._snapshots[bucket] = snapshot
+            self._snapshots.move_to_end(bucket)
+            while len(self._snapshots) > self.maxsize:
+                self._snapshots.popitem(last=False)
+
+    def day_chart(self, timestamp):
+        '''
+        day chart (date_to_gate_dict of calc_single_hd_features(..., day_chart_only=True))
+        of a timestamp, callers get their own copy of the lists
+        Args:
+            timestamp(tuple): (year,month,day,hour,minute,second,tz_offset)
+        Return:
+            date_to_gate_dict(dict)
+        '''
+        bucket = utc_bucket(timestamp)
+        with self._lock:
+            snapshot = self._snapshots.get(bucket)
+            if snapshot is not None:
+                self._snapshots.move_to_end(bucket)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if snapshot is None:
+            snapshot = self._calc(bucket)
+            self._store(bucket, snapshot)
+        return {key: list(values) for key, values in snapshot.items()}
+
+    def prewarm(self, start, minutes):
+        '''
+        calculate the snapshots of every UTC minute in [start, start + minutes)
+        Args:
+            start(datetime): UTC start (naive)
+            minutes(int): number of minute buckets
+        Return:
+            number of newly calculated snapshots
+        '''
+        start = start.replace(second=0, microsecond=0)
+        added = 0
+        for step in range(minutes):
+            bucket = start + timedelta(minutes=step)
+            with self._lock:
+                cached = bucket in self._snapshots
+            if not cached:
+                self._store(bucket, self._calc(bucket))
+                added += 1
+        with self._lock:
+            self.prewarmed += added
+            self.last_prewarm = datetime.utcnow().isoformat() + "Z"
+        return added
+
+    def prewarm_days(self, day, days=2):
+        ''' prewarm all minutes of days UTC days starting at day (date or datetime) '''
+        start = datetime(day.year, day.month, day.day)
+        return self.prewarm(start, days * 24 * 60)
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+    def stats(self):
+        ''' cache statistics: size, maxsize, hits, misses, hit_rate, prewarmed, last_prewarm '''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._snapshots),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "prewarmed": self.prewarmed,
+                "last_prewarm": self.last_prewarm,
+            }
+
+_transit_cache = None
+_transit_cache_lock = threading.Lock()
+_prewarm_thread = None
+_prewarm_lock = threading.Lock()
+_lunar_thread = None
+
+def get_transit_cache():
+    ''' shared TransitSnapshotCache (size via HD_TRANSIT_CACHE_SIZE) '''
+    global _transit_cache
+    with _transit_cache_lock:
+        if _transit_cache is None:
+            _transit_cache = TransitSnapshotCache(int(os.getenv("HD_TRANSIT_CACHE_SIZE", DEFAULT_CACHE_SIZE)))
+        return _transit_cache
+
+def _prewarm_loop(cache):
+    ''' prewarm current and next UTC day, again after every UTC midnight '''
+    while True:
+        now = datetime.utcnow()
+        try:
+            cache.prewarm_days(now.date(), days=2)
+        except Exception as e:
+            print(f"Transit prewarm failed: {e}")
+        next_midnight = datetime(now.year, now.month, now.day) + timedelta(days=1)
+        time.sleep(max((next_midnight - datetime.utcnow()).total_seconds(), 0) + 1)
+
+def start_transit_prewarm():
+    '''
+    start the background prewarm thread once (daemon), disabled with HD_TRANSIT_PREWARM=0
+    Return:
+        bool: True if the thread is running
+    '''
+    global _prewarm_thread
+    if os.getenv("HD_TRANSIT_PREWARM", "1") == "0":
+        return False
+    cache = get_transit_cache()
+    with _prewarm_lock:
+        if _prewarm_thread is None or not _prewarm_thread.is_alive():
+            _prewarm_thread = threading.Thread(target=_prewarm_loop, args=(cache,),
+                                               name="transit-prewarm", daemon=True)
+            _prewarm_thread.start()
+    return True
+
+def _build_lunar_years(years):
+    try:
+        hd.build_lunar_table(*years)
+    except Exception as e:
+        print(f"Lunar table build failed: {e}")
+
+def start_lunar_prebuild():
+    '''
+    build the lunar ingress table of the current and next UTC year in the background (daemon),
+    so the first lunar forecast does not calculate it, disabled with HD_LUNAR_PREBUILD=0
+    Return:
+        bool: True if the thread was started
+    '''
+    global _lunar_thread
+    if os.getenv("HD_LUNAR_PREBUILD", "1") == "0":
+        return False
+    year = datetime.utcnow().year
+    with _prewarm_lock:
+        if _lunar_thread is None:
+            _lunar_thread = threading.Thread(target=_build_lunar_years, args=((year, year + 1),),
+                                             name="lunar-prebuild", daemon=True)
+            _lunar_thread.start()
+    return True
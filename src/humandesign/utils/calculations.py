@@ -1,15 +1,182 @@
+import functools
+import os
 from .. import features as hd
 from .. import hd_constants
 from .date_utils import to_iso_utc, clean_birth_date_to_iso
+from ..services.transit_cache import get_transit_cache
+
+# --- Natal metadata maps ---
+DEFINITION_NAMES = {
+    0: "No Definition",
+    1: "Single Definition",
+    2: "Split Definition",
+    3: "Triple Split Definition", 
+    4: "Quadruple Split Definition"
+}
+STRATEGY_MAP = {
+    "Generator": "Wait to Respond",
+    "Manifesting Generator": "Wait to Respond",
+    "Projector": "Wait for the Invitation",
+    "Manifestor": "Inform Before Acting",
+    "Reflector": "Wait a Lunar Cycle"
+}
+SIGNATURE_MAP = {
+    "Generator": "Satisfaction",
+    "Manifesting Generator": "Satisfaction",
+    "Projector": "Success",
+    "Manifestor": "Peace",
+    "Reflector": "Surprise"
+}
+NOT_SELF_MAP = {
+     "Generator": "Frustration",
+     "Manifesting Generator": "Frustration & Anger",
+     "Projector": "Bitterness",
+     "Manifestor": "Anger",
+     "Reflector": "Disappointment"
+}
+AURA_MAP = {
+    "Generator": "Open & Enveloping",
+    "Manifesting Generator": "Open & Enveloping",
+    "Projector": "Focused & Absorbing",
+    "Manifestor": "Closed & Repelling",
+    "Reflector": "Sampling & Resistant"
+}
+PROFILE_NAMES = {
+    "1/3": "Investigator Martyr",
+    "1/4": "Investigator Opportunist",
+    "2/4": "Hermit Opportunist",
+    "2/5": "Hermit Heretic",
+    "3/5": "Martyr Heretic",
+    "3/6": "Martyr Role Model",
+    "4/6": "Opportunist Role Model",
+    "4/1": "Opportunist Investigator",
+    "5/1": "Heretic Investigator",
+    "5/2": "Heretic Hermit",
+    "6/2": "Role Model Hermit",
+    "6/3": "Role Model Martyr"
+}
+
+def get_zodiac(d, m):
+    """ Western zodiac sign of a day and month """
+    if (m == 3 and d >= 21) or (m == 4 and d <= 19):
+        return "Aries"
+    if (m == 4 and d >= 20) or (m == 5 and d <= 20):
+        return "Taurus"
+    if (m == 5 and d >= 21) or (m == 6 and d <= 20):
+        return "Gemini"
+    if (m == 6 and d >= 21) or (m == 7 and d <= 22):
+        return "Cancer"
+    if (m == 7 and d >= 23) or (m == 8 and d <= 22):
+        return "Leo"
+    if (m == 8 and d >= 23) or (m == 9 and d <= 22):
+        return "Virgo"
+    if (m == 9 and d >= 23) or (m == 10 and d <= 22):
+        return "Libra"
+    if (m == 10 and d >= 23) or (m == 11 and d <= 21):
+        return "Scorpio"
+    if (m == 11 and d >= 22) or (m == 12 and d <= 21):
+        return "Sagittarius"
+    if (m == 12 and d >= 22) or (m == 1 and d <= 19):
+        return "Capricorn"
+    if (m == 1 and d >= 20) or (m == 2 and d <= 18):
+        return "Aquarius"
+    return "Pisces"
+
+class NatalContext:
+    """
+    Natal chart of one birth timestamp, calculated once and shared by all transit helpers
+    (process_transit_data, enrich_transit_metadata).
+    Holds the raw calc_single_hd_features result, the natal channel keys and the
+    transit independent metadata of the response.
+    """
+    def __init__(self, birth_timestamp, birth_features):
+        self.birth_timestamp = tuple(birth_timestamp)
+        (
+            self.typ, self.auth, self.inc_cross, self.inc_cross_typ, self.profile, self.definition,
+            self.date_to_gate, self.active_chakras, self.active_channels,
+            self.birth_date_str, self.create_date_str, self.variables
+        ) = birth_features
+
+        # Natal channel keys (sorted gate tuples)
+        self.channel_keys = set()
+        if 'gate' in self.active_channels:
+            for g1, g2 in zip(self.active_channels['gate'], self.active_channels['ch_gate']):
+                self.channel_keys.add(tuple(sorted((g1, g2))))
+
+        self.meta = self._natal_meta()
+
+    @classmethod
+    def from_timestamp(cls, birth_timestamp):
+        """ calculate the natal chart (incl. channel meanings) of birth_timestamp """
+        birth_features = hd.calc_single_hd_features(birth_timestamp, report=False, channel_meaning=True, day_chart_only=False)
+        return cls(birth_timestamp, birth_features)
+
+    def _natal_meta(self):
+        """ transit independent meta fields (HD core, centers, channels) """
+        defined_centers_list = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in self.active_chakras]
+        undefined_centers_set = set(hd_constants.CHAKRA_LIST) - self.active_chakras
+        undefined_centers_list = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in undefined_centers_set]
+
+        # Map Channels
+        birth_channels_formatted = []
+        if 'meaning' in self.active_channels:
+            b_gates = self.active_channels.get('gate', [])
+            b_ch_gates = self.active_channels.get('ch_gate', [])
+            b_meanings = self.active_channels.get('meaning', [])
+            
+            count = len(b_gates)
+            for i in range(count):
+                g1 = b_gates[i]
+                g2 = b_ch_gates[i]
+                
+                m_name = "Unknown"
+                m_desc = ""
+                current_meaning = b_meanings[i]
+                if isinstance(current_meaning, (list, tuple)):
+                    if len(current_meaning) > 0:
+                        m_name = current_meaning[0]
+                    if len(current_meaning) > 1:
+                        m_desc = current_meaning[1]
+                
+                channel_str = f"{g1}/{g2}: {m_name} ({m_desc})"
+                birth_channels_formatted.append({"channel": channel_str})
+
+        p_key = f"{self.profile[0]}/{self.profile[1]}"
+        return {
+            "energy_type": self.typ,
+            "strategy": STRATEGY_MAP.get(self.typ, "Unknown"),
+            "signature": SIGNATURE_MAP.get(self.typ, "Unknown"),
+            "not_self": NOT_SELF_MAP.get(self.typ, "Unknown"),
+            "aura": AURA_MAP.get(self.typ, "Unknown"),
+            "inner_authority": hd_constants.INNER_AUTHORITY_NAMES_MAP.get(self.auth, self.auth),
+            "inc_cross": f"{self.inc_cross}",
+            "profile": f"{p_key}: {PROFILE_NAMES.get(p_key, '')}",
+            "defined_centers": defined_centers_list,
+            "undefined_centers": undefined_centers_list,
+            "definition": DEFINITION_NAMES.get(self.definition, "Unknown Definition"),
+            "channels": {
+                "Channels": birth_channels_formatted
+            },
+            "zodiac_sign": get_zodiac(self.birth_timestamp[2], self.birth_timestamp[1]),
+        }
+
+@functools.lru_cache(maxsize=int(os.getenv("HD_NATAL_CACHE_SIZE", 1024)))
+def get_natal_context(birth_timestamp):
+    """
+    NatalContext of birth_timestamp, cached per user (LRU, size via HD_NATAL_CACHE_SIZE).
+    Contents are shared between requests and must not be mutated.
+    """
+    return NatalContext.from_timestamp(tuple(birth_timestamp))
 
 # --- Helper to process transit data ---
-def process_transit_data(transit_date_timestamp, birth_timestamp, birth_place):
-    # 1. Calculate birth chart to get natal features (prs + des)
-    birth_features = hd.calc_single_hd_features(birth_timestamp, report=False, channel_meaning=True, day_chart_only=False)
-    natal_gate_dict = birth_features[6]
+def process_transit_data(transit_date_timestamp, birth_timestamp, birth_place, natal=None):
+    # 1. Natal features (prs + des), calculated here only if no NatalContext is passed
+    if natal is None:
+        natal = NatalContext.from_timestamp(birth_timestamp)
+    natal_gate_dict = natal.date_to_gate
 
-    # 2. Calculate day chart (transit features only)
-    day_gate_dict = hd.calc_single_hd_features(transit_date_timestamp, day_chart_only=True)
+    # 2. Day chart (transit features only), shared per UTC moment via the snapshot cache
+    day_gate_dict = get_transit_cache().day_chart(transit_date_timestamp)
     # Round longitude to 3 decimal places for clean output
     if 'lon' in day_gate_dict:
         day_gate_dict['lon'] = [round(x, 3) for x in day_gate_dict['lon']]
@@ -32,13 +199,7 @@ def process_transit_data(transit_date_timestamp, birth_timestamp, birth_place):
     # Refactored to avoid using hd.composite_chakras_channels which incorrectly 
     # calculates the full chart (Personality + Design) for the transit timestamp.
     # We only want to compare Composite (Natal + Transit Personality) vs Natal.
-    
-    # Natal features from Step 1
-    # birth_features structure:
-    # 0:typ, 1:auth, 2:inc_cross, 3:inc_cross_typ, 4:profile, 5:definition, 
-    # 6:date_to_gate_dict, 7:active_chakras, 8:active_channels_dict
-    natal_active_chakras = set(birth_features[7])
-    natal_active_channels_dict = birth_features[8]
+    natal_active_chakras = natal.active_chakras
 
     # Calculate New Centers
     # active_chakras is the Composite set (from Step 4)
@@ -58,14 +219,8 @@ def process_transit_data(transit_date_timestamp, birth_timestamp, birth_place):
     def ch_key(g1, g2):
         return tuple(sorted((g1, g2)))
 
-    # Get Natal Channel Keys
-    natal_keys = set()
-    if 'gate' in natal_active_channels_dict:
-        n_gates = natal_active_channels_dict['gate']
-        n_ch_gates = natal_active_channels_dict['ch_gate']
-        count_n = len(n_gates)
-        for i in range(count_n):
-            natal_keys.add(ch_key(n_gates[i], n_ch_gates[i]))
+    # Natal Channel Keys (precalculated in NatalContext)
+    natal_keys = natal.channel_keys
 
     # Iterate Composite Channels and find new ones
     if 'gate' in active_channels_dict:
@@ -93,7 +248,7 @@ def process_transit_data(transit_date_timestamp, birth_timestamp, birth_place):
     # 6. Structure output
     raw_output = {
         "transit_date": to_iso_utc(transit_date_timestamp),
-        "birth_date": clean_birth_date_to_iso(birth_features[9], birth_offset),
+        "birth_date": clean_birth_date_to_iso(natal.birth_date_str, birth_offset),
         "birth_place": birth_place,
         "composite_type": typ,
         "composite_authority": auth,
@@ -134,114 +289,24 @@ def enrich_transit_metadata(
     transit_minute,
     place,
     calculation_place,
-    composite_data
+    composite_data,
+    natal=None
 ):
     """
     Enriches the transit response with full birth chart metadata and standardized structure.
+    Natal metadata comes from natal (NatalContext), calculated here only if not passed.
     Returns the final dictionary ready for sanitization.
     """
-    
-    # 1. Calculate Full Birth Chart Details
-    (
-        b_typ, b_auth, b_inc_cross, b_inc_cross_typ, b_profile, b_definition, 
-        b_date_to_gate, b_active_chakras, b_active_channels, 
-        b_date_str, b_create_date_str, b_variables
-    ) = hd.calc_single_hd_features(birth_timestamp, report=False, channel_meaning=True)
-
-    # 2. Map Constants & Formats for Metadata
-    
-    # Map Authority
-    b_auth_name = hd_constants.INNER_AUTHORITY_NAMES_MAP.get(b_auth, b_auth)
-
-    # Map Centers (Sort for consistency)
-    defined_centers_list = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in b_active_chakras]
-    
-    # Calculate Undefined Centers
-    all_centers = set(hd_constants.CHAKRA_LIST)
-    undefined_centers_set = all_centers - b_active_chakras
-    undefined_centers_list = [hd_constants.CHAKRA_NAMES_MAP.get(c, c) for c in undefined_centers_set]
-
-    # Map Definition
-    definition_map = {
-        0: "No Definition",
-        1: "Single Definition",
-        2: "Split Definition",
-        3: "Triple Split Definition", 
-        4: "Quadruple Split Definition"
-    }
-    definition_str = definition_map.get(b_definition, "Unknown Definition")
-
-    # Map Channels
-    birth_channels_formatted = []
-    
-    if 'meaning' in b_active_channels:
-        b_gates = b_active_channels.get('gate', [])
-        b_ch_gates = b_active_channels.get('ch_gate', [])
-        b_meanings = b_active_channels.get('meaning', [])
-        
-        count = len(b_gates)
-        for i in range(count):
-            g1 = b_gates[i]
-            g2 = b_ch_gates[i]
-            
-            m_name = "Unknown"
-            m_desc = ""
-            current_meaning = b_meanings[i]
-            if isinstance(current_meaning, (list, tuple)):
-                if len(current_meaning) > 0:
-                    m_name = current_meaning[0]
-                if len(current_meaning) > 1:
-                    m_desc = current_meaning[1]
-            
-            channel_str = f"{g1}/{g2}: {m_name} ({m_desc})"
-            birth_channels_formatted.append({"channel": channel_str})
-
-    # Strategy & Signature mapping
-    strategy_map = {
-        "Generator": "Wait to Respond",
-        "Manifesting Generator": "Wait to Respond",
-        "Projector": "Wait for the Invitation",
-        "Manifestor": "Inform Before Acting",
-        "Reflector": "Wait a Lunar Cycle"
-    }
-    signature_map = {
-        "Generator": "Satisfaction",
-        "Manifesting Generator": "Satisfaction",
-        "Projector": "Success",
-        "Manifestor": "Peace",
-        "Reflector": "Surprise"
-    }
-    not_self_map = {
-         "Generator": "Frustration",
-         "Manifesting Generator": "Frustration & Anger",
-         "Projector": "Bitterness",
-         "Manifestor": "Anger",
-         "Reflector": "Disappointment"
-    }
-    aura_map = {
-        "Generator": "Open & Enveloping",
-        "Manifesting Generator": "Open & Enveloping",
-        "Projector": "Focused & Absorbing",
-        "Manifestor": "Closed & Repelling",
-        "Reflector": "Sampling & Resistant"
-    }
-    
-    b_strategy = strategy_map.get(b_typ, "Unknown")
-    b_signature = signature_map.get(b_typ, "Unknown")
-    b_not_self = not_self_map.get(b_typ, "Unknown")
-    b_aura = aura_map.get(b_typ, "Unknown")
+    if natal is None:
+        natal = NatalContext.from_timestamp(birth_timestamp)
+    natal_meta = natal.meta
 
     # Construct Meta Object
-    # Extract Birth Date/Time from timestamp (tuple) or passed args?
     # birth_timestamp is (y, m, d, h, m, s, offset)
-    # We can reconstruct ISO from it loosely or use b_date_str from HD calc?
-    # HD calc returns b_date_str, let's use what we have or just format inputs if passed.
-    # The caller passes birth_timestamp, let's use that.
-    
     meta_object = {
         # Bio
         "birth_date": f"{birth_timestamp[0]}-{birth_timestamp[1]:02d}-{birth_timestamp[2]:02d}T{birth_timestamp[3]:02d}:{birth_timestamp[4]:02d}:{birth_timestamp[5]:02d}Z",
-        "create_date": b_create_date_str,
+        "create_date": natal.create_date_str,
         "place": place,
         "age": transit_year - birth_timestamp[0], 
         "gender": "male", # Keeping hardcoded default as per v1.8.1 parity
@@ -253,74 +318,28 @@ def enrich_transit_metadata(
         "calculation_place": calculation_place,
         
         # Astrology
-        "zodiac_sign": "Pisces", # Placeholder - will run helper
+        "zodiac_sign": natal_meta["zodiac_sign"],
                                  
         # HD Core
-        "energy_type": b_typ,
-        "strategy": b_strategy,
-        "signature": b_signature,
-        "not_self": b_not_self,
-        "aura": b_aura,
-        "inner_authority": b_auth_name,
-        "inc_cross": f"{b_inc_cross}",
-        "profile": f"{b_profile[0]}/{b_profile[1]}",
+        "energy_type": natal_meta["energy_type"],
+        "strategy": natal_meta["strategy"],
+        "signature": natal_meta["signature"],
+        "not_self": natal_meta["not_self"],
+        "aura": natal_meta["aura"],
+        "inner_authority": natal_meta["inner_authority"],
+        "inc_cross": natal_meta["inc_cross"],
+        "profile": natal_meta["profile"],
         
         # Centers
-        "defined_centers": defined_centers_list,
-        "undefined_centers": undefined_centers_list,
-        "definition": definition_str,
+        "defined_centers": list(natal_meta["defined_centers"]),
+        "undefined_centers": list(natal_meta["undefined_centers"]),
+        "definition": natal_meta["definition"],
         
         # Channels
         "channels": {
-            "Channels": birth_channels_formatted
+            "Channels": list(natal_meta["channels"]["Channels"])
         }
     }
-    
-    # Zodiac Logic
-    def get_zodiac(d, m):
-        if (m == 3 and d >= 21) or (m == 4 and d <= 19):
-            return "Aries"
-        if (m == 4 and d >= 20) or (m == 5 and d <= 20):
-            return "Taurus"
-        if (m == 5 and d >= 21) or (m == 6 and d <= 20):
-            return "Gemini"
-        if (m == 6 and d >= 21) or (m == 7 and d <= 22):
-            return "Cancer"
-        if (m == 7 and d >= 23) or (m == 8 and d <= 22):
-            return "Leo"
-        if (m == 8 and d >= 23) or (m == 9 and d <= 22):
-            return "Virgo"
-        if (m == 9 and d >= 23) or (m == 10 and d <= 22):
-            return "Libra"
-        if (m == 10 and d >= 23) or (m == 11 and d <= 21):
-            return "Scorpio"
-        if (m == 11 and d >= 22) or (m == 12 and d <= 21):
-            return "Sagittarius"
-        if (m == 12 and d >= 22) or (m == 1 and d <= 19):
-            return "Capricorn"
-        if (m == 1 and d >= 20) or (m == 2 and d <= 18):
-            return "Aquarius"
-        return "Pisces"
-    
-    meta_object["zodiac_sign"] = get_zodiac(birth_timestamp[2], birth_timestamp[1])
-    
-    # Profile Names Map
-    profile_names = {
-        "1/3": "Investigator Martyr",
-        "1/4": "Investigator Opportunist",
-        "2/4": "Hermit Opportunist",
-        "2/5": "Hermit Heretic",
-        "3/5": "Martyr Heretic",
-        "3/6": "Martyr Role Model",
-        "4/6": "Opportunist Role Model",
-        "4/1": "Opportunist Investigator",
-        "5/1": "Heretic Investigator",
-        "5/2": "Heretic Hermit",
-        "6/2": "Role Model Hermit",
-        "6/3": "Role Model Martyr"
-    }
-    p_key = f"{b_profile[0]}/{b_profile[1]}"
-    meta_object["profile"] = f"{p_key}: {profile_names.get(p_key, '')}"
 
     # Map Composite Data
     composite_data.get("composite_authority")
@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from humandesign.schemas.input_models import PersonInput
+from humandesign.services import gazetteer as gazetteer_service
+from humandesign.services import geocode_cache, geocoder, geolocation
+from humandesign.services.composite import prepare_hybrid_participants
+from humandesign.services.geocoder import AsyncGeocoder
+
+class SlowGeolocator:
+    ''' Nominatim stand-in: every call takes delay seconds '''
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def geocode(self, place, **kwargs):
+        with self._lock:
+            self.calls.append(place)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        coordinates = {"Berlin, Germany": (52.52, 13.405), "London, UK": (51.5074, -0.1278)}.get(place)
+        if coordinates is None:
+            return None
+        location = type("Location", (), {})()
+        location.latitude, location.longitude = coordinates
+        location.address = place
+        return location
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    fake = SlowGeolocator()
+    monkeypatch.setattr(geolocation, "geolocator", fake)
+    monkeypatch.setattr(geocode_cache, "_geocode_cache", geocode_cache.GeocodeCache(str(tmp_path / "geocode.sqlite")))
+    monkeypatch.setattr(geocoder, "_geocoder", AsyncGeocoder(concurrency=2, rate=0))
+    monkeypatch.setattr(gazetteer_service, "_gazetteer", None)
+    monkeypatch.setattr(gazetteer_service, "_gazetteer_loaded", True)
+    return fake
+
+def test_concurrent_lookups_are_coalesced(upstream):
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        results = list(executor.map(geolocation.get_latitude_longitude, ["Berlin, Germany"] * 25 + ["berlin,germany"] * 25))
+    assert set(results) == {(52.52, 13.405)}
+    assert upstream.calls == ["Berlin, Germany"]
+    stats = geocoder.get_geocoder().stats()
+    assert stats["upstream_calls"] == 1 and stats["inflight"] == 0
+
+def test_concurrency_limit(upstream):
+    places = [f"Nowhere {i}" for i in range(6)]
+    start = time.monotonic()
+    locations = geolocation.geocode_places(places)
+    assert [locations[p].latitude for p in places] == [None] * 6
+    assert upstream.max_active == 2
+    assert time.monotonic() - start >= 3 * upstream.delay
+    #negative results are cached
+    geolocation.geocode_places(places)
+    assert len(upstream.calls) == 6
+
+def test_rate_limit():
+    limited = AsyncGeocoder(concurrency=4, rate=10)
+    start = time.monotonic()
+    results = limited.resolve_many([(i, lambda i: i * 2, (i,)) for i in range(5)])
+    assert results == [0, 2, 4, 6, 8]
+    #5 calls at 10 per second: slots 0, 0.1, ..., 0.4 s
+    assert time.monotonic() - start >= 0.35
+
+def test_errors_reach_all_waiters():
+    failing = AsyncGeocoder(rate=0)
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+    results = failing.resolve_many([("x", fail, ()), ("x", fail, ())])
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert failing.stats()["upstream_calls"] == 1 and failing.stats()["coalesced"] == 1
+    with pytest.raises(RuntimeError):
+        failing.resolve_sync("x", fail)
+
+def test_hybrid_participants_geocode_once(upstream, monkeypatch):
+    monkeypatch.setenv("HD_CHART_WORKERS", "0")
+    participants = {
+        "a": PersonInput(place="Berlin, Germany", year=1980, month=1, day=1, hour=12, minute=0),
+        "b": PersonInput(place="Berlin, Germany", year=1985, month=5, day=5, hour=10, minute=30),
+        "c": PersonInput(place="London, UK", year=1990, month=10, day=10, hour=15, minute=45),
+        "d": PersonInput(place="Tokyo", year=1990, month=10, day=10, hour=15, minute=45,
+                         latitude=35.6895, longitude=139.6917),
+    }
+    parties = prepare_hybrid_participants(participants)
+    assert list(parties) == ["a", "b", "c", "d"]
+    assert sorted(upstream.calls) == ["Berlin, Germany", "London, UK"]
+    assert upstream.max_active == 2
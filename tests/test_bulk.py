@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from humandesign import features as hd
+from humandesign.features.bulk import BulkChartResult, PLANET_COLUMNS
+
+@pytest.fixture(scope="module")
+def bulk_run():
+    timestamps = hd.get_timestamp_list((2000, 1, 1, 0, 0, 0, 0), (2000, 1, 2, 0, 0, 0, 0), 1, "hours", 3)
+    results = [hd.calc_single_hd_features(ts) for ts in timestamps]
+    return timestamps, results, BulkChartResult.from_features(results, timestamps)
+
+def test_columns_match_single_results(bulk_run):
+    timestamps, results, bulk = bulk_run
+    assert len(bulk) == len(timestamps) == 8
+    assert bulk.gate.shape == (8, len(PLANET_COLUMNS)) and bulk.gate.dtype == np.uint8
+    for idx, single in enumerate(results):
+        assert bulk.gate[idx].tolist() == single[6]["gate"]
+        assert bulk.line[idx].tolist() == single[6]["line"]
+        assert bulk.definition[idx] == single[5]
+    df = bulk.to_dataframe()
+    assert list(df["typ"]) == [r[0] for r in results]
+    assert list(df["auth"]) == [r[1] for r in results]
+    assert list(df["profile"]) == ["{}/{}".format(*r[4]) for r in results]
+    assert df["prs_Sun_gate"].tolist() == bulk.column("prs", "Sun").tolist()
+
+def test_slices_are_views(bulk_run):
+    _, _, bulk = bulk_run
+    part = bulk[2:5]
+    assert len(part) == 3
+    assert part.gate.base is bulk.gate
+    assert np.shares_memory(part.timestamps, bulk.timestamps)
+
+def test_concat_roundtrip(bulk_run):
+    _, _, bulk = bulk_run
+    joined = BulkChartResult.concat([bulk[:3], bulk[3:]])
+    assert np.array_equal(joined.gate, bulk.gate)
+    assert np.array_equal(joined.timestamps, bulk.timestamps)
+    assert joined.nbytes == bulk.nbytes
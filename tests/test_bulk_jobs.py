@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from humandesign.features.bulk_jobs import BulkJob
+
+RANGE = ((2000, 1, 1, 0, 0, 0, 0), (2000, 1, 2, 0, 0, 0, 0))
+
+def test_interrupted_job_resumes_without_recomputing(tmp_path, monkeypatch):
+    job = BulkJob.create(*RANGE, time_unit="hours", intervall=1, chunk_size=5, job_dir=str(tmp_path), job_id="scan")
+    assert job.run(max_chunks=2) is False
+    assert job.completed == [[0, 2]]
+
+    calls = []
+    import humandesign.features.bulk_jobs as bulk_jobs
+    original = bulk_jobs.calc_chart_row
+    monkeypatch.setattr(bulk_jobs, "calc_chart_row", lambda ts: calls.append(ts) or original(ts))
+
+    resumed = BulkJob.resume("scan", job_dir=str(tmp_path))
+    assert resumed.run() is True
+    # 24 hourly charts in chunks of 5, the first two chunks are not recomputed
+    assert len(calls) == 24 - 10
+    assert resumed.completed == [[0, 5]]
+
+    result = resumed.result()
+    assert len(result) == 24
+    assert result.timestamps[0] == np.datetime64("2000-01-01T00:00:00")
+    assert np.all(np.diff(result.timestamps.astype(np.int64)) == 3600)
+
+def test_written_chunk_without_checkpoint_is_not_duplicated(tmp_path):
+    job = BulkJob.create(*RANGE, time_unit="hours", intervall=6, chunk_size=2, job_dir=str(tmp_path), job_id="crash")
+    job.run(max_chunks=1)
+    # simulate crash after the sink write but before the state update
+    job.completed = []
+    job.save_state()
+
+    resumed = BulkJob.resume("crash", job_dir=str(tmp_path))
+    resumed.run()
+    assert len(resumed.result()) == 4
+
+def test_existing_job_id_is_rejected(tmp_path):
+    BulkJob.create(*RANGE, time_unit="days", job_dir=str(tmp_path), job_id="dup")
+    with pytest.raises(ValueError):
+        BulkJob.create(*RANGE, time_unit="days", job_dir=str(tmp_path), job_id="dup")
+    with pytest.raises(FileNotFoundError):
+        BulkJob.resume("missing", job_dir=str(tmp_path))
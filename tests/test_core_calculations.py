@@ -48,3 +48,28 @@ def test_hd_features_snapshot():
     assert isinstance(gates, dict)
     expected_gate_keys = ['label', 'planets', 'lon', 'gate', 'line', 'color', 'tone', 'base', 'ch_gate']
     assert list(gates.keys()) == expected_gate_keys
+
+def test_solar_return_series_matches_single_search():
+    import swisseph as swe
+    features = hd.hd_features(1968, 2, 21, 11, 0, 0, 2)
+    birth_jd = features.timestamp_to_juldate(features.time_stamp)
+    series = features.calc_solar_return_series(birth_jd, range(0, 91))
+    assert list(series) == list(range(0, 91))
+    natal_sun = swe.calc_ut(birth_jd, swe.SUN)[0][0]
+    for year_offset, sr_jd in series.items():
+        #same return as the January 1 search, within solver precision
+        assert abs(sr_jd - features.calc_solar_return_jd(birth_jd, year_offset)) < 1e-6
+        assert abs(swe.difdeg2n(swe.calc_ut(sr_jd, swe.SUN)[0][0], natal_sun)) < 1e-5
+
+def test_solar_return_series_year_boundary():
+    import swisseph as swe
+    #birth 1990-12-31 23:00 UTC, later returns drift across New Year
+    features = hd.hd_features(1990, 12, 31, 23, 0, 0, 0)
+    birth_jd = features.timestamp_to_juldate(features.time_stamp)
+    from_zero = features.calc_solar_return_series(birth_jd, range(0, 3))
+    from_two = features.calc_solar_return_series(birth_jd, range(2, 5))
+    assert from_zero[2] == from_two[2]
+    assert swe.jdut1_to_utc(from_two[2])[:3] == (1992, 12, 31)
+    for year_offset, sr_jd in {**from_zero, **from_two}.items():
+        #one return per year after birth
+        assert abs(sr_jd - birth_jd - year_offset * 365.24219) < 1
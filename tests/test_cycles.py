@@ -0,0 +1,56 @@
+import numpy as np
+import swisseph as swe
+import pytest
+from fastapi.testclient import TestClient
+from humandesign import features as hd
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.features.cycles import planet_position
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+JD_BIRTH = swe.julday(1968, 2, 21, 9.0)
+
+def sampled_crossings(planet, target, jd_start, jd_end, step):
+    ''' brute force reference: sign changes of the longitude difference on a dense grid '''
+    jds = np.arange(jd_start, jd_end, step)
+    diff = np.array([swe.difdeg2n(planet_position(jd, planet)[0], target) for jd in jds])
+    return int(np.sum((np.signbit(diff[:-1]) != np.signbit(diff[1:])) & (np.abs(diff[:-1] - diff[1:]) < 180)))
+
+@pytest.mark.parametrize("planet, years, step", [("Saturn", 60, 2), ("Mercury", 5, 0.1)])
+def test_crossings_match_dense_sampling(planet, years, step):
+    jd_end = JD_BIRTH + years * 365.25
+    #target at a retrograde position, so that direct and retrograde passes are included
+    jd_retrograde = next(jd for jd in np.arange(JD_BIRTH + 100, jd_end, 1) if planet_position(jd, planet)[1] < 0)
+    target = planet_position(jd_retrograde, planet)[0]
+    crossings = hd.find_longitude_crossings(planet, [target], JD_BIRTH, jd_end)[target]
+    assert len(crossings) == sampled_crossings(planet, target, JD_BIRTH, jd_end, step)
+    for jd, speed in crossings:
+        assert abs(swe.difdeg2n(planet_position(jd, planet)[0], target)) < 1e-6
+    assert any(speed < 0 for _, speed in crossings)
+
+def test_named_cycles():
+    natal = {"Saturn": planet_position(JD_BIRTH, "Saturn")[0], "Sun": planet_position(JD_BIRTH, "Sun")[0]}
+    saturn_return, custom = hd.find_cycles(natal, ["saturn_return", {"planet": "Sun", "aspect": 180}],
+                                           JD_BIRTH, JD_BIRTH + 60 * 365.25)
+    assert saturn_return["target_lon"] == natal["Saturn"]
+    #first Saturn return at ~29.5 years
+    assert saturn_return["passes"][0]["time"].startswith("1997")
+    assert [p["pass"] for p in saturn_return["passes"]] == list(range(1, len(saturn_return["passes"]) + 1))
+    assert custom["cycle"] == "sun_180_sun" and len(custom["passes"]) == 60
+    with pytest.raises(ValueError):
+        hd.find_cycles(natal, ["chiron_return"], JD_BIRTH, JD_BIRTH + 365)
+
+def test_cycles_endpoint():
+    person = {"place": "Europe/Berlin", "year": 1968, "month": 2, "day": 21, "hour": 11, "minute": 0,
+              "latitude": 52.52, "longitude": 13.405}
+    body = {"persons": {"a": person}, "cycles": ["saturn_return", {"planet": "Jupiter", "aspect": 180, "cycle": "jupiter_opposition"}],
+            "years": 60}
+    response = client.post("/transits/cycles", json=body)
+    assert response.status_code == 200
+    cycles = response.json()["results"]["a"]["cycles"]
+    assert [c["cycle"] for c in cycles] == ["saturn_return", "jupiter_opposition"]
+    assert {p["direction"] for p in cycles[0]["passes"]} == {"direct", "retrograde"}
+    body["cycles"] = [{"planet": "Vulcan"}]
+    assert client.post("/transits/cycles", json=body).status_code == 400
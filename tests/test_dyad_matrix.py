@@ -0,0 +1,52 @@
+import itertools
+import random
+from fastapi.testclient import TestClient
+from humandesign import features as hd
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.features.dyad_matrix import CIRCUIT_GROUPS
+from humandesign.features.mechanics import gate_mask, channel_mask, channels_from_mask, chakras_from_channel_mask
+from humandesign.services.composite import classify_maia_connection
+from humandesign import hd_constants
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+def test_dyad_matrices_match_pairwise_classification():
+    rng = random.Random(2)
+    persons = {f"p{i}": rng.sample(range(1, 65), 20) for i in range(30)}
+    matrices = hd.dyad_matrices(persons, block_size=7)
+    ids = matrices["ids"]
+    for i, j in itertools.combinations(range(len(ids)), 2):
+        p1, p2 = set(persons[ids[i]]), set(persons[ids[j]])
+        composite = channel_mask(gate_mask(p1 | p2))
+        counts = {"Companionship": 0, "Dominance": 0, "Compromise": 0, "Electromagnetic": 0}
+        circuitry = dict.fromkeys(CIRCUIT_GROUPS, 0)
+        for channel in channels_from_mask(composite):
+            connection = classify_maia_connection(p1, p2, channel)
+            counts[connection] += 1
+            if connection == "Electromagnetic":
+                sub = hd_constants.circuit_typ_dict[tuple(sorted(channel))]
+                circuitry[hd_constants.circuit_group_typ_dict[sub]] += 1
+        for key, count in counts.items():
+            assert matrices[key.lower()][i, j] == matrices[key.lower()][j, i] == count
+        assert matrices["composite_centers"][i, j] == len(chakras_from_channel_mask(composite))
+        assert list(matrices["circuitry"][i, j]) == [circuitry[g] for g in CIRCUIT_GROUPS]
+
+def test_dyad_matrix_endpoint(monkeypatch):
+    monkeypatch.setenv("HD_CHART_WORKERS", "0")
+    participants = {
+        "p1": {"place": "London", "year": 1980, "month": 1, "day": 1, "hour": 12, "minute": 0, "latitude": 51.5074, "longitude": -0.1278},
+        "p2": {"place": "New York", "year": 1985, "month": 5, "day": 5, "hour": 10, "minute": 30, "latitude": 40.7128, "longitude": -74.0060},
+        "p3": {"place": "Tokyo", "year": 1990, "month": 10, "day": 10, "hour": 15, "minute": 45, "latitude": 35.6895, "longitude": 139.6917},
+    }
+    response = client.post("/analyze/dyad-matrix", json={"participants": participants, "pairs": [["p1", "p3"]]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["ids"] == ["p1", "p2", "p3"]
+    assert len(body["new_channels"]) == 3 and len(body["circuitry"]["Tribal"][0]) == 3
+    assert [(d["id"], d["other_person"]) for d in body["dyads"]] == [("p1", "p3")]
+    assert len(body["dyads"][0]["new_channels"]) == body["new_channels"][0][2]
+    assert body["dyads"][0]["chakra_count"] == body["composite_centers"][0][2]
+    bad = client.post("/analyze/dyad-matrix", json={"participants": participants, "pairs": [["p1", "zed"]]})
+    assert bad.status_code == 400
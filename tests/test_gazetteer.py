@@ -0,0 +1,86 @@
+import os
+import pytest
+from humandesign.services import gazetteer as gazetteer_service
+from humandesign.services import geolocation
+from humandesign.services import geocoder
+from humandesign.services import geocode_cache
+from humandesign.services.gazetteer import Gazetteer, normalize_name
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "data", "geonames_sample.txt")
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer(SAMPLE)
+
+@pytest.fixture
+def shared_gazetteer(monkeypatch, tmp_path):
+    monkeypatch.setenv("HD_GAZETTEER_PATH", SAMPLE)
+    monkeypatch.setattr(geocode_cache, "_geocode_cache", geocode_cache.GeocodeCache(str(tmp_path / "geocode.sqlite")))
+    monkeypatch.setattr(geocoder, "_geocoder", geocoder.AsyncGeocoder(rate=0))
+    monkeypatch.setattr(gazetteer_service, "_gazetteer_loaded", False)
+    yield gazetteer_service.get_gazetteer()
+    gazetteer_service._gazetteer_loaded = False
+
+def test_normalize_name():
+    assert normalize_name("Zürich") == "zurich"
+    assert normalize_name("  St. Louis ") == "st louis"
+    assert normalize_name("İstanbul") == "istanbul"
+    assert normalize_name("São-Paulo") == "sao paulo"
+
+def test_exact_and_alternate_names(gazetteer):
+    assert len(gazetteer) == 20
+    assert gazetteer.lookup("Istanbul, Turkey").latitude == pytest.approx(41.01384)
+    assert gazetteer.lookup("Kirikkale, Turkey").name == "Kırıkkale"
+    assert gazetteer.lookup("Kırıkkale").name == "Kırıkkale"
+    assert gazetteer.lookup("Wien").name == "Vienna"
+    assert gazetteer.lookup("New York, USA").name == "New York City"
+    assert gazetteer.lookup("zurich").match == "exact"
+
+def test_population_ranked_disambiguation(gazetteer):
+    assert gazetteer.lookup("London").country_code == "GB"
+    assert gazetteer.lookup("London, Canada").country_code == "CA"
+    assert gazetteer.lookup("London, CA").country_code == "CA"
+    assert gazetteer.lookup("Paris").country_code == "FR"
+    assert gazetteer.lookup("Paris, TX").admin1 == "TX"
+    assert gazetteer.lookup("Paris, TN, United States").admin1 == "TN"
+    assert [p.admin1 for p in gazetteer.search("Springfield, USA")] == ["MO", "MA", "IL"]
+
+def test_admin1_names_and_unmatched_qualifiers(gazetteer):
+    assert gazetteer.lookup("Paris, Texas").admin1 == "TX"
+    match = gazetteer.lookup("Springfield, Illinois, USA")
+    assert match.admin1 == "IL" and match.match == "exact"
+    assert gazetteer.lookup("San Francisco, California").country_code == "US"
+    #known state/country without a matching candidate: not in the gazetteer (Nominatim fallback)
+    assert gazetteer.lookup("Sydney, Nova Scotia, Canada") is None
+    assert gazetteer.lookup("Paris, Ontario") is None
+    assert gazetteer.lookup("Berlin, Japan") is None
+    #unknown qualifiers are ignored
+    assert gazetteer.lookup("Berlin, Mitte, Germany").name == "Berlin"
+
+def test_prefix_and_fuzzy(gazetteer):
+    match = gazetteer.lookup("San Fran")
+    assert match.name == "San Francisco" and match.match == "prefix"
+    match = gazetteer.lookup("Berlinn, Germany")
+    assert match.name == "Berlin" and match.match == "fuzzy"
+    assert gazetteer.lookup("Sydny").name == "Sydney"
+    assert gazetteer.lookup("Qwertzuiop") is None
+    assert gazetteer.lookup(" , ") is None
+
+def test_geolocation_uses_gazetteer(shared_gazetteer, monkeypatch):
+    def offline(*args, **kwargs):
+        raise AssertionError("Nominatim must not be called for gazetteer places")
+    monkeypatch.setattr(geolocation.geolocator, "geocode", offline)
+    assert geolocation.get_latitude_longitude("Berlin, Germany") == pytest.approx((52.52437, 13.41053))
+    assert geolocation.get_latitude_longitude("Europe/Berlin") == (0.0, 0.0)
+    assert geolocation.batch_geocode(["Tokio"])[0].latitude == pytest.approx(35.6895)
+
+def test_geolocation_fallback(shared_gazetteer, monkeypatch):
+    class Location:
+        latitude, longitude, address = 1.5, 2.5, None
+    calls = []
+    monkeypatch.setattr(geolocation.geolocator, "geocode", lambda place, **kwargs: calls.append(place) or Location())
+    assert geolocation.get_latitude_longitude("Qwertzuiop") == (1.5, 2.5)
+    assert calls == ["Qwertzuiop"]
+    monkeypatch.setenv("HD_GEOCODER_FALLBACK", "0")
+    assert geolocation.get_latitude_longitude("Asdfghjkl") == (None, None)
+    assert calls == ["Qwertzuiop"]
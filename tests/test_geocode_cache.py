@@ -0,0 +1,126 @@
+import pytest
+from fastapi.testclient import TestClient
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.services import gazetteer as gazetteer_service
+from humandesign.services import geocoder
+from humandesign.services import geocode_cache, geolocation
+from humandesign.services.geocode_cache import GeocodeCache, place_key
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+class FakeLocation:
+    def __init__(self, latitude, longitude, address):
+        self.latitude, self.longitude, self.address = latitude, longitude, address
+
+class FakeGeolocator:
+    ''' Nominatim stand-in counting its calls '''
+    def __init__(self, places, fail=False):
+        self.places = places
+        self.fail = fail
+        self.calls = []
+
+    def geocode(self, place, **kwargs):
+        self.calls.append(place)
+        if self.fail:
+            raise TimeoutError("Nominatim timeout")
+        return self.places.get(place)
+
+    def reverse(self, coordinates, **kwargs):
+        self.calls.append(coordinates)
+        return FakeLocation(*coordinates, "Unter den Linden, Berlin")
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = GeocodeCache(str(tmp_path / "geocode.sqlite"), maxsize=2)
+    monkeypatch.setattr(geocode_cache, "_geocode_cache", cache)
+    monkeypatch.setattr(geocoder, "_geocoder", geocoder.AsyncGeocoder(rate=0))
+    #Nominatim only, no gazetteer
+    monkeypatch.setattr(gazetteer_service, "_gazetteer", None)
+    monkeypatch.setattr(gazetteer_service, "_gazetteer_loaded", True)
+    return cache
+
+@pytest.fixture
+def nominatim(monkeypatch):
+    fake = FakeGeolocator({"Berlin, Germany": FakeLocation(52.52, 13.405, "Berlin, Deutschland")})
+    monkeypatch.setattr(geolocation, "geolocator", fake)
+    return fake
+
+def test_place_key():
+    assert place_key("Berlin, Germany") == place_key("  berlin ,GERMANY ") == "berlin germany"
+    assert place_key("Zürich") == "zurich"
+
+def test_two_tiers_and_persistence(cache, nominatim):
+    assert geolocation.get_latitude_longitude("Berlin, Germany") == (52.52, 13.405)
+    assert geolocation.get_latitude_longitude("berlin,  germany") == (52.52, 13.405)
+    assert nominatim.calls == ["Berlin, Germany"]
+    location = geolocation.geocode_place("Berlin, Germany")
+    assert location.timezone == "Europe/Berlin" and location.address == "Berlin, Deutschland"
+
+    reloaded = GeocodeCache(cache.db_path)
+    entry = reloaded.get(place_key("Berlin, Germany"))
+    assert entry.found and (entry.latitude, entry.timezone) == (52.52, "Europe/Berlin")
+    assert reloaded.stats()["db_hits"] == 1 and reloaded.get("berlin germany") is entry
+
+def test_cached_timezone_is_used(cache, nominatim, monkeypatch):
+    cache.put(place_key("Somewhere"), 10.0, 20.0, "America/Chicago")
+    zones = []
+    class FakeTimezoneFinder:
+        def timezone_at(self, lat, lng):
+            zones.append((lat, lng))
+            return "Asia/Tokyo"
+    monkeypatch.setattr(geolocation, "tf", FakeTimezoneFinder())
+    assert geolocation.get_latitude_longitude_zone("Somewhere") == (10.0, 20.0, "America/Chicago")
+    assert zones == [] and nominatim.calls == []
+    #TimezoneFinder only for coordinates given by the caller
+    assert geolocation.get_latitude_longitude_zone("Somewhere", 1.0, 2.0) == (1.0, 2.0, "Asia/Tokyo")
+    assert geolocation.get_latitude_longitude_zone("Europe/Berlin") == (0.0, 0.0, "Europe/Berlin")
+    assert geolocation.get_latitude_longitude_zone("Atlantis") == (None, None, None)
+    assert zones == [(1.0, 2.0)]
+
+def test_lru_eviction_falls_back_to_sqlite(cache):
+    for key in ("a", "b", "c"):
+        cache.put(key, 1.0, 2.0)
+    assert cache.stats()["memory_size"] == 2
+    assert cache.get("a").found
+    stats = cache.stats()
+    assert stats["db_hits"] == 1 and stats["db_size"] == 3
+
+def test_negative_caching(cache, nominatim):
+    assert geolocation.get_latitude_longitude("Atlantis") == (None, None)
+    assert geolocation.get_latitude_longitude("Atlantis") == (None, None)
+    assert nominatim.calls == ["Atlantis"]
+    assert cache.stats()["negative_hits"] == 1
+
+def test_transient_errors_are_not_cached(cache, monkeypatch):
+    failing = FakeGeolocator({}, fail=True)
+    monkeypatch.setattr(geolocation, "geolocator", failing)
+    assert geolocation.get_latitude_longitude("Berlin, Germany") == (None, None)
+    assert geolocation.get_latitude_longitude("Berlin, Germany") == (None, None)
+    assert len(failing.calls) == 2
+    assert cache.stats()["db_size"] == 0
+
+def test_ttl(cache, nominatim):
+    cache.ttl = cache.negative_ttl = -1
+    geolocation.get_latitude_longitude("Berlin, Germany")
+    geolocation.get_latitude_longitude("Berlin, Germany")
+    assert len(nominatim.calls) == 2 and cache.stats()["expired"] == 1
+    assert cache.purge_expired() == 1 and cache.stats()["db_size"] == 0
+
+def test_reverse_and_batch(cache, nominatim):
+    assert geolocation.get_address(52.51632, 13.37772) == "Unter den Linden, Berlin"
+    assert geolocation.get_address(52.516321, 13.377719) == "Unter den Linden, Berlin"
+    assert len(nominatim.calls) == 1
+    locations = geolocation.batch_geocode(["Berlin, Germany", "Atlantis", "Berlin, Germany"])
+    assert [l.latitude for l in locations] == [52.52, None, 52.52]
+    assert len(nominatim.calls) == 3
+
+def test_stats_endpoint(cache, nominatim):
+    geolocation.get_latitude_longitude("Berlin, Germany")
+    geolocation.get_latitude_longitude("Berlin, Germany")
+    response = client.get("/geocode/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cache"]["memory_hits"] == 1 and data["cache"]["misses"] == 1
+    assert data["cache"]["hit_rate"] == 0.5 and data["gazetteer_places"] == 0
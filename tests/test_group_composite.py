@@ -0,0 +1,87 @@
+from unittest.mock import patch
+from humandesign import features as hd
+from humandesign.features import group
+from humandesign.features.group import GroupCompositeEngine, PersonChart
+
+PERSONS = {
+    "alice": (1985, 6, 12, 14, 30, 0, 2),
+    "bob": (1990, 1, 3, 8, 15, 0, 1),
+    "carol": (1978, 11, 23, 22, 5, 0, -5),
+    "dave": (2001, 4, 30, 5, 45, 0, 9),
+}
+
+def test_each_chart_is_calculated_once():
+    with patch.object(group, "calc_single_hd_features", wraps=group.calc_single_hd_features) as calc:
+        df = hd.get_composite_combinations(PERSONS)
+    assert calc.call_count == len(PERSONS)
+    assert len(df) == 6
+    assert list(df.columns) == ["id", "other_person", "new_chakra", "chakra_count", "new_channels",
+                                "new_ch_meaning", "duplicated_channels", "duplicated_ch_meaning"]
+
+def test_pair_matches_composite_chakras_channels():
+    engine = GroupCompositeEngine(PERSONS)
+    for identity, other_person, pair in engine.combinations():
+        new_channels, duplicated_channels, new_chakras, composite_chakras = \
+            hd.composite_chakras_channels(PERSONS, identity, other_person)
+        #legacy row-wise mapper may miss channels sharing a gate, mask result is a superset
+        canonical = lambda channels: {tuple(sorted(ch)) for ch in channels}
+        legacy_new = zip(new_channels["gate"], new_channels["ch_gate"])
+        legacy_duplicated = zip(duplicated_channels["gate"], duplicated_channels["ch_gate"])
+        assert canonical(legacy_new) <= canonical(pair["new_channels"])
+        assert canonical(legacy_duplicated) <= canonical(pair["duplicated_channels"])
+        assert composite_chakras <= pair["composite_chakras"]
+
+def test_person_chart_masks():
+    chart = PersonChart.from_timestamp("alice", PERSONS["alice"])
+    channels = hd.get_channels_and_active_chakras(chart.hd_data["date_to_gate_dict"])
+    found = {tuple(sorted(ch)) for ch in group.channels_from_mask(chart.channel_mask)}
+    active = channels[0]
+    assert {tuple(sorted(ch)) for ch in zip(active["gate"], active["ch_gate"])} <= found
+
+def test_records_are_plain_and_match_dataframe_adapter():
+    records = hd.get_composite_records(PERSONS)
+    df = hd.get_composite_combinations(PERSONS)
+    assert isinstance(records, list) and all(isinstance(r, dict) for r in records)
+    assert df.to_dict(orient="records") == records
+
+def test_composite_pair_matches_engine():
+    pair = hd.composite_pair(PERSONS, "alice", "bob")
+    expected = GroupCompositeEngine(PERSONS).pair("alice", "bob")
+    assert [(ch["gate"], ch["ch_gate"]) for ch in pair["new_channels"]] == expected["new_channels"]
+    assert all(isinstance(ch["meaning"], list) for ch in pair["duplicated_channels"])
+    assert pair["composite_chakras"] == expected["composite_chakras"]
+
+def test_group_composite_single_member_matches_chart():
+    for name, timestamp in PERSONS.items():
+        chart = PersonChart.from_timestamp(name, timestamp)
+        group_chart = hd.GroupComposite({name: chart})
+        assert group_chart.chakras == chart.chakras
+        assert group_chart.typ == chart.hd_data["typ"]
+        assert group_chart.auth == chart.hd_data["auth"]
+        assert group_chart.definition == chart.hd_data["definition"]
+        assert group_chart.new_channels == []
+
+def test_group_composite_incremental_updates():
+    import random
+    from humandesign.features.mechanics import gate_mask, channel_mask, chakras_from_channel_mask
+    rng = random.Random(3)
+    members = {f"m{i}": rng.sample(range(1, 65), 14) for i in range(10)}
+    group_chart = hd.GroupComposite()
+    for _ in range(200):
+        name = rng.choice(list(members))
+        if name in group_chart:
+            group_chart.remove(name)
+        else:
+            group_chart.add(name, members[name])
+        gates = set().union(*(members[m] for m in group_chart.members))
+        expected = channel_mask(gate_mask(gates))
+        assert group_chart.gates == gates
+        assert group_chart.channel_mask == expected
+        assert group_chart.chakras == chakras_from_channel_mask(expected)
+        solo = 0
+        for m in group_chart.members:
+            solo |= channel_mask(gate_mask(members[m]))
+        new_ids = {group.CHANNEL_LIST.index(ch) for ch in group_chart.new_channels}
+        assert new_ids == {ch_id for ch_id in range(len(group.CHANNEL_LIST)) if (expected & ~solo) >> ch_id & 1}
+        for gate in gates:
+            assert group_chart.owner_counts[gate] == len(group_chart.owners(gate))
@@ -0,0 +1,108 @@
+import json
+import random
+from fastapi.testclient import TestClient
+from humandesign import features as hd
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.features.mechanics import CHANNEL_LIST
+from humandesign.services import roster as roster_service
+from humandesign.services.roster import RosterStore
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+TRANSIT_GATES = [54, 53, 16, 25, 46, 10, 37, 56, 35, 63, 23, 36, 60]
+TRANSIT_DATE = {"transit_year": 2025, "transit_month": 1, "transit_day": 10}
+
+def scalar_channels(gates):
+    ''' channels of a gate set (scalar reference) '''
+    gates = set(gates)
+    return {tuple(ch) for ch in CHANNEL_LIST if set(ch) <= gates}
+
+def as_json(data):
+    return json.loads(json.dumps(data))
+
+def test_member_overlay_matches_scalar_reference():
+    rng = random.Random(11)
+    members = {f"m{i}": rng.sample(range(1, 65), 12) for i in range(15)}
+    overlay = hd.transit_overlay(members, TRANSIT_GATES)
+    for name, gates in members.items():
+        expected = scalar_channels(gates + TRANSIT_GATES) - scalar_channels(gates)
+        assert {tuple(ch) for ch in overlay["members"][name]["new_channels"]} == expected
+
+def test_group_before_after():
+    members = {"a": [1, 2, 3], "b": [8, 14, 15]}
+    overlay = hd.transit_overlay(members, [60, 46, 29, 7])
+    group = overlay["group"]
+    assert group["before"]["members"] == ["a", "b"]
+    assert group["after"]["members"] == ["a", "b", "transit"]
+    #3-60 needs the transit, 8-1 is already formed across the group
+    assert (3, 60) in group["new_channels"]
+    assert (8, 1) in group["before"]["channels"] and (8, 1) not in group["new_channels"]
+    assert set(group["new_centers"]).isdisjoint(group["before"]["chakras"])
+    penta = overlay["penta"]
+    assert penta["after"] == hd.penta_scores(hd.penta_mask([1, 2, 3, 8, 14, 15, 60, 46, 29, 7]))
+    assert [ch for ch in penta["activated_channels"] if ch in penta["before"]["active_channels"]] == []
+
+def test_transit_does_not_change_members():
+    members = {"a": [1, 2, 3]}
+    overlay = hd.transit_overlay(members, [])
+    assert overlay["members"]["a"]["new_channels"] == []
+    assert overlay["members"]["a"]["new_centers"] == []
+    assert overlay["group"]["new_channels"] == [] and overlay["penta"]["activated_channels"] == []
+
+def test_transit_name_does_not_replace_member():
+    members = {"transit": [1, 2, 3], "transit_2": [8, 14]}
+    overlay = hd.transit_overlay(members, [60])
+    assert overlay["transit_name"] == "transit_3"
+    assert overlay["group"]["after"]["members"] == ["transit", "transit_2", "transit_3"]
+    assert (3, 60) in overlay["group"]["new_channels"]
+
+def test_endpoint_roster_activations():
+    body = {"roster": {"b": {"gate": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]}, "c": {"gate": [15, 46, 29, 14]}},
+            **TRANSIT_DATE}
+    response = client.post("/transits/group", json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["transit_date_utc"] == "2025-01-10T12:00:00Z"
+    assert [p["gate"] for p in data["planetary_transits"]] == TRANSIT_GATES
+    expected = hd.transit_overlay({"b": body["roster"]["b"]["gate"], "c": body["roster"]["c"]["gate"]},
+                                  TRANSIT_GATES)
+    assert data["members"] == as_json(expected["members"])
+    assert data["group"]["new_channels"] == as_json(expected["group"]["new_channels"])
+
+def test_endpoint_stored_roster_members(tmp_path, monkeypatch):
+    store = RosterStore(str(tmp_path / "roster.sqlite"))
+    store.add_members({"alice": {"gate": [2, 29, 1], "label": ["prs", "des", "des"]}})
+    monkeypatch.setattr(roster_service, "_roster_store", store)
+    response = client.post("/transits/group", json={"member_ids": ["alice"], **TRANSIT_DATE})
+    assert response.status_code == 200
+    expected = hd.transit_overlay({"alice": [1, 2, 29]}, TRANSIT_GATES)
+    assert response.json()["members"]["alice"] == as_json(expected["members"]["alice"])
+    response = client.post("/transits/group", json={"member_ids": ["nobody"], **TRANSIT_DATE})
+    assert response.status_code == 404
+
+def test_endpoint_requires_members():
+    assert client.post("/transits/group", json=TRANSIT_DATE).status_code == 400
+
+def test_endpoint_member_named_transit():
+    body = {"roster": {"transit": {"gate": [1, 2, 3]}}, "penta_detail": True, **TRANSIT_DATE}
+    response = client.post("/transits/group", json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["transit_name"] == "transit_2"
+    assert data["group"]["after"]["members"] == ["transit", "transit_2"]
+
+def test_endpoint_rejects_duplicate_names(tmp_path, monkeypatch):
+    store = RosterStore(str(tmp_path / "roster.sqlite"))
+    store.add_members({"alice": {"gate": [2, 29, 1], "label": ["prs", "des", "des"]}})
+    monkeypatch.setattr(roster_service, "_roster_store", store)
+    body = {"roster": {"alice": {"gate": [1, 2, 3]}}, "member_ids": ["alice"], **TRANSIT_DATE}
+    response = client.post("/transits/group", json=body)
+    assert response.status_code == 400
+    assert "alice" in response.json()["detail"]
+
+def test_endpoint_rejects_gates_outside_range():
+    for gates in ([1, 70], [1, -3]):
+        body = {"roster": {"a": {"gate": gates}, "b": {"gate": [2, 14]}}, **TRANSIT_DATE}
+        assert client.post("/transits/group", json=body).status_code == 422
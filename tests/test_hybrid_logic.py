@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
+from concurrent.futures.process import BrokenProcessPool
 from humandesign.services.composite import process_hybrid_analysis
 from humandesign.schemas.input_models import PersonInput
 
@@ -11,10 +12,15 @@ def sample_participants():
         "p3": PersonInput(place="Tokyo", year=1990, month=10, day=10, hour=15, minute=45)
     }
 
-@patch("humandesign.services.composite.process_person_data")
-@patch("humandesign.features.get_composite_combinations")
+@patch("humandesign.services.composite.geocode_places")
+@patch("humandesign.services.composite.get_chart_pool", return_value=None)
+@patch("humandesign.services.composite.resolve_person_timestamp")
+@patch("humandesign.services.composite.calc_person_chart")
+@patch("humandesign.services.composite.build_person_details")
+@patch("humandesign.features.get_composite_records")
 @patch("humandesign.services.composite.get_penta_dynamics")
-def test_process_hybrid_analysis_orchestration(mock_penta, mock_combinations, mock_process_person, sample_participants):
+def test_process_hybrid_analysis_orchestration(mock_penta, mock_combinations, mock_details, mock_chart,
+                                               mock_resolve, mock_pool, mock_geocode, sample_participants):
     """
     Test that process_hybrid_analysis correctly orchestrates:
     1. Processing person data
@@ -22,10 +28,13 @@ def test_process_hybrid_analysis_orchestration(mock_penta, mock_combinations, mo
     3. Calculating Dyad Matrix
     """
     # Mock setups
-    mock_process_person.side_effect = lambda name, data: (
-        (2000, 1, 1, 12, 0, 0, 0), # Mock timestamp
+    mock_resolve.side_effect = lambda name, data: (
+        (2000, 1, 1, 12, 0, 0, 0), "Etc/UTC", (2000, 1, 1, 12, 0, 0) # Mock timestamp, zone, birth time
+    )
+    mock_details.side_effect = lambda name, place, zone, birth_time, timestamp, hd_data: (
         {"name": name, "energy_type": "Generator", "defined_centers": [], "profile": "1/3"} # Mock details
     )
+    mock_chart.return_value = {"definition": 1, "date_to_gate_dict": {"gate": [1, 2], "planets": ["Sun", "Earth"]}} # Mock chart
     
     # Mock Penta response
     mock_penta.return_value = {
@@ -34,9 +43,8 @@ def test_process_hybrid_analysis_orchestration(mock_penta, mock_combinations, mo
         "is_functional": True
     }
     
-    # Mock Pandas DataFrame for combinations
-    mock_combinations.return_value = MagicMock()
-    mock_combinations.return_value.to_dict.return_value = [
+    # Mock plain composite records
+    mock_combinations.return_value = [
         {"id": "p1", "other_person": "p2", "new_chakra": [], "chakra_count": 5},
         {"id": "p1", "other_person": "p3", "new_chakra": [], "chakra_count": 6},
         {"id": "p2", "other_person": "p3", "new_chakra": [], "chakra_count": 7},
@@ -53,7 +61,8 @@ def test_process_hybrid_analysis_orchestration(mock_penta, mock_combinations, mo
     assert "dyad_matrix" in result
     
     # Verify logic flow
-    assert mock_process_person.call_count == 3
+    assert mock_resolve.call_count == 3
+    assert mock_chart.call_count == 3
     assert mock_penta.called
     assert mock_combinations.called
     
@@ -71,3 +80,49 @@ def test_process_hybrid_analysis_insufficient_participants(mock_process_person):
     with pytest.raises(ValueError) as exc:
         process_hybrid_analysis(participants, "family", "all")
     assert "At least 2 participants" in str(exc.value)
+
+def test_process_hybrid_analysis_calculates_each_chart_once(monkeypatch):
+    """Every chart is calculated once and reused for details, penta and dyads."""
+    import humandesign.features as hd
+    monkeypatch.setenv("HD_CHART_WORKERS", "0")
+    participants = {
+        "p1": PersonInput(place="London", year=1980, month=1, day=1, hour=12, minute=0, latitude=51.5074, longitude=-0.1278),
+        "p2": PersonInput(place="New York", year=1985, month=5, day=5, hour=10, minute=30, latitude=40.7128, longitude=-74.0060),
+        "p3": PersonInput(place="Tokyo", year=1990, month=10, day=10, hour=15, minute=45, latitude=35.6895, longitude=139.6917)
+    }
+    with patch.object(hd, "calc_single_hd_features", wraps=hd.calc_single_hd_features) as calc:
+        result = process_hybrid_analysis(participants, "family", "all")
+    assert calc.call_count == 3
+    assert len(result["dyad_matrix"]) == 3
+
+class RecordingPool:
+    """ process pool stand-in recording submits and results """
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.log = []
+
+    def submit(self, fn, timestamp):
+        self.log.append("submit")
+        pool = self
+        class Future:
+            def result(self):
+                pool.log.append("result")
+                if pool.broken:
+                    raise BrokenProcessPool()
+                return fn(timestamp)
+        return Future()
+
+@pytest.mark.parametrize("broken", [False, True])
+def test_prepare_hybrid_participants_submits_all_charts_first(broken, monkeypatch):
+    """All charts are in the pool before the first result is awaited, a broken pool falls back in process."""
+    from humandesign.services import composite
+    pool = RecordingPool(broken)
+    monkeypatch.setattr(composite, "get_chart_pool", lambda: pool)
+    participants = {
+        "p1": PersonInput(place="London", year=1980, month=1, day=1, hour=12, minute=0, latitude=51.5074, longitude=-0.1278),
+        "p2": PersonInput(place="New York", year=1985, month=5, day=5, hour=10, minute=30, latitude=40.7128, longitude=-74.0060),
+        "p3": PersonInput(place="Tokyo", year=1990, month=10, day=10, hour=15, minute=45, latitude=35.6895, longitude=139.6917)
+    }
+    parties = composite.prepare_hybrid_participants(participants)
+    assert pool.log == ["submit"] * 3 + ["result"] * 3
+    assert list(parties) == ["p1", "p2", "p3"]
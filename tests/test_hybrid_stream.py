@@ -0,0 +1,74 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from fastapi.testclient import TestClient
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.schemas.input_models import PersonInput
+from humandesign.services.composite import (process_hybrid_analysis, prepare_hybrid_participants,
+                                            iter_hybrid_analysis, HEAVY_SYNERGY_FIELDS)
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+PARTICIPANTS = {
+    "p1": {"place": "London", "year": 1980, "month": 1, "day": 1, "hour": 12, "minute": 0, "latitude": 51.5074, "longitude": -0.1278},
+    "p2": {"place": "New York", "year": 1985, "month": 5, "day": 5, "hour": 10, "minute": 30, "latitude": 40.7128, "longitude": -74.0060},
+    "p3": {"place": "Tokyo", "year": 1990, "month": 10, "day": 10, "hour": 15, "minute": 45, "latitude": 35.6895, "longitude": 139.6917},
+    "p4": {"place": "Berlin", "year": 1975, "month": 3, "day": 21, "hour": 6, "minute": 5, "latitude": 52.52, "longitude": 13.405},
+}
+
+@pytest.fixture
+def parties(monkeypatch):
+    monkeypatch.setenv("HD_CHART_WORKERS", "0")
+    return prepare_hybrid_participants({k: PersonInput(**v) for k, v in PARTICIPANTS.items()})
+
+def as_json(data):
+    return json.loads(json.dumps(data))
+
+class BrokenPool:
+    _max_workers = 2
+    def submit(self, *args):
+        raise BrokenProcessPool("worker died")
+
+def test_stream_matches_batch_analysis(parties, monkeypatch):
+    monkeypatch.setenv("HD_CHART_WORKERS", "0")
+    batch = process_hybrid_analysis({k: PersonInput(**v) for k, v in PARTICIPANTS.items()}, "family", "all")
+    records = list(iter_hybrid_analysis(parties, chunk_size=2))
+    assert [r["type"] for r in records] == ["meta"] + ["dyad"] * 6 + ["penta"]
+    assert as_json(records[0]["participants"]) == as_json(batch["participants"])
+    assert as_json(records[-1]["penta_dynamics"]) == as_json(batch["penta_dynamics"])
+    for record, expected in zip(records[1:-1], batch["dyad_matrix"]):
+        #penta summary is streamed once at the end instead of per dyad
+        expected["synergy"].pop("penta_details")
+        assert as_json(record["dyad"]) == as_json(expected)
+
+def test_stream_in_worker_processes(parties):
+    expected = [r["dyad"] for r in iter_hybrid_analysis(parties) if r["type"] == "dyad"]
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        streamed = [r["dyad"] for r in iter_hybrid_analysis(parties, pool=pool, chunk_size=1, max_pending=2)
+                    if r["type"] == "dyad"]
+    assert as_json(streamed) == as_json(expected)
+    fallback = [r["dyad"] for r in iter_hybrid_analysis(parties, pool=BrokenPool(), chunk_size=1)
+                if r["type"] == "dyad"]
+    assert as_json(fallback) == as_json(expected)
+
+def test_partial_verbosity_skips_heavy_fields(parties):
+    records = list(iter_hybrid_analysis(parties, verbosity="partial"))
+    assert all("activations" not in details for details in records[0]["participants"].values())
+    for record in records[1:-1]:
+        assert not any(field in record["dyad"]["synergy"] for field in HEAVY_SYNERGY_FIELDS)
+        assert all(detail["activations"] == [] for detail in record["dyad"]["maia_details"])
+
+def test_stream_endpoint(monkeypatch):
+    monkeypatch.setenv("HD_CHART_WORKERS", "0")
+    response = client.post("/analyze/maia-penta/stream",
+                           json={"participants": PARTICIPANTS, "verbosity": "partial"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0]["type"] == "meta" and lines[-1]["type"] == "penta"
+    assert len(lines) == 8
+    single = {"p1": PARTICIPANTS["p1"]}
+    assert client.post("/analyze/maia-penta/stream", json={"participants": single}).status_code == 400
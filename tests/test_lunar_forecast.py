@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from humandesign import features as hd
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.features import lunar
+from humandesign.features.crossings import iter_line_ingresses, planet_longitude, wheel_line, gate_line
+from humandesign.features.mechanics import CHANNEL_LIST
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+#28 days across a year border (two table files)
+JD_START = hd.timestamp_to_jd((2024, 12, 20, 0, 0, 0, 0))
+JD_END = JD_START + 28
+NATAL_GATES = [1, 2, 3, 10, 20, 34, 57, 13]
+
+@pytest.fixture(scope="module", autouse=True)
+def table_dir(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("lunar"))
+    default = lunar.DEFAULT_TABLE_DIR
+    lunar.DEFAULT_TABLE_DIR = path
+    lunar.lunar_ingress_year.cache_clear()
+    yield path
+    lunar.DEFAULT_TABLE_DIR = default
+    lunar.lunar_ingress_year.cache_clear()
+
+def test_table_matches_ingress_solver():
+    index, jds, indices = hd.lunar_ingresses(JD_START, JD_START + 10)
+    reference = list(iter_line_ingresses("Moon", JD_START, JD_START + 10))
+    assert len(jds) == len(reference)
+    assert index == reference[0][2]
+    assert [int(i) for i in indices] == [event[3] for event in reference]
+    assert np.max(np.abs(jds - [event[0] for event in reference])) * 86400 < 2
+
+def test_table_is_stored_and_reloaded(table_dir):
+    jds, indices = lunar.lunar_ingress_year(2025)
+    lunar.lunar_ingress_year.cache_clear()
+    reloaded = lunar.lunar_ingress_year(2025)
+    assert np.array_equal(jds, reloaded[0]) and np.array_equal(indices, reloaded[1])
+    #one ingress per line: consecutive indices
+    assert np.all((np.diff(indices.astype(int)) - 1) % lunar.LINES_PER_WHEEL == 0)
+    with pytest.raises(ValueError):
+        lunar.lunar_ingress_year(2101)
+
+def test_moon_positions_match_ephemeris():
+    jds = JD_START + np.arange(0, 28, 0.37)
+    gates, lines = hd.moon_positions(jds)
+    expected = [gate_line(wheel_line(planet_longitude(jd, "Moon"))) for jd in jds]
+    assert list(zip(gates.tolist(), lines.tolist())) == expected
+
+def test_forecast_periods():
+    forecast = hd.lunar_forecast(NATAL_GATES, JD_START, JD_END, hourly=True)
+    periods = forecast["periods"]
+    assert periods[0]["start"] == hd.jd_to_iso(JD_START) and periods[-1]["end"] == hd.jd_to_iso(JD_END)
+    assert all(a["end"] == b["start"] and a["gate"] != b["gate"] for a, b in zip(periods, periods[1:]))
+    #every gate of the wheel once per lunar cycle (27.3 days)
+    assert set(p["gate"] for p in periods) == set(range(1, 65))
+    assert len(forecast["hourly"]) == 28 * 24 + 1
+
+    natal = set(NATAL_GATES)
+    for period in periods:
+        expected = {ch for ch in CHANNEL_LIST if period["gate"] in ch and set(ch) - {period["gate"]} <= natal
+                    and not set(ch) <= natal}
+        assert set(period["new_channels"]) == expected
+        assert period["hanging_gates"] == sorted(g for ch in expected for g in ch if g != period["gate"])
+    #natal gate 3 is hanging, the Moon in gate 60 (open root) completes 3-60 and defines the root
+    gate_60 = next(p for p in periods if p["gate"] == 60)
+    assert gate_60["hanging_gates"] == [3] and gate_60["new_centers"] == ["RT"]
+    assert gate_60["open_center"]
+    assert forecast["hanging_gates"][3] > 0
+    assert set(forecast["open_centers"]) == {"HD", "AA", "HT", "SP", "RT"}
+
+def test_line_resolution():
+    forecast = hd.lunar_forecast(NATAL_GATES, JD_START, JD_START + 1, resolution="line")
+    assert all("line" in p for p in forecast["periods"])
+    assert 14 <= len(forecast["periods"]) <= 17
+    with pytest.raises(ValueError):
+        hd.lunar_forecast(NATAL_GATES, JD_START, JD_END, resolution="hour")
+
+def test_lunar_endpoint():
+    params = {"place": "Europe/Berlin", "latitude": 52.52, "longitude": 13.4, "start_year": 2024,
+              "start_month": 12, "start_day": 20, "days": 28, "hourly": True}
+    response = client.get("/transits/lunar", params=params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["days"] == 28 and len(data["hourly"]) == 28 * 24 + 1
+    #local midnight in Berlin
+    assert data["start"] == "2024-12-19T23:00:00Z"
+    assert set(data["open_centers"]).isdisjoint(data["defined_centers"])
+    assert client.get("/transits/lunar", params={**params, "resolution": "hour"}).status_code == 400
+    assert client.get("/transits/lunar", params={**params, "start_year": 2300}).status_code == 400
+
+def test_concurrent_table_writers(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    path = lunar._table_path(2030, str(tmp_path))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda _: lunar._store_year(2030, path), range(2)))
+    #one complete table, no temporary files left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["moon_ingresses_2030.npz"]
+    with np.load(path) as table:
+        assert np.array_equal(table["jd"], results[0][0])
+        assert np.array_equal(table["index"], results[0][1])
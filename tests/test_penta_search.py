@@ -0,0 +1,96 @@
+import itertools
+import random
+import pytest
+from fastapi.testclient import TestClient
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.features.core import get_penta
+from humandesign.features.penta import find_best_pentas, score_penta_groups, penta_mask, _rank_key
+from humandesign.hd_constants import PENTA_GATES
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+def brute_force_keys(roster, top_k, min_size=3, max_size=5):
+    keys = []
+    for size in range(min_size, max_size + 1):
+        for group in itertools.combinations(roster, size):
+            mask = 0
+            for name in group:
+                mask |= penta_mask(roster[name])
+            keys.append(_rank_key(mask, size))
+    return sorted(keys, reverse=True)[:top_k]
+
+def result_keys(groups, roster):
+    return [_rank_key(penta_mask([g for m in group["members"] for g in roster[m]]), group["group_size"])
+            for group in groups]
+
+@pytest.mark.parametrize("seed,gates_per_person", [(1, 1), (2, 2), (3, 4)])
+def test_matches_brute_force(seed, gates_per_person):
+    rng = random.Random(seed)
+    roster = {f"p{i}": rng.sample(PENTA_GATES, gates_per_person) + [3, 60] for i in range(14)}
+    groups = find_best_pentas(roster, top_k=12)
+    assert result_keys(groups, roster) == brute_force_keys(roster, 12)
+    assert len({tuple(sorted(g["members"])) for g in groups}) == len(groups)
+
+def test_scores_match_get_penta():
+    rng = random.Random(7)
+    roster = {f"p{i}": rng.sample(PENTA_GATES, 3) for i in range(20)}
+    for group in find_best_pentas(roster, top_k=5):
+        metrics = get_penta({m: roster[m] for m in group["members"]})["analytical_metrics"]
+        assert group["stability_score"] == metrics["stability_score"]
+        assert group["vision_score"] == metrics["vision_score"]
+        assert group["action_score"] == metrics["action_score"]
+
+def test_full_penta_found_with_minimal_size():
+    roster = {"a": [1, 8, 15, 5], "b": [2, 14, 46, 29], "c": [31, 7, 33, 13], "d": [1], "e": [2, 8]}
+    best = find_best_pentas(roster, top_k=1)[0]
+    assert sorted(best["members"]) == ["a", "b", "c"]
+    assert (best["stability_score"], best["vision_score"], best["action_score"]) == (100, 100, 100)
+    assert len(best["active_channels"]) == 6
+
+def test_optimal_penta_endpoint():
+    payload = {"top_k": 2, "roster": {"a": {"gate": [1, 8, 15, 5]}, "b": {"gate": [2, 14]},
+                                      "c": {"gate": [46, 29]}, "d": {"gate": [31]}}}
+    response = client.post("/analyze/penta/optimal", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["candidates"] == 4
+    assert data["groups"][0]["members"] == ["a", "b", "c"]
+    assert data["groups"][0]["stability_score"] == 100
+
+    payload["min_size"], payload["max_size"] = 4, 3
+    assert client.post("/analyze/penta/optimal", json=payload).status_code == 400
+
+def test_activations_outside_gate_range_rejected():
+    for gates in ([1, 70], [1, -3], [0]):
+        payload = {"roster": {"a": {"gate": gates}, "b": {"gate": [2, 14]}}}
+        assert client.post("/analyze/penta/optimal", json=payload).status_code == 422
+
+def test_batch_scores_match_get_penta():
+    rng = random.Random(11)
+    roster = {f"p{i}": {"gate": rng.sample(PENTA_GATES, rng.randint(0, 5)) + [3],
+                        "line": [1] * 6, "label": ["prs"] * 6} for i in range(15)}
+    groups = [rng.sample(list(roster), rng.randint(1, 5)) for _ in range(200)]
+    for group, scores in zip(groups, score_penta_groups(roster, groups)):
+        full = get_penta({m: roster[m] for m in group})
+        metrics = full["analytical_metrics"]
+        assert scores["stability_score"] == metrics["stability_score"]
+        assert scores["vision_score"] == metrics["vision_score"]
+        assert scores["action_score"] == metrics["action_score"]
+        assert sorted(scores["bottlenecks"]) == sorted(metrics["bottlenecks"])
+        assert scores["urgent_needs"] == full["hiring_logic"]["urgent_needs"]
+
+def test_batch_endpoint_details_only_selected():
+    payload = {"roster": {"a": {"gate": [1, 8, 15, 5]}, "b": {"gate": [2, 14]}, "c": {"gate": [46, 29]}},
+               "groups": [["a", "b", "c"], ["a", "b"]], "detail": [1]}
+    response = client.post("/analyze/penta/batch", json=payload)
+    assert response.status_code == 200
+    groups = response.json()["groups"]
+    assert groups[0]["stability_score"] == 100 and "analysis" not in groups[0]
+    assert groups[0]["bottlenecks"] == ["a", "b", "c"]
+    assert "penta_anatomy" in groups[1]["analysis"]
+
+    payload["groups"] = [["a", "x"]]
+    payload["detail"] = []
+    assert client.post("/analyze/penta/batch", json=payload).status_code == 400
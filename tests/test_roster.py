@@ -0,0 +1,143 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.features.mechanics import CHANNEL_LIST
+from humandesign.services import roster as roster_service
+from humandesign.services.roster import RosterStore
+from humandesign.services.composite import classify_maia_connection
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+@pytest.fixture
+def store(tmp_path):
+    rng = random.Random(4)
+    store = RosterStore(str(tmp_path / "roster.sqlite"))
+    store.add_members({f"m{i}": {"gate": rng.sample(range(1, 65), 12), "label": ["prs"] * 6 + ["des"] * 6}
+                       for i in range(40)})
+    store.add_members({"alice": {"gate": [2, 29, 1], "label": ["prs", "des", "des"]},
+                       "bob": {"gate": [14, 46], "label": ["des", "prs"]}})
+    return store
+
+def test_persisted_and_reloaded(store):
+    reloaded = RosterStore(store.db_path)
+    assert len(reloaded) == len(store) == 42
+    assert reloaded.member_gates("alice") == {1, 2, 29}
+    assert store.remove_member("m3") and "m3" not in store
+    assert len(RosterStore(store.db_path)) == 41
+    assert store.member_gates("bob") == {14, 46}
+
+def test_gate_carriers(store):
+    total, members = store.gate_carriers(29)
+    expected = [m for m in store._ids if 29 in store.member_gates(m)]
+    assert total == len(expected) and [m["member_id"] for m in members] == expected
+    assert {"member_id": "alice", "polarity": "Design"} in members
+    assert store.gate_carriers(29, offset=1, limit=2)[1] == members[1:3]
+
+def test_channel_completers(store):
+    total, members = store.channel_completers("alice", "2-14")
+    expected = [m for m in store._ids if m != "alice" and 14 in store.member_gates(m)]
+    assert total == len(expected) and [m["member_id"] for m in members] == expected
+    for member in members:
+        other = store.member_gates(member["member_id"]) & {2, 14}
+        assert member["connection"] == classify_maia_connection({2}, other, (2, 14))
+    assert store.channel_completers("alice", "29-46")[1][0]["connection"] in ("Electromagnetic", "Compromise")
+    with pytest.raises(ValueError):
+        store.channel_completers("alice", "1-2")
+
+def test_em_partners_match_brute_force(store):
+    own = store.member_gates("alice")
+    expected = {}
+    for member in store._ids:
+        if member == "alice":
+            continue
+        other = store.member_gates(member)
+        channels = [ch for ch in CHANNEL_LIST if len(own & set(ch)) == 1 and set(ch) <= own | other
+                    and classify_maia_connection(own & set(ch), other & set(ch), ch) == "Electromagnetic"]
+        if channels:
+            expected[member] = len(channels)
+    partners = store.em_partners("alice", limit=5)
+    best = sorted(expected.items(), key=lambda item: (-item[1], item[0]))[:5]
+    assert [(p["member_id"], len(p["channels"])) for p in partners] == best
+
+def test_roster_endpoints(tmp_path, monkeypatch):
+    monkeypatch.setattr(roster_service, "_roster_store", RosterStore(str(tmp_path / "api.sqlite")))
+    assert client.put("/roster/members", json={"member_id": "alice", "activations": {"gate": [2, 29]}}).status_code == 200
+    assert client.put("/roster/members", json={"member_id": "bob", "activations": {"gate": [14, 46]}}).status_code == 200
+    response = client.get("/roster/members/alice/completers", params={"channel": "14-2"})
+    assert response.status_code == 200
+    assert response.json()["members"] == [{"member_id": "bob", "connection": "Electromagnetic", "gates": [14]}]
+    assert client.get("/roster/gates/46/carriers").json()["total"] == 1
+    assert client.get("/roster/members/alice/em-partners").json()["partners"][0]["member_id"] == "bob"
+    assert client.get("/roster/members/nobody/em-partners").status_code == 404
+    assert client.put("/roster/members", json={"member_id": "eve"}).status_code == 400
+    assert client.delete("/roster/members/bob").status_code == 200
+
+def test_invalid_gates_are_not_stored(store, monkeypatch):
+    for gates in ([1, 70], [1, -3], [0]):
+        with pytest.raises(ValueError):
+            store.add_members({"carol": {"gate": [5]}, "mallory": {"gate": gates}})
+    assert "carol" not in store and "mallory" not in store
+    reloaded = RosterStore(store.db_path)
+    assert len(reloaded) == 42 and "mallory" not in reloaded
+    #rejected by the request schema before reaching the store
+    monkeypatch.setattr(roster_service, "_roster_store", reloaded)
+    response = client.put("/roster/members", json={"member_id": "mallory", "activations": {"gate": [70]}})
+    assert response.status_code == 422
+    assert len(RosterStore(store.db_path)) == 42
+
+def reference_rank(store, subject, member):
+    '''scalar reference: mask composite + resonance helpers of services.composite'''
+    from humandesign.features.mechanics import gate_mask, channel_mask, chakras_from_channel_mask
+    from humandesign.services.composite import (get_profile_resonance, get_node_resonance,
+                                                get_detailed_node_resonance, get_connection_classification)
+    from humandesign.services.roster import RANK_WEIGHTS
+    acts = store.get_activations(subject), store.get_activations(member)
+    masks = [gate_mask(a["gate"]) for a in acts]
+    composite = channel_mask(masks[0] | masks[1])
+    new = bin(composite & ~(channel_mask(masks[0]) | channel_mask(masks[1]))).count("1")
+    centers = len(chakras_from_channel_mask(composite))
+    def profile(a):
+        return "/".join(str(a["line"][i]) for lbl in ("prs", "des") for i, p in enumerate(a["planets"])
+                        if p == "Sun" and a["label"][i] == lbl)
+    nodes = [{g for g, p in zip(a["gate"], a["planets"]) if p in ("North_Node", "South_Node")} for a in acts]
+    profile_label = get_profile_resonance(profile(acts[0]), profile(acts[1]))
+    node_label = get_node_resonance(*nodes)
+    score = (RANK_WEIGHTS["new_channel"] * new + RANK_WEIGHTS["center"] * centers
+             + RANK_WEIGHTS["profile"][profile_label]
+             + RANK_WEIGHTS["node"][get_detailed_node_resonance(*nodes).resonance_type])
+    return {"member_id": member, "score": score, "new_channels": new,
+            "connection_code": get_connection_classification(centers),
+            "profile_resonance": profile_label, "node_resonance": node_label}
+
+def test_rank_matches_scalar_reference(tmp_path):
+    from humandesign import features as hd
+    rng = random.Random(8)
+    store = RosterStore(str(tmp_path / "rank.sqlite"))
+    for i in range(25):
+        ts = (rng.randint(1950, 2005), rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23), 0, 0, 0)
+        date_to_gate = hd.calc_single_hd_features(ts)[6]
+        store.add_member(f"m{i}", {key: list(date_to_gate[key]) for key in ("gate", "line", "label", "planets")})
+    total, ranked = store.rank(store.get_activations("m0"), exclude="m0", limit=24)
+    assert total == 24
+    expected = sorted((reference_rank(store, "m0", f"m{i}") for i in range(1, 25)),
+                      key=lambda r: (-r["score"], int(r["member_id"][1:])))
+    assert ranked == expected
+    assert store.rank(store.get_activations("m0"), exclude="m0", offset=5, limit=5)[1] == expected[5:10]
+
+def test_rank_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(roster_service, "_roster_store", RosterStore(str(tmp_path / "rank_api.sqlite")))
+    client.put("/roster/members", json={"member_id": "alice", "activations": {"gate": [2, 29]}})
+    client.put("/roster/members", json={"member_id": "bob", "activations": {"gate": [14, 46]}})
+    client.put("/roster/members", json={"member_id": "carol", "activations": {"gate": [64]}})
+    response = client.post("/roster/rank", json={"member_id": "alice"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 2
+    assert [m["member_id"] for m in body["matches"]] == ["bob", "carol"]
+    assert body["matches"][0]["new_channels"] == 2
+    adhoc = client.post("/roster/rank", json={"activations": {"gate": [47]}, "limit": 1}).json()
+    assert adhoc["total"] == 3 and adhoc["matches"][0]["member_id"] == "carol"
+    assert client.post("/roster/rank", json={"member_id": "nobody"}).status_code == 404
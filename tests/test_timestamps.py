@@ -0,0 +1,39 @@
+import pytest
+import numpy as np
+from humandesign.features import get_timestamp_list, timestamp_range, iter_timestamp_chunks
+
+def test_legacy_minutes_example():
+    """Docstring example: newest first, end included, start excluded."""
+    result = get_timestamp_list((2000, 12, 31, 23, 57, 0, 0), (2000, 12, 31, 23, 59, 0, 0), 1, "minutes", 1)
+    assert result == [(2000, 12, 31, 23, 59, 0, 0), (2000, 12, 31, 23, 58, 0, 0)]
+
+def test_seconds_and_offset_are_kept():
+    result = get_timestamp_list((2000, 1, 1, 0, 0, 0, 2), (2000, 1, 1, 0, 0, 30, 2), 1, "seconds", 10, forward=True)
+    assert result == [(2000, 1, 1, 0, 0, 0, 2), (2000, 1, 1, 0, 0, 10, 2), (2000, 1, 1, 0, 0, 20, 2)]
+
+def test_months_clip_day_of_month():
+    result = get_timestamp_list((2001, 1, 31, 12, 0, 0, 0), (2001, 5, 1, 0, 0, 0, 0), 1, "months", 1, forward=True)
+    assert [ts[:3] for ts in result] == [(2001, 1, 31), (2001, 2, 28), (2001, 3, 31), (2001, 4, 30)]
+
+def test_years_step():
+    result = get_timestamp_list((1990, 6, 15, 0, 0, 0, 0), (2000, 6, 15, 0, 0, 0, 0), 1, "years", 5)
+    assert [ts[0] for ts in result] == [2000, 1995]
+
+def test_zone_offsets_respect_dst():
+    result = get_timestamp_list((2021, 3, 27, 12, 0, 0, 0), (2021, 3, 29, 12, 0, 0, 0), 1, "days", 1,
+                                forward=True, zone="Europe/Berlin")
+    assert [ts[6] for ts in result] == [1.0, 2.0]
+
+def test_invalid_range_raises_before_generation():
+    with pytest.raises(ValueError):
+        get_timestamp_list((2000, 1, 2, 0, 0, 0, 0), (2000, 1, 1, 0, 0, 0, 0), 1, "days", 1)
+    with pytest.raises(ValueError):
+        timestamp_range((2000, 1, 1, 0, 0, 0), (2000, 1, 2, 0, 0, 0), "weeks", 1)
+
+def test_chunks_match_full_range():
+    args = ((2000, 1, 1, 0, 0, 0), (2000, 1, 8, 0, 0, 0), "minutes", 7)
+    full = timestamp_range(*args)
+    chunks = list(iter_timestamp_chunks(*args, chunk_size=100))
+    assert all(len(c) <= 100 for c in chunks)
+    assert np.array_equal(np.concatenate(chunks), full)
+    assert full[0] == np.datetime64("2000-01-01T00:00:00")
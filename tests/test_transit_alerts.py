@@ -0,0 +1,95 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+from humandesign import features as hd
+from humandesign.hd_constants import CHAKRA_NAMES_MAP
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.services import transit_alerts
+from humandesign.services.transit_alerts import TransitAlertScheduler
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+JD_START = hd.timestamp_to_jd((2025, 1, 1, 0, 0, 0, 0))
+NATAL_GATES = [1, 2, 3, 10, 20, 34, 57]
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return TransitAlertScheduler(str(tmp_path / "alerts.sqlite"), horizon_days=4, max_events=3)
+
+def reference_events(gates, jd_start, jd_end):
+    ''' composite openings of transit_calendar (scalar reference) '''
+    calendar = hd.transit_calendar(gates, jd_start, jd_end)
+    return [(e["time"], e["event"], "{}-{}".format(*e["channel"]) if "channel" in e else CHAKRA_NAMES_MAP[e["center"]])
+            for e in calendar["events"] if e["event"] in ("channel_formed", "center_defined")]
+
+def as_tuples(events):
+    return [(e["time"], e["event"], e.get("channel") or e.get("center")) for e in events]
+
+def test_plan_matches_transit_calendar(tmp_path):
+    scheduler = TransitAlertScheduler(str(tmp_path / "alerts.sqlite"), horizon_days=4, max_events=1000)
+    rng = random.Random(7)
+    charts = {"natal": NATAL_GATES, **{f"u{i}": rng.sample(range(1, 65), 14) for i in range(20)}}
+    for subscriber_id, gates in charts.items():
+        scheduler.subscribe(subscriber_id, gates, JD_START)
+    #incremental re-planning as time advances
+    scheduler.advance(JD_START + 2)
+    for subscriber_id, gates in charts.items():
+        expected = reference_events(gates, JD_START, JD_START + 6)
+        assert as_tuples(scheduler.pending_events(subscriber_id)) == expected
+
+def test_max_events_and_due_query(scheduler):
+    scheduler.subscribe("natal", NATAL_GATES, JD_START)
+    expected = reference_events(NATAL_GATES, JD_START, JD_START + 4)
+    pending = scheduler.pending_events("natal")
+    #capped after the ingress that reaches max_events
+    assert len(pending) >= 3 and as_tuples(pending) == expected[:len(pending)]
+
+    due = scheduler.due_events(until_jd=pending[0]["jd"])
+    assert [e["id"] for e in due] == [pending[0]["id"]]
+    assert scheduler.due_events(until_jd=pending[0]["jd"]) == []
+    #capacity is free again: planning continues where it stopped
+    scheduler.advance(JD_START)
+    assert as_tuples(scheduler.pending_events("natal")) == expected[1:len(scheduler.pending_events("natal")) + 1]
+
+def test_advance_keeps_timeline_from_now(scheduler):
+    scheduler.subscribe("a", NATAL_GATES, JD_START)
+    scheduler.advance(JD_START + 1)
+    timeline_start = scheduler._state("timeline_start")
+    assert timeline_start <= JD_START + 1
+    #a new subscriber starting now reuses the stored timeline
+    scheduler.subscribe("b", NATAL_GATES, JD_START + 1)
+    assert scheduler._state("timeline_start") == timeline_start
+    assert as_tuples(scheduler.pending_events("b")) == reference_events(NATAL_GATES, JD_START + 1, JD_START + 5)[:3]
+
+def test_persisted_and_unsubscribe(scheduler):
+    scheduler.subscribe("a", NATAL_GATES, JD_START)
+    reloaded = TransitAlertScheduler(scheduler.db_path, horizon_days=4, max_events=3)
+    assert "a" in reloaded and reloaded.pending_events("a") == scheduler.pending_events("a")
+    assert reloaded.unsubscribe("a") and not reloaded.unsubscribe("a")
+    assert reloaded.pending_events("a") == [] and len(reloaded) == 0
+
+def test_invalid_gates_are_rejected(scheduler):
+    for gates in ([1, 70], [1, -3], [0]):
+        with pytest.raises(ValueError):
+            scheduler.subscribe("bad", gates, JD_START)
+    assert "bad" not in scheduler and len(scheduler) == 0
+    scheduler.subscribe("good", NATAL_GATES, JD_START)
+    #the failed subscriptions left nothing behind, the database still loads
+    reloaded = TransitAlertScheduler(scheduler.db_path, horizon_days=4, max_events=3)
+    assert "bad" not in reloaded and len(reloaded) == 1
+    assert reloaded.pending_events("good") == scheduler.pending_events("good")
+
+def test_alert_endpoints(scheduler, monkeypatch):
+    monkeypatch.setattr(transit_alerts, "_alert_scheduler", scheduler)
+    response = client.put("/transits/alerts/subscribers",
+                          json={"subscriber_id": "alice", "activations": {"gate": NATAL_GATES}})
+    assert response.status_code == 200
+    assert response.json()["pending_events"]
+    assert client.get("/transits/alerts/subscribers/alice").json()["pending_events"]
+    assert client.get("/transits/alerts/stats").json()["subscribers"] == 1
+    assert client.put("/transits/alerts/subscribers", json={"subscriber_id": "bob"}).status_code == 400
+    assert client.get("/transits/alerts/due").status_code == 200
+    assert client.delete("/transits/alerts/subscribers/alice").status_code == 200
+    assert client.get("/transits/alerts/subscribers/alice").status_code == 404
@@ -0,0 +1,51 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from humandesign import features as hd
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.services import transit_cache
+from humandesign.services.transit_cache import TransitSnapshotCache, utc_bucket
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+def test_same_utc_moment_shares_snapshot():
+    cache = TransitSnapshotCache(maxsize=8)
+    berlin = (2026, 1, 18, 13, 0, 0, 1)
+    new_york = (2026, 1, 18, 7, 0, 0, -5)
+    assert utc_bucket(berlin) == utc_bucket(new_york) == datetime(2026, 1, 18, 12, 0)
+    assert cache.day_chart(berlin) == hd.calc_single_hd_features(berlin, day_chart_only=True)
+    snapshot = cache.day_chart(new_york)
+    assert snapshot == hd.calc_single_hd_features(new_york, day_chart_only=True)
+    #callers get copies, mutating one result must not change the cache
+    snapshot["lon"].clear()
+    assert cache.day_chart(berlin)["lon"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+
+def test_prewarm_and_lru_eviction():
+    cache = TransitSnapshotCache(maxsize=30)
+    assert cache.prewarm(datetime(2026, 1, 18, 23, 50), 20) == 20
+    assert cache.prewarm(datetime(2026, 1, 18, 23, 50), 20) == 0
+    cache.day_chart((2026, 1, 19, 0, 5, 0, 0))
+    assert cache.stats()["hits"] == 1
+    cache.prewarm(datetime(2026, 1, 19, 0, 10), 20)
+    stats = cache.stats()
+    assert stats["size"] == 30 and stats["prewarmed"] == 40
+    #recently used snapshot survived eviction, oldest prewarmed minute is gone
+    cache.day_chart((2026, 1, 19, 0, 5, 0, 0))
+    cache.day_chart((2026, 1, 18, 23, 50, 0, 0))
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+def test_daily_transit_uses_cache(monkeypatch):
+    cache = TransitSnapshotCache(maxsize=8)
+    monkeypatch.setattr(transit_cache, "_transit_cache", cache)
+    params = {"place": "Europe/Istanbul", "year": 1968, "month": 2, "day": 21, "hour": 11, "minute": 0,
+              "latitude": 41.01, "longitude": 28.97,
+              "transit_year": 2026, "transit_month": 1, "transit_day": 18, "transit_hour": 12}
+    first = client.get("/transits/daily", params=params)
+    second = client.get("/transits/daily", params=params)
+    assert first.status_code == second.status_code == 200
+    assert first.json()["planetary_transits"] == second.json()["planetary_transits"]
+    stats = client.get("/transits/cache/stats").json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
@@ -0,0 +1,68 @@
+import swisseph as swe
+from fastapi.testclient import TestClient
+from humandesign import features as hd
+from humandesign.api import app
+from humandesign.dependencies import verify_token
+from humandesign.features.crossings import iter_line_ingresses, gate_line
+
+app.dependency_overrides[verify_token] = lambda: True
+client = TestClient(app)
+
+NATAL_GATES = [1, 2, 3, 10, 20, 34, 57]
+
+def day_chart_position(jd, planet):
+    year, month, day, hour, minute, second = swe.jdut1_to_utc(jd)
+    chart = hd.calc_single_hd_features((year, month, day, hour, minute, int(second), 0), day_chart_only=True)
+    idx = chart["planets"].index(planet)
+    return chart["gate"][idx], chart["line"][idx]
+
+def test_ingress_times_match_day_chart():
+    jd_start = hd.timestamp_to_jd((2025, 1, 1, 0, 0, 0, 0))
+    events = list(iter_line_ingresses("Moon", jd_start, jd_start + 1))
+    #Moon stays ~1.7 hours in one line
+    assert 10 <= len(events) <= 20
+    for jd, planet, from_index, to_index in events:
+        assert day_chart_position(jd - 2 / 86400, planet) == gate_line(from_index)
+        assert day_chart_position(jd + 2 / 86400, planet) == gate_line(to_index)
+
+def test_composite_events_follow_gate_ingresses():
+    jd_start = hd.timestamp_to_jd((2025, 1, 1, 0, 0, 0, 0))
+    calendar = hd.transit_calendar(NATAL_GATES, jd_start, jd_start + 14)
+    events = calendar["events"]
+    assert [e["jd"] for e in events] == sorted(e["jd"] for e in events)
+    ingress_times = {e["jd"] for e in events if e["event"] == "gate_ingress"}
+    composite = [e for e in events if e["event"] not in ("gate_ingress", "line_ingress")]
+    assert composite and all(e["jd"] in ingress_times for e in composite)
+    #replaying the channel events from the start state gives the composite of the end state
+    channels = set(calendar["start"]["new_channels"])
+    for e in composite:
+        if e["event"] == "channel_formed":
+            channels.add(e["channel"])
+        elif e["event"] == "channel_dissolved":
+            channels.remove(e["channel"])
+    end = hd.transit_calendar(NATAL_GATES, jd_start + 14, jd_start + 14.001)
+    assert channels == set(end["start"]["new_channels"])
+
+def test_calendar_endpoint():
+    params = {"place": "Europe/Berlin", "latitude": 52.52, "longitude": 13.405,
+              "start_year": 2025, "start_month": 3, "start_day": 1, "days": 3,
+              "planets": "Sun,Moon", "events": "gate_ingress"}
+    response = client.get("/transits/calendar", params=params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["start"] == "2025-02-28T23:00:00Z"
+    assert [p["planet"] for p in data["start_positions"]] == ["Sun", "Moon"]
+    assert data["event_count"] == len(data["events"]) > 0
+    assert {e["event"] for e in data["events"]} == {"gate_ingress"}
+    params["planets"] = "Sun,Vulcan"
+    assert client.get("/transits/calendar", params=params).status_code == 400
+
+def test_gate_ingresses_match_line_ingresses():
+    jd_start = hd.timestamp_to_jd((2025, 1, 1, 0, 0, 0, 0))
+    expected = [(jd, planet, gate_line(from_index)[0], gate_line(to_index)[0])
+                for jd, planet, from_index, to_index in hd.line_ingresses(jd_start, jd_start + 14)
+                if gate_line(from_index)[0] != gate_line(to_index)[0]]
+    events = list(hd.gate_ingresses(jd_start, jd_start + 14))
+    assert [event[1:] for event in events] == [event[1:] for event in expected]
+    #same crossings within solver precision
+    assert all(abs(event[0] - ref[0]) < 1 / 86400 for event, ref in zip(events, expected))
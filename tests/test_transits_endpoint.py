@@ -103,3 +103,22 @@ def test_solar_return_endpoint_parity():
     # The endpoint calculates 1968 SR (offset 0). 
     assert "transit_date_utc" in meta
     assert data["planetary_transits"] # Should have planets
+
+def test_solar_return_series_matches_single_returns():
+    params = {"place": "Europe/Istanbul", "year": 1968, "month": 2, "day": 21, "hour": 11, "minute": 0,
+              "latitude": 41.01, "longitude": 28.98}
+    response = client.get("/transits/solar_return/series", params={**params, "start_offset": 55, "end_offset": 58})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 4
+    assert [sr["sr_year_offset"] for sr in data["solar_returns"]] == [55, 56, 57, 58]
+    assert data["meta"]["energy_type"] == "Manifesting Generator"
+    assert "transit_date_utc" not in data["meta"]
+    for sr in data["solar_returns"]:
+        single = client.get("/transits/solar_return", params={**params, "sr_year_offset": sr["sr_year_offset"]}).json()
+        assert sr["transit_date_utc"] == single["meta"]["transit_date_utc"]
+        assert sr["age"] == single["meta"]["age"]
+        assert sr["composite_changes"] == single["composite_changes"]
+        assert sr["planetary_transits"] == single["planetary_transits"]
+    bad = client.get("/transits/solar_return/series", params={**params, "start_offset": 5, "end_offset": 1})
+    assert bad.status_code == 400
@@ -0,0 +1,62 @@
+import random
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+import pytz
+from humandesign import features as hd
+from humandesign.features.tz_offsets import ZoneOffsets
+
+ZONES = ["Europe/Berlin", "America/New_York", "Australia/Lord_Howe", "Asia/Kolkata", "America/Sao_Paulo",
+         "Europe/Warsaw", "Pacific/Apia", "Asia/Kathmandu", "UTC", "Etc/GMT+5"]
+
+def reference(timestamp, zone):
+    ''' previous implementation: pytz localize (is_dst=False) '''
+    return pytz.timezone(zone).localize(datetime(*timestamp)).utcoffset().total_seconds() / 3600
+
+def local_samples(zone, rng):
+    ''' local times around every transition (gaps and folds) plus random dates '''
+    tz = pytz.timezone(zone)
+    samples = []
+    transitions = getattr(tz, "_utc_transition_times", [])
+    for i in range(1, len(transitions)):
+        if 1850 < transitions[i].year < 2040:
+            #local clock times of the transition before and after the switch
+            for offset in (tz._transition_info[i - 1][0], tz._transition_info[i][0]):
+                for minutes in (-61, -1, 0, 1, 30, 59, 61):
+                    samples.append(transitions[i] + offset + timedelta(minutes=minutes))
+    samples += [datetime(1850 + rng.randrange(250), rng.randrange(1, 13), rng.randrange(1, 29),
+                         rng.randrange(24), rng.randrange(60)) for _ in range(200)]
+    return [(s.year, s.month, s.day, s.hour, s.minute, s.second) for s in samples]
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_scalar_matches_pytz(zone):
+    rng = random.Random(zone)
+    for timestamp in local_samples(zone, rng):
+        assert hd.get_utc_offset_from_tz(timestamp, zone) == reference(timestamp, zone)
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_vectorized_matches_scalar(zone):
+    rng = random.Random(zone)
+    timestamps = local_samples(zone, rng)
+    stamps = np.array([datetime(*ts) for ts in timestamps], dtype="datetime64[s]")
+    assert hd.utc_offsets(stamps, zone).tolist() == [hd.utc_offset_hours(ts, zone) for ts in timestamps]
+
+def test_nonexistent_and_ambiguous_times():
+    #02:30 does not exist on 2021-03-28 in Berlin: offset before the transition
+    assert hd.utc_offset_hours((2021, 3, 28, 2, 30, 0), "Europe/Berlin") == 1.0
+    assert hd.utc_offset_hours((2021, 3, 28, 3, 0, 0), "Europe/Berlin") == 2.0
+    #02:30 exists twice on 2021-10-31: the standard time (second) occurrence
+    assert hd.utc_offset_hours((2021, 10, 31, 2, 30, 0), "Europe/Berlin") == 1.0
+    assert hd.utc_offset_hours((2021, 10, 31, 1, 59, 59), "Europe/Berlin") == 2.0
+    #half hour offsets and DST shifts
+    assert hd.utc_offset_hours((2021, 7, 1, 12, 0, 0), "Australia/Lord_Howe") == 10.5
+    assert hd.utc_offset_hours((2021, 1, 1, 12, 0, 0), "Australia/Lord_Howe") == 11.0
+
+def test_zone_tables_are_cached_and_validated():
+    assert hd.get_zone_offsets("Europe/Berlin") is hd.get_zone_offsets("Europe/Berlin")
+    table = ZoneOffsets("Europe/Berlin")
+    assert np.all(np.diff(table.switches) > 0) and len(table.offsets) == len(table.switches) + 1
+    with pytest.raises(pytz.UnknownTimeZoneError):
+        hd.utc_offset_hours((2021, 1, 1, 0, 0, 0), "Mars/Olympus_Mons")
+    with pytest.raises(ValueError):
+        hd.utc_offset_hours((2021, 2, 30, 0, 0, 0), "Europe/Berlin")
@@ -109,3 +109,39 @@ def test_enrich_transit_metadata(mock_calc):
     assert len(result["planetary_transits"]) == 1
     assert result["planetary_transits"][0]["planets"] == "Sun"
 
+
+def test_natal_context_is_calculated_once_per_user():
+    from fastapi.testclient import TestClient
+    from humandesign import features as hd
+    from humandesign.api import app
+    from humandesign.dependencies import verify_token
+    from humandesign.utils.calculations import get_natal_context
+
+    app.dependency_overrides[verify_token] = lambda: True
+    client = TestClient(app)
+    get_natal_context.cache_clear()
+    params = {"place": "Europe/Istanbul", "year": 1971, "month": 9, "day": 2, "hour": 8, "minute": 15,
+              "latitude": 41.01, "longitude": 28.97,
+              "transit_year": 2026, "transit_month": 3, "transit_day": 1, "transit_hour": 9}
+    with patch.object(hd, "calc_single_hd_features", wraps=hd.calc_single_hd_features) as calc:
+        first = client.get("/transits/daily", params=params)
+        natal_calls = [c for c in calc.call_args_list if not c.kwargs.get("day_chart_only")]
+        assert len(natal_calls) == 1
+        second = client.get("/transits/daily", params={**params, "transit_day": 2})
+        natal_calls = [c for c in calc.call_args_list if not c.kwargs.get("day_chart_only")]
+        assert len(natal_calls) == 1
+    assert first.status_code == second.status_code == 200
+    assert first.json()["meta"]["energy_type"] == second.json()["meta"]["energy_type"]
+
+def test_natal_context_meta():
+    from humandesign.utils.calculations import NatalContext
+    natal = NatalContext((1980, 1, 1, 12, 0, 0, 0), (
+        "Projector", "SN", "cross", "RAC", (6, 2), 2, {}, {"SN", "TT"},
+        {"meaning": [("Channel X", "Desc X")], "gate": [20], "ch_gate": [57]},
+        "1980-01-01", "1979-10-01", {}))
+    assert natal.channel_keys == {(20, 57)}
+    assert natal.meta["profile"] == "6/2: Role Model Hermit"
+    assert natal.meta["strategy"] == "Wait for the Invitation"
+    assert natal.meta["definition"] == "Split Definition"
+    assert natal.meta["zodiac_sign"] == "Capricorn"
+    assert natal.meta["channels"]["Channels"] == [{"channel": "20/57: Channel X (Desc X)"}]